@@ -79,7 +79,7 @@ cdef extern from "renpy.h":
 
     void transform32_core(object, object,
                           float, float, float, float, float, float,
-                          int, float, int)
+                          int, float, int, int, int)
 
     void blend32_core(object, object, object, int)
 
@@ -375,7 +375,10 @@ def check(surf):
 
 def transform(pysrc, pydst,
               corner_x, corner_y,
-              xdx, ydx, xdy, ydy, a=1.0, precise=0):
+              xdx, ydx, xdy, ydy, a=1.0, precise=0, ystart=0, yend=-1):
+
+    # If given, only the lines of pydst from ystart up to yend are drawn,
+    # with the same results as when the whole surface is drawn.
 
     check(pysrc)
     check(pydst)
@@ -387,7 +390,7 @@ def transform(pysrc, pydst,
                      corner_x, corner_y,
                      xdx, ydx,
                      xdy, ydy,
-                     pysrc.get_shifts()[3], a, precise)
+                     pysrc.get_shifts()[3], a, precise, ystart, yend)
 
     # pydst.unlock()
     # pysrc.unlock()
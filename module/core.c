@@ -1180,7 +1180,9 @@ int transform32_std(PyObject *pysrc, PyObject *pydst,
                     float xdy, float ydy,
                     int ashift,
                     float a,
-                    int precise
+                    int precise,
+                    int ystart,
+                    int yend
     ) {
 
     SDL_Surface *src;
@@ -1212,6 +1214,16 @@ int transform32_std(PyObject *pysrc, PyObject *pydst,
     srch = src->h;
     dsth = dst->h;
 
+    // Only the lines from ystart to yend are drawn. Each line is computed
+    // from the corner, so the result doesn't depend on the range.
+    if (ystart < 0) {
+        ystart = 0;
+    }
+
+    if (yend < 0 || yend > dsth) {
+        yend = dsth;
+    }
+
     // Compute the coloring multiplier.
     unsigned int amul = (unsigned int) (a * 256);
 
@@ -1242,7 +1254,7 @@ int transform32_std(PyObject *pysrc, PyObject *pydst,
 
 
     // Loop through every line.
-    for (y = 0; y < dsth; y++) {
+    for (y = ystart; y < yend; y++) {
 
         // The source coordinates of the leftmost pixel in the line.
         double leftsx = corner_x + y * xdy;
@@ -1375,12 +1387,14 @@ void transform32_core(PyObject *pysrc, PyObject *pydst,
                       float xdy, float ydy,
                       int ashift,
                       float a,
-                      int precise
+                      int precise,
+                      int ystart,
+                      int yend
     ) {
 
 
     transform32_std(pysrc, pydst, corner_x, corner_y,
-                    xdx, ydx, xdy, ydy, ashift, a, precise);
+                    xdx, ydx, xdy, ydy, ashift, a, precise, ystart, yend);
 
 }
 
@@ -101,7 +101,8 @@ void transform32_core(PyObject *pysrc,
                       float, float,
                       float, float,
                       float, float,
-                      int, float, int);
+                      int, float, int,
+                      int, int);
 
 void blend32_core(PyObject *pysrca,
                   PyObject *pysrcb,
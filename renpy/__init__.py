@@ -62,6 +62,7 @@ update_path()
 
 import renpy.compat.pickle as pickle
 
+import gc
 import sys
 import os
 import copy
@@ -209,11 +210,14 @@ backup_blacklist = {
     "renpy.bootstrap",
     "renpy.debug",
     "renpy.display",
+    "renpy.display.diskcache",
     "renpy.display.pgrender",
     "renpy.display.presplash",
     "renpy.display.scale",
     "renpy.display.swdraw",
+    "renpy.display.headless",
     "renpy.display.test",
+    "renpy.performance",
     "renpy.six",
     "renpy.text.ftfont",
     "renpy.test",
@@ -233,7 +237,10 @@ type_blacklist = (
 
 name_blacklist = {
     "renpy.loadsave.autosave_not_running",
+    "renpy.loadsave.cache_lock",
+    "renpy.loadsave.prefetch_condition",
     "renpy.python.unicode_re",
+    "renpy.rollback.split_history",
     "renpy.python.string_re",
     "renpy.python.store_dicts",
     "renpy.python.store_modules",
@@ -246,6 +253,7 @@ name_blacklist = {
     "renpy.display.render.blit_lock",
     "renpy.display.render.IDENTITY",
     "renpy.loader.auto_lock",
+    "renpy.loader.readahead_condition",
     "renpy.display.screen.cprof",
     "renpy.audio.audio.lock",
     "renpy.audio.audio.periodic_condition",
@@ -466,6 +474,7 @@ def import_all():
     import renpy.display.core
     import renpy.display.scenelists
     import renpy.display.swdraw
+    import renpy.display.headless
 
     import renpy.text
 
@@ -490,6 +499,7 @@ def import_all():
     import renpy.display.transition
     import renpy.display.movetransition
     import renpy.display.im
+    import renpy.display.diskcache
     import renpy.display.imagelike
     import renpy.display.image
     import renpy.display.video
@@ -503,6 +513,7 @@ def import_all():
     import renpy.display.dragdrop
     import renpy.display.imagemap
     import renpy.display.predict
+    import renpy.display.predictprofile
     import renpy.display.emulator
     import renpy.display.tts
     import renpy.display.gesture
@@ -631,10 +642,20 @@ def reload_all():
 
     # Shut down the cache thread.
     renpy.display.im.cache.quit()
+    renpy.loader.quit_readahead()
+
+    # Save the prediction profile.
+    renpy.display.predictprofile.save()
 
     # Shut down the importer.
     renpy.loader.quit_importer()
 
+    # Allow the old script to be collected.
+    if hasattr(gc, "unfreeze"):
+        gc.unfreeze()
+
+    renpy.performance.stop_gc_log()
+
     # Free memory.
     renpy.exports.free_memory()
 
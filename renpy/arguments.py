@@ -138,6 +138,13 @@ class ArgumentParser(argparse.ArgumentParser):
             '--safe-mode', dest='safe_mode', action='store_true', default=False,
             help="Forces Ren'Py to start in safe mode, allowing the player to configure graphics.")
 
+        headless = self.add_argument_group("Headless arguments", description="Ren'Py can run without a window or audio, drawing with the software renderer to an offscreen surface while time is kept by a virtual clock. This can be used with the run and test commands.")
+        headless.add_argument("--headless", action="store_true", default=False, help="Runs without a window or audio.")
+        headless.add_argument("--headless-framerate", action="store", type=float, default=60.0, metavar="FPS", help="The number of frames in each second of virtual time.")
+        headless.add_argument("--headless-frames", action="store", metavar="DIRECTORY", help="Saves each frame that's drawn to DIRECTORY.")
+        headless.add_argument("--headless-screenshots", action="store", metavar="DIRECTORY", help="Saves the last frame of each interaction to DIRECTORY.")
+        headless.add_argument("--benchmark", action="store", metavar="FILE", help="Runs headless, and writes the percentiles of the time taken by each part of a frame to FILE when Ren'Py quits.")
+
         dump = self.add_argument_group("JSON dump arguments", description="Ren'Py can dump information about the game to a JSON file. These options let you select the file, and choose what is dumped.")
         dump.add_argument("--json-dump", action="store", metavar="FILE", help="The name of the JSON file.")
         dump.add_argument("--json-dump-private", action="store_true", default=False, help="Include private names. (Names beginning with _.)")
@@ -305,6 +312,10 @@ def post_init():
         os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
         os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
 
+    if getattr(renpy.game.args, "headless", False) or getattr(renpy.game.args, "benchmark", None):
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+
     return commands[command]()
 
 
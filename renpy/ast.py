@@ -368,6 +368,16 @@ class Node(object):
         else:
             return [ ]
 
+    def predict_cacheable(self):
+        """
+        Returns true if what predict predicts depends only on the images
+        that are showing and the return stack, so the result can be reused
+        when the node is reached in the same state. This is false if
+        predict evaluates expressions that can depend on the store.
+        """
+
+        return True
+
     def scry(self):
         """
         Called to return an object with some general, user-definable information
@@ -648,6 +658,9 @@ class Say(Node):
 
         return [ self.next ]
 
+    def predict_cacheable(self):
+        return (self.who is None) or self.who_fast
+
     def scry(self):
         rv = Node.scry(self)
 
@@ -995,6 +1008,18 @@ class Transform(Node):
         self.atl.analyze(parameters)
 
 
+def imspec_expression(imspec):
+    """
+    Returns the expression that's evaluated to get the image named in
+    imspec, or None if the image is named by its name.
+    """
+
+    if (imspec is None) or (len(imspec) < 6):
+        return None
+
+    return imspec[1]
+
+
 def predict_imspec(imspec, scene=False, atl=None):
     """
     Call this to use the given callback to predict the image named
@@ -1114,6 +1139,9 @@ class Show(Node):
         predict_imspec(self.imspec, atl=getattr(self, "atl", None))
         return [ self.next ]
 
+    def predict_cacheable(self):
+        return imspec_expression(self.imspec) is None
+
     def analyze(self):
         if getattr(self, 'atl', None) is not None:
             # ATL block defined for show, scene or show layer statements
@@ -1251,6 +1279,9 @@ class Scene(Node):
 
         return [ self.next ]
 
+    def predict_cacheable(self):
+        return imspec_expression(self.imspec) is None
+
     def analyze(self):
         if getattr(self, 'atl', None) is not None:
             self.atl.analyze(EMPTY_PARAMETERS)
@@ -1445,6 +1476,9 @@ class Call(Node):
 
         return [ renpy.game.context().predict_call(label, self.next.name) ]
 
+    def predict_cacheable(self):
+        return not self.expression
+
     def scry(self):
         rv = Node.scry(self)
         rv._next = None
@@ -1639,6 +1673,9 @@ class Menu(Node):
 
         return rv
 
+    def predict_cacheable(self):
+        return False
+
     def scry(self):
         rv = Node.scry(self)
         rv._next = None
@@ -1723,6 +1760,9 @@ class Jump(Node):
 
         return [ renpy.game.script.lookup(label) ]
 
+    def predict_cacheable(self):
+        return not self.expression
+
     def scry(self):
         rv = Node.scry(self)
         if self.expression:
@@ -1971,6 +2011,11 @@ class UserStatement(Node):
     def execute_default(self, start):
         self.call("execute_default")
 
+    def predict_cacheable(self):
+
+        # The statement's predict function may evaluate anything.
+        return False
+
     def predict(self):
         predictions = self.call("predict")
 
@@ -2476,6 +2521,11 @@ class Translate(Node):
         node = self.lookup()
         return [ node ]
 
+    def predict_cacheable(self):
+
+        # The block depends on the language.
+        return False
+
     def scry(self):
         rv = Scry()
         rv._next = self.lookup()
@@ -2570,6 +2620,11 @@ class TranslateSay(Say):
 
         return [ node ]
 
+    def predict_cacheable(self):
+
+        # The translation depends on the language.
+        return False
+
     def scry(self):
         node = self.lookup()
 
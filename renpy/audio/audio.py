@@ -1131,6 +1131,8 @@ def periodic_pass():
     if not pcm_ok:
         return False
 
+    span_start = renpy.performance.begin()
+
     try:
 
         # A list of emphasized channels.
@@ -1190,6 +1192,9 @@ def periodic_pass():
         if renpy.config.debug_sound:
             raise
 
+    finally:
+        renpy.performance.end("audio", span_start)
+
 
 # The exception that's been thrown by the periodic thread.
 periodic_exc = None
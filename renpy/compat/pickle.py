@@ -58,6 +58,18 @@ if PY2:
         else:
             return pickle.dumps(o, PROTOCOL)
 
+    def make_pickler(f, highest=False): # type: ignore
+        if renpy.config.use_cpickle:
+            return cPickle.Pickler(f, PROTOCOL)
+        else:
+            return pickle.Pickler(f, PROTOCOL)
+
+    def make_unpickler(f): # type: ignore
+        if renpy.config.use_cpickle:
+            return cPickle.Unpickler(f)
+        else:
+            return pickle.Unpickler(f)
+
 else:
 
     import functools
@@ -96,9 +108,11 @@ else:
 
             return super().find_class(module, name)
 
+    def make_unpickler(f):
+        return Unpickler(f, fix_imports=True, encoding="utf-8", errors="surrogateescape")
+
     def load(f):
-        up = Unpickler(f, fix_imports=True, encoding="utf-8", errors="surrogateescape")
-        return up.load()
+        return make_unpickler(f).load()
 
     def loads(s):
         return load(io.BytesIO(s))
@@ -109,6 +123,15 @@ else:
     def dumps(o, highest=False):
         return pickle.dumps(o, pickle.HIGHEST_PROTOCOL if highest else PROTOCOL)
 
+    def make_pickler(f, highest=False):
+        """
+        Returns a pickler that writes to `f`. Objects pickled by later
+        calls to its dump method can refer to objects pickled by earlier
+        calls, provided they're loaded by the same unpickler.
+        """
+
+        return pickle.Pickler(f, pickle.HIGHEST_PROTOCOL if highest else PROTOCOL)
+
     # The python AST module changed significantly between python 2 and 3. Old-style
     # screenlang support records raw python ast nodes into the rpyc data, making these
     # impossible to load normally. This dict contains mappings of nodes that need to be
@@ -89,6 +89,9 @@ underlay = [ ]
 # True to enable profiling.
 profile = False
 
+# True to start the span profiler when the game starts.
+profile_spans = False
+
 # The directory save files will be saved to.
 savedir = None
 
@@ -99,12 +102,63 @@ image_cache_size = None
 # The size of the image cache, in megabytes.
 image_cache_size_mb = 400
 
+# If not None, limits on the number of bytes of surfaces (in main memory)
+# and textures (in GPU memory) the image cache may hold.
+image_cache_surface_bytes = None
+image_cache_texture_bytes = None
+
+# The number of threads that decode images for the image cache. If None,
+# this is chosen based on the number of CPUs.
+image_cache_preload_threads = None
+
+# Should image cache statistics be logged to image_cache_stats.jsonl?
+image_cache_stats_log = False
+
+# Should the surfaces produced by image manipulators be cached on disk?
+image_disk_cache = False
+
+# The size of the disk cache, in bytes.
+image_disk_cache_size = 256 * 1024 * 1024
+
+# The maximum number of bytes of predicted image files that are read into
+# memory before they are decoded.
+image_readahead_size = 32 * 1024 * 1024
+
+# Should the images and screens needed at each statement be recorded into
+# the prediction profile?
+record_prediction_profile = False
+
+# The number of seconds per frame that can be spent uploading predicted
+# textures to the GPU.
+texture_upload_time = 0.002
+
+# The number of renders of pure displayables kept in each generation of
+# the pure render cache. 0 disables the cache.
+pure_render_cache_size = 256
+
+# The number of frames a render has to be unchanged for before the
+# model-based renderer draws it from a single texture. None or 0 disables
+# this.
+auto_flatten_frames = 8
+
+# The number of bytes of texture that can be used to draw unchanged
+# renders from.
+auto_flatten_bytes = 64 * 1024 * 1024
+
+# The number of threads the software renderer draws with. If None, this is
+# chosen based on the number of CPUs.
+software_draw_threads = None
+
 # The number of statements we will analyze when doing predictive
 # loading. Please note that this is a total number of statements in a
-# BFS along all paths, rather than the depth along any particular
-# path. The current node is counted in this number.
+# search along all paths, nearest first, rather than the depth along any
+# particular path. The current node is counted in this number.
 predict_statements = 32
 
+# If not None, the number of seconds that may be spent predicting
+# statements in each interaction.
+predict_statements_time = 0.005
+
 # Causes the contents of the image cache to be printed to stdout when
 # it changes.
 debug_image_cache = ("RENPY_DEBUG_IMAGE_CACHE" in os.environ)
@@ -330,6 +384,9 @@ autosave_slots = 10
 # How often do we autosave. (Number of interactions, sort of.)
 autosave_frequency = int(os.environ.get("RENPY_AUTOSAVE_FREQUENCY", "200"))
 
+# How long an autosave will wait for an idle frame, in seconds.
+autosave_idle_deadline = 10.0
+
 # The callback that is used by the scene statement.
 scene = None
 
@@ -921,6 +978,13 @@ gc_thresholds = (25000, 10, 10)
 # The threshold for a level 0 gc when we have the time.
 idle_gc_count = 2500
 
+# Should collections be put off until they fit between frames?
+gc_schedule = True
+
+# Should the objects that exist after init be frozen, so they are not
+# scanned by the collector?
+gc_freeze = True
+
 # Should we print unreachable.
 gc_print_unreachable = "RENPY_GC_PRINT_UNREACHABLE" in os.environ
 
@@ -1488,6 +1552,21 @@ munge_in_strings = True
 # The version of the character callback.
 character_callback_compat = None
 
+# The number of threads used to load save slot metadata in the background.
+save_prefetch_threads = 2
+
+# Should the rollback history be saved separately from the current state,
+# so it can be loaded lazily?
+split_rollback_history = True
+
+# Should changes to persistent data be appended to a journal, rather than
+# rewriting the persistent file each time?
+persistent_journal = False
+
+# The size of the journal, in bytes, at which it's compacted into the
+# persistent file.
+persistent_journal_size = 256 * 1024
+
 del os
 del collections
 
@@ -80,6 +80,7 @@ if 1 == 0:
     from . import error
     from . import focus
     from . import gesture
+    from . import headless
     from . import im
     from . import image
     from . import imagelike
@@ -117,6 +117,10 @@ null = None
 time_base = 0.0
 time_mult = 1.0
 
+# If not None, the time returned by get_time. This is set by the headless
+# renderer, which runs on a virtual clock.
+virtual_time = None
+
 # Mouse management.
 relx = 0
 rely = 0
@@ -133,6 +137,10 @@ def init_time():
 
 
 def get_time():
+
+    if virtual_time is not None:
+        return virtual_time
+
     t = time.time()
     return time_base + (t - time_base) * time_mult
 
@@ -383,6 +391,13 @@ class Renderer(object):
         textures, and a count of the number of textures that exist.
         """
 
+    def get_texture_bytes(self, tex):
+        """
+        This returns the number of bytes of memory consumed by `tex`, a
+        texture returned by load_texture or render_to_texture. This is
+        used by the image cache to account for the memory it uses.
+        """
+
     def update(self, force=False):
         """
         This is called before a draw operation to check to see if the state of
@@ -754,6 +769,18 @@ class Interface(object):
         # Should we profile the next frame?
         self.profile_once = False
 
+        # The time spent uploading predicted textures since the last frame
+        # was drawn, and the time that count started.
+        self.texture_upload_time = 0.0
+        self.texture_upload_start = 0.0
+
+        # The measured time it takes to collect each generation, beyond the
+        # time spent on the objects in generation 0, and the measured time it
+        # takes to collect each object in generation 0. None if no
+        # collection has been measured.
+        self.gc_time = [ None, None, None ]
+        self.gc_object_time = None
+
         # The thread that can do display operations.
         self.thread = threading.current_thread()
 
@@ -1207,6 +1234,9 @@ class Interface(object):
         if self.safe_mode:
             renderers = [ "sw" ]
 
+        if getattr(renpy.game.args, "headless", False) or getattr(renpy.game.args, "benchmark", None):
+            renderers = [ "headless" ]
+
         draw_objects = { }
 
         def make_draw(name, mod, cls, *args):
@@ -1237,6 +1267,8 @@ class Interface(object):
 
         make_draw("sw", "renpy.display.swdraw", "SWDraw")
 
+        make_draw("headless", "renpy.display.headless", "HeadlessDraw")
+
         rv = [ ]
 
         def append_draw(name):
@@ -1350,14 +1382,22 @@ class Interface(object):
         finally:
             renpy.display.render.per_frame = False
 
+        start = renpy.performance.begin()
+
         surftree = renpy.display.render.render_screen(
             root_widget,
             renpy.config.screen_width,
             renpy.config.screen_height,
             )
 
+        renpy.display.render.flatten(surftree)
+
+        renpy.performance.end("render", start)
+
         if draw:
+            start = renpy.performance.begin()
             renpy.display.draw.draw_screen(surftree)
+            renpy.performance.end("draw", start)
 
         if renpy.emscripten:
             emscripten.sleep(0)
@@ -1366,6 +1406,9 @@ class Interface(object):
 
         self.frame_times.append(now)
 
+        self.texture_upload_time = 0.0
+        self.texture_upload_start = now
+
         while (now - self.frame_times[0]) > renpy.config.performance_window:
             self.frame_times.pop(0)
 
@@ -1379,6 +1422,9 @@ class Interface(object):
             self.after_first_frame()
             self.first_frame = False
 
+        if renpy.performance.timing:
+            renpy.performance.end_frame()
+
     def take_screenshot(self, scale, background=False):
         """
         This takes a screenshot of the current screen, and stores it so
@@ -2106,6 +2152,10 @@ class Interface(object):
         Forces Ren'Py to draw the screen at the maximum framerate for `t` seconds.
         """
 
+        # When benchmarking, only the frames that need to be drawn are.
+        if renpy.performance.benchmarking:
+            return
+
         if t is None:
             self.maximum_framerate_time = 0
         else:
@@ -2195,9 +2245,65 @@ class Interface(object):
                 renpy.store._side_image_attributes = None
                 renpy.store._side_image_attributes_reset = False
 
-    def consider_gc(self):
+    def predict_gc_time(self, gen, objects):
+        """
+        Returns the predicted time it will take to collect generation `gen`,
+        when there are `objects` objects in generation 0, or None if no
+        prediction can be made.
+        """
+
+        if (self.gc_object_time is None) or (self.gc_time[gen] is None):
+            return None
+
+        return self.gc_time[gen] + self.gc_object_time * objects
+
+    def update_gc_time(self, gen, objects, elapsed):
+        """
+        Updates the predictions with the time it took to collect generation
+        `gen`, with `objects` objects in generation 0.
+        """
+
+        if gen == 0:
+            if objects:
+                t = elapsed / objects
+
+                if self.gc_object_time is None:
+                    self.gc_object_time = t
+                else:
+                    self.gc_object_time = .75 * self.gc_object_time + .25 * t
+
+            self.gc_time[0] = 0.0
+            return
+
+        if self.gc_object_time is None:
+            return
+
+        t = max(0.0, elapsed - self.gc_object_time * objects)
+
+        if self.gc_time[gen] is None:
+            self.gc_time[gen] = t
+        else:
+            self.gc_time[gen] = .75 * self.gc_time[gen] + .25 * t
+
+    def gc_budget(self):
+        """
+        Returns the time left before the next frame needs to be drawn.
+        """
+
+        if not self.frame_times:
+            return self.frame_duration
+
+        return self.frame_duration - (time.time() - self.frame_times[-1])
+
+    def consider_gc(self, budget=None):
         """
         Considers if we should peform a garbage collection.
+
+        `budget`
+            If not None, the number of seconds left in the current frame.
+            When config.gc_schedule is true, a collection that isn't
+            predicted to fit in the budget is put off, until
+            config.gc_thresholds[0] objects have been allocated.
         """
 
         if not renpy.config.manage_gc:
@@ -2206,7 +2312,6 @@ class Interface(object):
         count = gc.get_count()
 
         if count[0] >= renpy.config.idle_gc_count:
-            renpy.plog(2, "before gc")
 
             if count[2] >= renpy.config.gc_thresholds[2]:
                 gen = 2
@@ -2215,7 +2320,26 @@ class Interface(object):
             else:
                 gen = 0
 
+            if (budget is not None) and renpy.config.gc_schedule and (count[0] < renpy.config.gc_thresholds[0]):
+
+                # Collect the oldest generation that fits in the budget.
+                while gen >= 0:
+                    predicted = self.predict_gc_time(gen, count[0])
+
+                    if (predicted is not None) and (predicted <= budget):
+                        break
+
+                    gen -= 1
+
+                if gen < 0:
+                    renpy.plog(2, "put off gc, {:.1f}ms left in frame", budget * 1000)
+                    return
+
+            renpy.plog(2, "before gc")
+
+            start = time.time()
             gc.collect(gen)
+            self.update_gc_time(gen, count[0], time.time() - start)
 
             if gc.garbage:
                 renpy.memory.print_garbage(gen)
@@ -2223,9 +2347,43 @@ class Interface(object):
 
             renpy.plog(2, "after gc")
 
-    def idle_frame(self, can_block, expensive):
+    def upload_textures(self):
+        """
+        Uploads predicted textures to the GPU, until there are none left or
+        config.texture_upload_time has been spent in the current frame.
+        (Textures that are on screen are uploaded when drawn.)
+        """
+
+        count = 0
+        start = time.time()
+
+        # When no frames are being drawn, start a new budget each frame
+        # period.
+        if start - self.texture_upload_start > self.frame_duration:
+            self.texture_upload_time = 0.0
+            self.texture_upload_start = start
+
+        while self.texture_upload_time < renpy.config.texture_upload_time:
+
+            if not renpy.display.draw.ready_one_texture():
+                break
+
+            count += 1
+
+            now = time.time()
+            self.texture_upload_time += now - start
+            start = now
+
+        if count:
+            renpy.plog(2, "uploaded {} predicted textures, {:.1f}ms this frame", count, self.texture_upload_time * 1000)
+
+    def idle_frame(self, can_block, expensive, idle=False):
         """
         Tasks that are run during "idle" frames.
+
+        `idle`
+            True if nothing is changing on the screen, and the interaction
+            is waiting for input.
         """
 
         if expensive:
@@ -2250,12 +2408,16 @@ class Interface(object):
 
             # Step 1: Run gc.
             if step == 1:
-                self.consider_gc()
+                if can_block and expensive:
+                    self.consider_gc()
+                else:
+                    self.consider_gc(self.gc_budget())
+
                 step += 1
 
             # Step 2: Push textures to GPU.
             elif step == 2:
-                renpy.display.draw.ready_one_texture()
+                self.upload_textures()
                 step += 1
 
             # Step 3: Predict more images.
@@ -2265,6 +2427,8 @@ class Interface(object):
                     step += 1
                     continue
 
+                predict_start = renpy.performance.begin()
+
                 try:
                     result = self.prediction_coroutine.send(expensive)
                 except ValueError:
@@ -2272,6 +2436,8 @@ class Interface(object):
                     # ValueError: generator already executing
                     result = None
 
+                renpy.performance.end("predict", predict_start)
+
                 if result is None:
                     self.prediction_coroutine = None
                     step += 1
@@ -2306,6 +2472,10 @@ class Interface(object):
 
                 break
 
+        # Perform a scheduled autosave, if this frame is idle or the
+        # autosave has waited long enough.
+        renpy.loadsave.scheduled_autosave(idle)
+
         if expensive:
             renpy.plog(1, "end idle_frame (expensive)")
         else:
@@ -2833,6 +3003,9 @@ class Interface(object):
                         # If profiling is enabled, report the profile time.
                         if renpy.config.profile or self.profile_once:
 
+                            hits, misses = renpy.display.render.pure_cache_stats()
+                            renpy.plog(0, "pure render cache: {} hits, {} misses", hits, misses)
+
                             renpy.plog(0, "end frame")
                             renpy.performance.analyze()
                             renpy.performance.clear()
@@ -2952,11 +3125,15 @@ class Interface(object):
                 if can_block or (frame >= renpy.config.idle_frame) or (self.force_prediction):
                     expensive = not (needs_redraw or (_redraw_in < .2) or (_timeout_in < .2) or renpy.display.video.playing())
 
+                    # This is checked before prediction is forced, which
+                    # makes every frame expensive.
+                    idle = can_block and expensive and (self.mouse_move is None)
+
                     if self.force_prediction:
                         expensive = True
                         can_block = True
 
-                    self.idle_frame(can_block, expensive)
+                    self.idle_frame(can_block, expensive, idle)
 
                 if needs_redraw or (not can_block) or self.mouse_move or renpy.display.video.playing():
                     renpy.plog(1, "pre peek")
@@ -3196,6 +3373,8 @@ class Interface(object):
 
                 self.event_time = end_time = get_time()
 
+                event_start = renpy.performance.begin()
+
                 try:
 
                     if self.touch:
@@ -3216,6 +3395,12 @@ class Interface(object):
 
                     renpy.plog(1, "finish event handling")
 
+                    renpy.performance.end("event", event_start)
+
+                    # The IgnoreEvent handler below shouldn't time the event
+                    # a second time.
+                    event_start = 0
+
                     if rv is not None:
                         break
 
@@ -3245,6 +3430,9 @@ class Interface(object):
                             raise IgnoreEvent()
 
                 except IgnoreEvent:
+
+                    renpy.performance.end("event", event_start)
+
                     # An ignored event can change the timeout. So we want to
                     # process an TIMEEVENT to ensure that the timeout is
                     # set correctly
@@ -3293,6 +3481,12 @@ class Interface(object):
             pygame.time.set_timer(TIMEEVENT, 0)
             pygame.time.set_timer(REDRAW, 0)
 
+            # Let the headless renderer save a screenshot.
+            end_interaction = getattr(renpy.display.draw, "end_interaction", None)
+
+            if end_interaction is not None:
+                end_interaction()
+
             self.consider_gc()
 
             renpy.game.context().runtime += end_time - start_time
@@ -0,0 +1,344 @@
+# Copyright 2004-2024 Tom Rothamel <pytom@bishoujo.us>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# This file contains the on-disk cache of the surfaces produced by image
+# manipulators, which lets an expensive chain of transformations be
+# skipped when the same image is loaded in a later session.
+
+from __future__ import division, absolute_import, with_statement, print_function, unicode_literals
+from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, round, str, tobytes, unicode # *
+
+import collections
+import hashlib
+import os
+import struct
+import threading
+
+import pygame_sdl2
+import renpy
+
+# The directory, relative to the save directory, the cache is stored in.
+CACHE_DIRECTORY = os.path.join("cache", "images")
+
+# The header of a cache file. This is followed by the width and height of
+# the surface, and then the pixels, in RGBA order, with no padding.
+MAGIC = b"RENPY IMAGE CACHE 1\n"
+HEADER = struct.Struct("<II")
+
+# A lock that protects the index.
+lock = threading.Lock()
+
+# An ordered dict mapping the filenames in the cache directory to their
+# sizes, in bytes. This is in least to most recently used order, and is
+# None until the cache directory has been scanned.
+index = None
+
+# The total size of the files in index.
+index_size = 0
+
+# The path to the cache directory, once it's known to exist.
+directory = None
+
+
+class Unstable(Exception):
+    """
+    Raised when an image's identity includes an object that does not have
+    a repr that is stable between sessions.
+    """
+
+
+def stable_repr(o):
+    """
+    Returns a repr of `o` that will be the same in every session, or raises
+    Unstable if that's not possible.
+    """
+
+    if isinstance(o, renpy.display.im.ImageBase):
+        return "<" + stable_repr(o.identity) + ">"
+
+    if isinstance(o, (tuple, list)):
+        return "(" + ", ".join(stable_repr(i) for i in o) + ")"
+
+    if (o is None) or isinstance(o, (bool, int, float, basestring)):
+        return repr(o)
+
+    raise Unstable()
+
+
+def get_directory():
+    """
+    Returns the path to the cache directory, creating it if it doesn't
+    exist yet, or None if it can't be created.
+    """
+
+    global directory
+
+    if renpy.config.savedir is None:
+        return None
+
+    dn = os.path.join(renpy.config.savedir, CACHE_DIRECTORY)
+
+    if dn == directory:
+        return dn
+
+    try:
+        os.makedirs(dn)
+    except Exception:
+        pass
+
+    if not os.path.isdir(dn):
+        return None
+
+    directory = dn
+    return dn
+
+
+def get_key(image):
+    """
+    Returns the filename the cache entry for `image` is stored in, or None
+    if `image` can't be cached.
+    """
+
+    try:
+        key = stable_repr(image.identity)
+    except Unstable:
+        return None
+
+    sha = hashlib.sha1()
+    sha.update(key.encode("utf-8"))
+    sha.update(repr(image.get_oversample()).encode("utf-8"))
+
+    for fn in image.predict_files():
+
+        # SVGs are rendered at the size of the window.
+        if fn.lower().endswith(".svg"):
+            return None
+
+        sha.update(fn.encode("utf-8"))
+        sha.update(repr(renpy.loader.get_hash(fn)).encode("utf-8"))
+
+    return sha.hexdigest() + ".rgba"
+
+
+def scan():
+    """
+    Builds the index from the contents of the cache directory, if that
+    hasn't been done yet. This must be called with the lock held.
+    """
+
+    global index
+    global index_size
+
+    if index is not None:
+        return
+
+    index = collections.OrderedDict()
+    index_size = 0
+
+    dn = get_directory()
+
+    if dn is None:
+        return
+
+    entries = [ ]
+
+    try:
+        for fn in os.listdir(dn):
+
+            # Remove files left behind by an interrupted write.
+            if fn.endswith(".new"):
+                os.unlink(os.path.join(dn, fn))
+                continue
+
+            if not fn.endswith(".rgba"):
+                continue
+
+            st = os.stat(os.path.join(dn, fn))
+            entries.append((st.st_mtime, fn, st.st_size))
+
+    except Exception:
+        pass
+
+    entries.sort()
+
+    for _mtime, fn, size in entries:
+        index[fn] = size
+        index_size += size
+
+
+def evict():
+    """
+    Removes the least recently used files from the cache until it fits in
+    config.image_disk_cache_size. This must be called with the lock held.
+    """
+
+    global index_size
+
+    dn = get_directory()
+
+    while index and (index_size > renpy.config.image_disk_cache_size):
+        fn, size = index.popitem(last=False)
+        index_size -= size
+
+        try:
+            os.unlink(os.path.join(dn, fn))
+        except Exception:
+            pass
+
+
+def read(fn):
+    """
+    Reads the surface stored in `fn`, or returns None if it can't be read.
+    """
+
+    dn = get_directory()
+
+    if dn is None:
+        return None
+
+    path = os.path.join(dn, fn)
+
+    with lock:
+        scan()
+
+        if fn not in index:
+            return None
+
+        # Mark the file as the most recently used.
+        index[fn] = index.pop(fn)
+
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise Exception("Bad magic.")
+
+            width, height = HEADER.unpack(f.read(HEADER.size))
+            data = f.read()
+
+        if len(data) != width * height * 4:
+            raise Exception("Truncated image cache file.")
+
+        # Record the use in the file, so the order survives a restart.
+        os.utime(path, None)
+
+    except Exception:
+        remove(fn)
+        return None
+
+    surf = renpy.display.pgrender.surface((width, height), True)
+    surf.from_data(data)
+
+    return surf
+
+
+def write(fn, surf):
+    """
+    Writes `surf` to `fn` in the cache.
+    """
+
+    global index_size
+
+    dn = get_directory()
+
+    if dn is None:
+        return
+
+    path = os.path.join(dn, fn)
+    tmp = "{}.{}.new".format(path, id(threading.current_thread()))
+
+    width, height = surf.get_size()
+
+    try:
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(HEADER.pack(width, height))
+            f.write(pygame_sdl2.image.tostring(surf, "RGBA"))
+
+        renpy.loadsave.safe_rename(tmp, path)
+        size = os.path.getsize(path)
+
+    except Exception:
+
+        try:
+            os.unlink(tmp)
+        except Exception:
+            pass
+
+        return
+
+    with lock:
+        scan()
+
+        index_size -= index.pop(fn, 0)
+        index[fn] = size
+        index_size += size
+
+        evict()
+
+
+def remove(fn):
+    """
+    Removes `fn` from the cache.
+    """
+
+    global index_size
+
+    with lock:
+        scan()
+        index_size -= index.pop(fn, 0)
+
+    dn = get_directory()
+
+    if dn is None:
+        return
+
+    try:
+        os.unlink(os.path.join(dn, fn))
+    except Exception:
+        pass
+
+
+def load(image):
+    """
+    Loads `image`, an image manipulator, returning a surface. If the disk
+    cache is enabled and `image` supports it, the surface is read from the
+    cache when possible, and otherwise is stored into it after the image
+    is loaded.
+    """
+
+    if not (renpy.config.image_disk_cache and image.disk_cache):
+        return image.load()
+
+    fn = get_key(image)
+
+    if fn is None:
+        return image.load()
+
+    surf = read(fn)
+
+    if surf is not None:
+        return surf
+
+    surf = image.load()
+    write(fn, surf)
+
+    return surf
+
@@ -305,6 +305,42 @@ class Displayable(renpy.object.Object):
 
         return True
 
+    def _render_key(self):
+        """
+        If this displayable is pure - its render depends only on its
+        contents, its style, and the size it's offered, and not on st, at,
+        or the state of the game - returns a hashable key that's the same
+        for displayables with the same contents, letting them share renders.
+        Otherwise, returns None.
+        """
+
+        return None
+
+    def _reuse_render(self):
+        """
+        Called when a render shared through _render_key is used in place of
+        rendering this displayable. Returns False if the render can't be
+        used, and this displayable has to be rendered.
+        """
+
+        return True
+
+    def _style_key(self):
+        """
+        Returns a hashable key for the contents of this displayable's style,
+        for use by _render_key, or None if one can't be made.
+        """
+
+        style = self.style
+
+        try:
+            rv = (style.name, style.parent, style.prefix, tuple(tuple(sorted(i.items())) for i in style.properties))
+            hash(rv)
+        except Exception:
+            return None
+
+        return rv
+
     def _repr_info(self):
         return None
 
@@ -0,0 +1,175 @@
+# Copyright 2004-2024 Tom Rothamel <pytom@bishoujo.us>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+# This file contains the headless renderer, which draws with the software
+# renderer to an offscreen surface, while time is kept by a virtual clock.
+# It's used to render screenshots and run tests on machines without a
+# display.
+
+from __future__ import division, absolute_import, with_statement, print_function, unicode_literals
+from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, round, str, tobytes, unicode # *
+
+import os
+
+import pygame_sdl2 as pygame
+import renpy
+
+from renpy.display.swdraw import SWDraw, do_draw_screen
+
+# The virtual time when the renderer starts. This is fixed, so runs of
+# the same game produce the same times.
+START_TIME = 1000.0
+
+
+class HeadlessDraw(SWDraw):
+    """
+    This draws to an offscreen surface, without a window, and advances the
+    virtual clock by one frame each time the screen could be redrawn.
+    """
+
+    def reset(self):
+
+        SWDraw.reset(self)
+
+        self.info["renderer"] = "headless"
+
+        # The number of frames drawn.
+        self.frames = 0
+
+        # The number of interactions that have ended.
+        self.interactions = 0
+
+        # Has a frame been drawn since the last interaction ended?
+        self.drawn = False
+
+        # The mouse position, which is only changed by events.
+        self.mouse_pos = (0, 0)
+
+    def init(self, virtual_size):
+
+        self.reset()
+
+        width, height = virtual_size
+
+        # The dummy video driver is used, so this doesn't open a window.
+        self.screen = pygame.display.set_mode((width, height), 0, 32)
+        self.window = self.screen
+
+        renpy.display.pgrender.set_rgba_masks()
+
+        self.draw_per_virt = 1.0
+        self.virt_to_draw = renpy.display.render.Matrix2D(1.0, 0, 0, 1.0)
+        self.draw_to_virt = renpy.display.render.Matrix2D(1.0, 0, 0, 1.0)
+
+        self.full_redraw = True
+        self.fullscreen_surface = self.screen
+
+        args = renpy.game.args
+
+        # The number of frames per second of virtual time.
+        self.framerate = getattr(args, "headless_framerate", None) or 60.0
+
+        # The directories frames and screenshots are saved to, if any.
+        self.frames_dir = getattr(args, "headless_frames", None)
+        self.screenshots_dir = getattr(args, "headless_screenshots", None)
+
+        for i in (self.frames_dir, self.screenshots_dir):
+            if i and not os.path.isdir(i):
+                os.makedirs(i)
+
+        # The number of frames of virtual time that have passed.
+        self.ticks = 0
+        renpy.display.core.virtual_time = START_TIME
+
+        # The file the benchmark report is written to, if benchmarking.
+        self.benchmark = getattr(args, "benchmark", None)
+
+        if self.benchmark:
+            renpy.performance.start_benchmark()
+
+        return True
+
+    def quit(self): # @ReservedAssignment
+        SWDraw.quit(self)
+        renpy.display.core.virtual_time = None
+
+        if self.benchmark:
+            renpy.performance.benchmark_report(self.benchmark)
+
+    def mouse_event(self, ev):
+        self.mouse_pos = getattr(ev, "pos", self.mouse_pos)
+        return self.mouse_pos
+
+    def get_mouse_pos(self):
+        return self.mouse_pos
+
+    def set_mouse_pos(self, x, y):
+        self.mouse_pos = (x, y)
+
+    def can_block(self):
+        return False
+
+    def should_redraw(self, needs_redraw, first_pass, can_block):
+        """
+        Called once per pass through the interaction loop, which takes one
+        frame of virtual time.
+        """
+
+        self.ticks += 1
+        renpy.display.core.virtual_time = START_TIME + self.ticks / self.framerate
+
+        return needs_redraw
+
+    def save(self, directory, name):
+        """
+        Saves the window as `name` in `directory`.
+        """
+
+        renpy.display.scale.image_save_unscaled(self.window, os.path.join(directory, name))
+
+    def draw_screen(self, surftree):
+
+        do_draw_screen(surftree, self.full_redraw, self)
+        self.full_redraw = False
+
+        self.frames += 1
+        self.drawn = True
+
+        if self.frames_dir:
+            self.save(self.frames_dir, "frame-{:06d}.png".format(self.frames))
+
+    def end_interaction(self):
+        """
+        Called when an interaction ends. Saves the last frame drawn.
+        """
+
+        if not self.drawn:
+            return
+
+        self.drawn = False
+        self.interactions += 1
+
+        if self.screenshots_dir:
+            self.save(self.screenshots_dir, "interaction-{:05d}.png".format(self.interactions))
+
+    def event_peek_sleep(self):
+        return
@@ -28,11 +28,14 @@ from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, r
 
 
 
+import collections
+import heapq
 import math
 import zipfile
 import threading
 import time
 import io
+import json
 import os.path
 
 import pygame_sdl2
@@ -64,13 +67,126 @@ class CacheEntry(object):
         # The time when this cache entry was last used.
         self.time = 0
 
+        # True if this entry was loaded by prediction, and hasn't been
+        # used to draw an image yet.
+        self.predicted = False
+
+        # The number of bytes of main memory used by surf, and of texture
+        # memory used by texture.
+        self.surf_bytes = 0
+        self.texture_bytes = 0
+
+        self.update_bytes()
+
     def size(self):
-        if renpy.config.cache_surfaces:
-            multiplier = 2.34 # 1 for the texture, 1 for the surface, .34 for mipmaps.
+        """
+        Returns the number of bytes of memory used by this entry.
+        """
+
+        return self.surf_bytes + self.texture_bytes
+
+    def update_bytes(self):
+        """
+        Updates surf_bytes and texture_bytes to reflect the current surface
+        and texture.
+        """
+
+        if self.surf is not None:
+            self.surf_bytes = self.surf.get_pitch() * self.surf.get_height()
         else:
-            multiplier = 1.34 # 1 for the texture, .34 for mipmaps.
+            self.surf_bytes = 0
+
+        if self.texture is None:
+            self.texture_bytes = 0
+            return
+
+        get_texture_bytes = getattr(renpy.display.draw, "get_texture_bytes", None)
+
+        if get_texture_bytes is not None:
+            self.texture_bytes = get_texture_bytes(self.texture)
+        else:
+            # Estimate the size of a texture with mipmaps.
+            self.texture_bytes = int(self.bounds[2] * self.bounds[3] * 4 * 1.34)
+
+
+class CacheStats(object):
+    """
+    Counters that describe how well the image cache is working. These
+    count up from when the game starts.
+    """
+
+    # The maximum number of decodes kept between calls to take_decodes.
+    DECODES = 100
+
+    def __init__(self):
+
+        # The number of images drawn using an entry already in the cache.
+        self.hits = 0
+
+        # The number of those hits that used an entry loaded by prediction.
+        self.predicted_hits = 0
+
+        # The number of images that had to be loaded to be drawn.
+        self.misses = 0
+
+        # The number of images loaded by prediction.
+        self.preloads = 0
+
+        # The number of entries evicted to make room for newer ones, and
+        # their size in bytes.
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+        # The number of predicted images that were not loaded because the
+        # cache was full.
+        self.overfull = 0
+
+        # The total time spent loading images, in seconds.
+        self.decode_time = 0.0
+
+        # A list of (image, seconds, predict) tuples for the most recently
+        # loaded images.
+        self.decodes = [ ]
+
+    def decoded(self, image, seconds, predict):
+        """
+        Records that `image` took `seconds` to load.
+        """
+
+        self.decode_time += seconds
+
+        if predict:
+            self.preloads += 1
+        else:
+            self.misses += 1
+
+        if len(self.decodes) < self.DECODES:
+            self.decodes.append((image, seconds, predict))
 
-        return int(self.bounds[2] * self.bounds[3] * multiplier)
+    def take_decodes(self):
+        """
+        Returns the images loaded since this was last called.
+        """
+
+        rv = self.decodes
+        self.decodes = [ ]
+        return rv
+
+    def as_dict(self):
+
+        loads = self.misses + self.preloads
+
+        return {
+            "hits" : self.hits,
+            "predicted_hits" : self.predicted_hits,
+            "misses" : self.misses,
+            "preloads" : self.preloads,
+            "evictions" : self.evictions,
+            "evicted_bytes" : self.evicted_bytes,
+            "overfull" : self.overfull,
+            "decode_time" : self.decode_time,
+            "mean_decode_time" : (self.decode_time / loads) if loads else 0.0,
+            }
 
 
 # This is the singleton image cache.
@@ -84,15 +200,29 @@ class Cache(object):
         # interaction.)
         self.time = 0
 
-        # A map from Image object to CacheEntry.
-        self.cache = { }
+        # A map from Image object to CacheEntry. This is ordered from least
+        # to most recently used, so the entries are in order of CacheEntry.time.
+        self.cache = collections.OrderedDict()
 
-        # The size of all entries in the cache, in pixels.
+        # The size of all entries in the cache, in bytes.
         self.cache_size = 0
 
-        # A list of Image objects that we want to preload.
+        # The size of the surfaces and textures in the cache, in bytes.
+        self.surf_size = 0
+        self.texture_size = 0
+
+        # A map from a time to the size of the entries with that time.
+        self.generation_size = { }
+
+        # A heap of (priority, serial, image) tuples, giving the images we
+        # want to preload. The images with the lowest priority - the ones
+        # we expect to need soonest - are loaded first.
         self.preloads = [ ]
 
+        # A counter used to keep images with the same priority in the order
+        # they were predicted.
+        self.preload_serial = 0
+
         # False if this is not the first preload in this tick.
         self.first_preload_in_tick = True
 
@@ -102,25 +232,42 @@ class Cache(object):
         # A lock that must be held to notify the preload thread.
         self.preload_lock = threading.Condition()
 
+        # A lock that is held while a surface is being turned into a
+        # texture, as the draw objects expect that to happen on one
+        # thread at a time.
+        self.texture_lock = threading.Lock()
+
         # Is the preload_thread alive?
         self.keep_preloading = True
 
         # Images that we tried, and failed, to preload.
         self.preload_blacklist = set()
 
-        # The size of the cache, in pixels.
+        # The size of the cache, in bytes.
         self.cache_limit = 0
 
-        # The preload thread.
+        # If not None, limits on the size of the surfaces and textures in
+        # the cache, in bytes.
+        self.surf_limit = None
+        self.texture_limit = None
+
+        # The preload threads. These decode images in parallel, while the
+        # textures are uploaded to the GPU by the main thread.
+        self.preload_threads = [ ]
+
         if not renpy.emscripten:
-            self.preload_thread = threading.Thread(target=self.preload_thread_main, name="preloader")
-            self.preload_thread.daemon = True
-            self.preload_thread.start()
-        else:
-            self.preload_thread = None
+            self.start_preload_threads(1)
+
+        # A map from images that have been used or predicted this tick to
+        # their priority. Images that are displayed have priority 0.
+        self.added = { }
 
-        # Have we been added this tick?
-        self.added = set()
+        # Counters describing the activity of the cache.
+        self.stats = CacheStats()
+
+        # The file the statistics are logged to, None if it hasn't been
+        # opened yet, or False if it couldn't be opened.
+        self.stats_log = None
 
         # A list of (time, filename, preload) tuples. This is updated when
         # config.developer is True and an image is loaded. Preload is a
@@ -142,7 +289,7 @@ class Cache(object):
     def get_total_size(self):
         """
         Returns the total size of the surfaces and textures that make up the
-        cache, in pixels.
+        cache, in bytes.
         """
 
         with self.lock:
@@ -157,10 +304,64 @@ class Cache(object):
         start = self.time - generations
 
         with self.lock:
-            rv = sum(i.size() for i in self.cache.values() if i.time > start)
+            rv = sum(v for k, v in self.generation_size.items() if k > start)
 
         return rv
 
+    def add_generation_size(self, time, size):
+        """
+        Adds `size` (which may be negative) to the size of the generation
+        with `time`.
+        """
+
+        rv = self.generation_size.get(time, 0) + size
+
+        if rv:
+            self.generation_size[time] = rv
+        else:
+            self.generation_size.pop(time, None)
+
+    def touch(self, ce):
+        """
+        Moves `ce` into the current generation, making it the most
+        recently used entry in the cache.
+        """
+
+        if ce.time == self.time:
+            return
+
+        with self.lock:
+
+            if self.cache.get(ce.what, None) is not ce:
+                ce.time = self.time
+                return
+
+            size = ce.size()
+
+            self.add_generation_size(ce.time, -size)
+            self.add_generation_size(self.time, size)
+
+            ce.time = self.time
+
+            # Move the entry to the end of the cache. On Python 2, this
+            # briefly removes it, so find_entry takes the lock.
+            if PY2:
+                self.cache[ce.what] = self.cache.pop(ce.what)
+            else:
+                self.cache.move_to_end(ce.what)
+
+    def find_entry(self, image):
+        """
+        Returns the cache entry for `image`, or None if it's not in the
+        cache. This can be called without holding the lock.
+        """
+
+        if PY2:
+            with self.lock:
+                return self.cache.get(image, None)
+
+        return self.cache.get(image, None)
+
     def init(self):
         """
         Updates the cache object to make use of settings that might be provided
@@ -168,22 +369,44 @@ class Cache(object):
         """
 
         if renpy.config.image_cache_size is not None:
-            self.cache_limit = 2 * renpy.config.image_cache_size * renpy.config.screen_width * renpy.config.screen_height
+            self.cache_limit = 8 * renpy.config.image_cache_size * renpy.config.screen_width * renpy.config.screen_height
         else:
-            self.cache_limit = int(renpy.config.image_cache_size_mb * 1024 * 1024 // 4)
+            self.cache_limit = int(renpy.config.image_cache_size_mb * 1024 * 1024)
+
+        self.surf_limit = renpy.config.image_cache_surface_bytes
+        self.texture_limit = renpy.config.image_cache_texture_bytes
+
+        if not renpy.emscripten:
+            self.start_preload_threads(get_preload_threads())
+
+    def start_preload_threads(self, count):
+        """
+        Starts preload threads until there are `count` of them running.
+        """
+
+        self.keep_preloading = True
+
+        while len(self.preload_threads) < count:
+            t = threading.Thread(target=self.preload_thread_main, name="preloader-{}".format(len(self.preload_threads)))
+            t.daemon = True
+            t.start()
+
+            self.preload_threads.append(t)
 
     def quit(self): # @ReservedAssignment
-        if not self.preload_thread:
-            return
 
-        if not self.preload_thread.is_alive():
+        threads = [ i for i in self.preload_threads if i.is_alive() ]
+        self.preload_threads = [ ]
+
+        if not threads:
             return
 
         with self.preload_lock:
             self.keep_preloading = False
-            self.preload_lock.notify()
+            self.preload_lock.notify_all()
 
-        self.preload_thread.join()
+        for t in threads:
+            t.join()
 
         self.clear()
 
@@ -192,10 +415,13 @@ class Cache(object):
 
         self.lock.acquire()
 
-        self.preloads = [ ]
+        del self.preloads[:]
 
-        self.cache = { }
+        self.cache = collections.OrderedDict()
         self.cache_size = 0
+        self.surf_size = 0
+        self.texture_size = 0
+        self.generation_size = { }
 
         self.first_preload_in_tick = True
 
@@ -223,21 +449,72 @@ class Cache(object):
     # preloaded.
     def tick(self):
 
+        if renpy.config.image_cache_stats_log:
+            self.log_stats()
+
         with self.lock:
             self.time += 1
-            self.preloads = [ ]
+            del self.preloads[:]
             self.first_preload_in_tick = True
             self.added.clear()
 
+        renpy.loader.clear_readahead(data=False)
+
         if renpy.config.debug_image_cache:
             renpy.display.ic_log.write("----")
             filename, line = renpy.exports.get_filename_line()
             renpy.display.ic_log.write("%s %d", filename, line)
 
+    def log_stats(self):
+        """
+        Appends a line of JSON describing the cache's activity during the
+        interaction that just ended to image_cache_stats.jsonl, in the
+        log directory.
+        """
+
+        if self.stats_log is None:
+
+            self.stats_log = False
+
+            if renpy.config.logdir is None:
+                return
+
+            try:
+                fn = os.path.join(renpy.config.logdir, "image_cache_stats.jsonl")
+                self.stats_log = io.open(fn, "a", encoding="utf-8")
+            except Exception:
+                return
+
+        if not self.stats_log:
+            return
+
+        with self.lock:
+            d = self.stats.as_dict()
+            decodes = self.stats.take_decodes()
+
+        d["time"] = time.time()
+        d["tick"] = self.time
+        d["variants"] = list(renpy.config.variants)
+        d["image_cache_size_mb"] = renpy.config.image_cache_size_mb
+        d["cache_bytes"] = self.get_total_size()
+        d["cache_limit_bytes"] = self.cache_limit
+        d["surface_bytes"] = self.surf_size
+        d["texture_bytes"] = self.texture_size
+
+        d["decodes"] = [ {
+            "type" : type(image).__name__,
+            "files" : image.predict_files(),
+            "seconds" : seconds,
+            "predict" : predict,
+            } for image, seconds, predict in decodes ]
+
+        self.stats_log.write(str(json.dumps(d)) + "\n")
+        self.stats_log.flush()
+
     # The preload thread can deal with this update, so we don't need
     # to lock things.
     def end_tick(self):
-        self.preloads = [ ]
+        del self.preloads[:]
 
     # This returns the pygame surface corresponding to the provided
     # image. It also takes care of updating the age of images in the
@@ -274,28 +551,31 @@ class Cache(object):
         if render:
             texture = True
 
-        optimize_bounds = renpy.config.optimize_texture_bounds and image.optimize_bounds
-
         if not isinstance(image, ImageBase):
             raise Exception("Expected an image of some sort, but got" + repr(image) + ".")
 
+        if (not predict) and renpy.display.predictprofile.recording:
+            renpy.display.predictprofile.record_image(image)
+
         if not image.cache:
             surf = image.load()
             renpy.display.render.mutated_surface(surf)
             return surf
 
         # First try to grab the image out of the cache without locking it.
-        ce = self.cache.get(image, None)
+        ce = self.find_entry(image)
 
         if ce is not None:
 
-            ce.time = self.time
+            self.touch(ce)
 
             if texture and (ce.texture is not None):
 
                 if predict:
                     return None
 
+                self.count_hit(ce)
+
                 if render:
                     return make_render(ce)
                 else:
@@ -303,51 +583,16 @@ class Cache(object):
 
             if ce.surf is None:
                 ce = None
+            elif not predict:
+                self.count_hit(ce)
 
         # Otherwise, we load the image ourselves.
         if ce is None:
-
-            if not predict:
-                with renpy.game.ExceptionInfo("While loading %r:", image):
-                    surf = image.load()
-            else:
-                surf = image.load()
-
-            w, h = size = surf.get_size()
-
-            if optimize_bounds:
-                bounds = tuple(surf.get_bounding_rect())
-                bounds = expand_bounds(bounds, size, renpy.config.expand_texture_bounds)
-
-                if image.oversample > 1:
-                    bounds = ensure_bounds_divide_evenly(bounds, image.oversample)
-
-                w = bounds[2]
-                h = bounds[3]
-            else:
-                bounds = (0, 0, w, h)
-
-            with self.lock:
-
-                ce = CacheEntry(image, surf, bounds)
-
-                if image in self.cache:
-                    self.kill(self.cache[image])
-
-                self.cache[image] = ce
-                self.cache_size += ce.size()
-
-                if renpy.config.debug_image_cache:
-                    if predict:
-                        renpy.display.ic_log.write("Added %r (%.02f%%)", ce.what, 100.0 * self.get_total_size() / self.cache_limit)
-                    else:
-                        renpy.display.ic_log.write("Total Miss %r", ce.what)
-
-            renpy.display.render.mutated_surface(ce.surf)
+            ce = self.load_entry(image, predict)
 
         # Move it into the current generation.
 
-        ce.time = self.time
+        self.touch(ce)
 
         # Load the texture.
 
@@ -361,13 +606,12 @@ class Cache(object):
                     texsurf = ce.surf.subsurface(ce.bounds)
                     renpy.display.render.mutated_surface(texsurf)
 
-                ce.texture = renpy.display.draw.load_texture(texsurf)
+                with self.texture_lock:
+                    ce.texture = renpy.display.draw.load_texture(texsurf)
 
-                # This was loaded while predicting images for immediate use,
-                # so get it onto the GPU.
-                if not predict and renpy.display.draw is not None:
-                    while renpy.display.draw.ready_one_texture():
-                        pass
+                # The texture is uploaded to the GPU when it's drawn, and
+                # predicted textures are uploaded during idle frames, so
+                # there's no need to force uploads here.
 
             if not predict:
                 rv = ce.texture
@@ -383,6 +627,9 @@ class Cache(object):
 
             ce.surf = None
 
+        # The texture may have been loaded, or the surface dropped.
+        self.update_size(ce)
+
         if texture and render and not predict:
             return make_render(ce)
 
@@ -392,6 +639,171 @@ class Cache(object):
 
         return rv
 
+    def load_entry(self, image, predict):
+        """
+        Loads `image` from disk, and adds a CacheEntry containing the
+        resulting surface to the cache. Returns the new CacheEntry.
+        """
+
+        optimize_bounds = renpy.config.optimize_texture_bounds and image.optimize_bounds
+
+        start = time.time()
+
+        if not predict:
+            with renpy.game.ExceptionInfo("While loading %r:", image):
+                surf = renpy.display.diskcache.load(image)
+        else:
+            surf = renpy.display.diskcache.load(image)
+
+        w, h = size = surf.get_size()
+
+        if optimize_bounds:
+            bounds = tuple(surf.get_bounding_rect())
+            bounds = expand_bounds(bounds, size, renpy.config.expand_texture_bounds)
+
+            if image.oversample > 1:
+                bounds = ensure_bounds_divide_evenly(bounds, image.oversample)
+
+            w = bounds[2]
+            h = bounds[3]
+        else:
+            bounds = (0, 0, w, h)
+
+        with self.lock:
+
+            self.stats.decoded(image, time.time() - start, predict)
+
+            ce = CacheEntry(image, surf, bounds)
+            ce.time = self.time
+            ce.predicted = predict
+
+            if image in self.cache:
+                self.kill(self.cache[image])
+
+            self.cache[image] = ce
+            self.add_size(ce, 1)
+
+            if renpy.config.debug_image_cache:
+                if predict:
+                    renpy.display.ic_log.write("Added %r (%.02f%%)", ce.what, 100.0 * self.get_total_size() / self.cache_limit)
+                else:
+                    renpy.display.ic_log.write("Total Miss %r", ce.what)
+
+        renpy.display.render.mutated_surface(ce.surf)
+
+        return ce
+
+    def preload_surface(self, image):
+        """
+        Loads `image` into the cache as a surface, without creating a
+        texture. Unlike the other methods, this is safe to call from any
+        thread - the texture is created when the image is first drawn.
+        """
+
+        if not isinstance(image, ImageBase):
+            return
+
+        if not image.cache:
+            return
+
+        if self.find_entry(image) is not None:
+            return
+
+        if image in self.preload_blacklist:
+            return
+
+        try:
+            self.load_entry(image, True)
+        except Exception:
+            self.preload_blacklist.add(image)
+
+    def reuse(self, image):
+        """
+        Records a use of `image` when a render of it is reused, rather than
+        being returned by get. Returns False if the image's texture is no
+        longer in the cache, so the image has to be rendered again.
+        """
+
+        if renpy.display.predictprofile.recording:
+            renpy.display.predictprofile.record_image(image)
+
+        if not image.cache:
+            return True
+
+        ce = self.find_entry(image)
+
+        if (ce is None) or (ce.texture is None):
+            return False
+
+        self.touch(ce)
+        self.count_hit(ce)
+
+        return True
+
+    def count_hit(self, ce):
+        """
+        Records that `ce` was used to draw an image without being loaded.
+        """
+
+        self.stats.hits += 1
+
+        if ce.predicted:
+            self.stats.predicted_hits += 1
+            ce.predicted = False
+
+    def evict(self, ce):
+        """
+        Kills `ce` to make room in the cache.
+        """
+
+        self.stats.evictions += 1
+        self.stats.evicted_bytes += ce.size()
+
+        self.kill(ce)
+
+    def add_size(self, ce, sign):
+        """
+        Adds the size of `ce` to the sizes of the cache if `sign` is 1, or
+        removes it if `sign` is -1. This must be called with the lock held.
+        """
+
+        self.cache_size += sign * ce.size()
+        self.surf_size += sign * ce.surf_bytes
+        self.texture_size += sign * ce.texture_bytes
+        self.add_generation_size(ce.time, sign * ce.size())
+
+    def update_size(self, ce):
+        """
+        Called when the surface or texture of `ce` changes, to update the
+        sizes of `ce` and the cache.
+        """
+
+        with self.lock:
+
+            if self.cache.get(ce.what, None) is not ce:
+                ce.update_bytes()
+                return
+
+            self.add_size(ce, -1)
+            ce.update_bytes()
+            self.add_size(ce, 1)
+
+    def over_limit(self):
+        """
+        Returns True if the cache is bigger than any of its limits.
+        """
+
+        if self.cache_size > self.cache_limit:
+            return True
+
+        if (self.surf_limit is not None) and (self.surf_size > self.surf_limit):
+            return True
+
+        if (self.texture_limit is not None) and (self.texture_size > self.texture_limit):
+            return True
+
+        return False
+
     # This kills off a given cache entry.
     def kill(self, ce):
 
@@ -399,42 +811,83 @@ class Cache(object):
         if ce.surf is not None:
             renpy.display.draw.mutated_surface(ce.surf)
 
-        self.cache_size -= ce.size()
+        self.add_size(ce, -1)
         del self.cache[ce.what]
 
         if renpy.config.debug_image_cache:
             renpy.display.ic_log.write("Removed %r", ce.what)
 
-    def cleanout(self):
+    def cleanout(self, priority=None):
         """
         Cleans out the cache, if it's gotten too large. Returns True
-        if the cache is smaller than the size limit, or False if it's
+        if the cache is within its size limits, or False if it's
         bigger and we don't want to continue preloading.
+
+        `priority`
+            If not None, the priority of an image that is about to be
+            preloaded. Images predicted this tick with a higher priority
+            may be removed to make room for it.
         """
 
         # If we're within the limit, return.
-        if self.get_total_size() <= self.cache_limit:
-            return True
+        with self.lock:
+            if not self.over_limit():
+                return True
 
         # If we're outside the cache limit, we need to go and start
-        # killing off some of the entries until we're back inside it.
+        # killing off some of the entries until we're back inside it. The
+        # least recently used entries are at the start of the cache.
 
-        for ce in sorted(self.cache.values(), key=lambda a : a.time):
+        with self.lock:
 
-            if ce.time == self.time:
-                # If we're bigger than the limit, and there's nothing
-                # to remove, we should stop the preloading right away.
-                return False
+            while self.cache and self.over_limit():
 
-            # Otherwise, kill off the given cache entry.
-            self.kill(ce)
+                ce = next(iter(self.cache.values()))
 
-            # If we're in the limit, we're done.
-            if self.get_total_size() <= self.cache_limit:
-                break
+                if ce.time == self.time:
+                    # If we're bigger than the limit, and there's nothing
+                    # to remove, we should stop the preloading right away.
+                    return self.kill_further(priority)
+
+                # Otherwise, kill off the given cache entry.
+                self.evict(ce)
 
         return True
 
+    def kill_further(self, priority):
+        """
+        Removes entries in the current generation that were predicted to
+        be needed later than `priority`, furthest first, until the cache is
+        within its limits. Returns True if it is, False otherwise.
+
+        This must be called with the lock held.
+        """
+
+        if priority is None:
+            return False
+
+        further = [ ]
+
+        # The current generation is at the end of the cache.
+        for ce in reversed(self.cache.values()):
+            if ce.time != self.time:
+                break
+
+            ce_priority = self.added.get(ce.what, 0)
+
+            if ce_priority > priority:
+                further.append((ce_priority, ce))
+
+        further.sort(key=lambda i : i[0], reverse=True)
+
+        for _priority, ce in further:
+            if not self.over_limit():
+                break
+
+            self.evict(ce)
+
+        return not self.over_limit()
+
     def flush_file(self, fn):
         """
         This flushes all cache entries that refer to `fn` from the cache.
@@ -449,6 +902,8 @@ class Cache(object):
         for ce in to_flush:
             self.kill(ce)
 
+        renpy.loader.clear_readahead()
+
         if to_flush:
             renpy.display.render.free_memory()
 
@@ -469,29 +924,50 @@ class Cache(object):
         self.get(im, texture=True)
 
     # Called to report that a given image would like to be preloaded.
-    def preload_image(self, im):
+    def preload_image(self, im, priority=None):
+        """
+        Called to report that `im` would like to be preloaded. `priority`
+        is the expected distance until the image is needed, and defaults
+        to the priority of the prediction in progress.
+        """
 
         if not isinstance(im, ImageBase):
             return
 
+        if priority is None:
+            priority = renpy.display.predict.priority
+
         with self.lock:
 
-            if im in self.added:
+            old_priority = self.added.get(im, None)
+
+            if (old_priority is not None) and (old_priority <= priority):
                 return
 
-            self.added.add(im)
+            self.added[im] = priority
 
             ce = self.cache.get(im, None)
 
             if ce and ce.texture:
-                ce.time = self.time
+                self.touch(ce)
                 in_cache = True
             else:
-                self.preloads.append(im)
+                # An image that's already queued is queued again at the
+                # new priority, and the old entry is skipped when popped.
+                heapq.heappush(self.preloads, (priority, self.preload_serial, im))
+                self.preload_serial += 1
                 in_cache = False
 
         if not in_cache:
 
+            # Start reading the files the image needs, so the preload
+            # thread doesn't have to wait on storage.
+            try:
+                for fn in im.predict_files():
+                    renpy.loader.readahead(fn, "images", priority)
+            except Exception:
+                pass
+
             with self.preload_lock:
                 self.preload_lock.notify()
 
@@ -518,34 +994,50 @@ class Cache(object):
             self.preload_thread_pass()
 
     def preload_thread_pass(self):
+        """
+        Preloads images until there are none left. This may be run by
+        several threads at once, with each taking the next image.
+        """
 
-        while self.preloads and self.keep_preloading:
+        while self.keep_preloading:
 
             # If the size of the current generation is bigger than the
             # total cache size, stop preloading.
             with self.lock:
 
-                # If the cache is overfull, clean it out.
-                if not self.cleanout():
+                if not self.preloads:
+                    break
+
+                priority = self.preloads[0][0]
+
+                # If the cache is overfull, clean it out. Since the
+                # preloads are in priority order, the ones we drop are
+                # the ones expected to be needed last.
+                if not self.cleanout(priority):
+
+                    self.stats.overfull += sum(1 for p, _s, i in self.preloads if self.added.get(i, None) == p)
 
                     if renpy.config.debug_image_cache:
-                        for i in self.preloads:
+                        for _priority, _serial, i in sorted(self.preloads):
                             renpy.display.ic_log.write("Overfull %r", i)
 
-                    self.preloads = [ ]
+                    del self.preloads[:]
 
                     break
 
-            try:
-                image = self.preloads.pop(0)
+                priority, _serial, image = heapq.heappop(self.preloads)
+
+                # Skip images that were queued again at a lower priority.
+                if self.added.get(image, None) != priority:
+                    continue
 
-                if image not in self.preload_blacklist:
-                    try:
-                        self.preload_texture(image)
-                    except Exception:
-                        self.preload_blacklist.add(image)
+            if image in self.preload_blacklist:
+                continue
+
+            try:
+                self.preload_texture(image)
             except Exception:
-                pass
+                self.preload_blacklist.add(image)
 
         with self.lock:
             self.cleanout()
@@ -555,7 +1047,7 @@ class Cache(object):
         if not renpy.config.developer:
             return
 
-        preload = (threading.current_thread() is self.preload_thread)
+        preload = (threading.current_thread() in self.preload_threads)
 
         self.load_log.insert(0, (time.time(), filename, preload))
 
@@ -563,6 +1055,24 @@ class Cache(object):
             self.load_log.pop()
 
 
+def get_preload_threads():
+    """
+    Returns the number of preload threads that should be used.
+    """
+
+    rv = renpy.config.image_cache_preload_threads
+
+    if rv is None:
+
+        if renpy.mobile:
+            rv = 1
+        else:
+            cpu_count = getattr(os, "cpu_count", lambda : 1)() or 1
+            rv = min(4, max(1, cpu_count - 1))
+
+    return max(1, rv)
+
+
 # The cache object.
 cache = Cache()
 
@@ -590,6 +1100,11 @@ class ImageBase(renpy.display.displayable.Displayable):
     # If the image failed to load, a placeholder used to report the error.
     fail = None
 
+    # True if the result of load can be stored in the disk cache. This is
+    # set by manipulators that transform other images, as the result is
+    # a deterministic function of their identity and source files.
+    disk_cache = False
+
     def after_upgrade(self, version):
         if version < 1:
             self.cache = True
@@ -619,6 +1134,15 @@ class ImageBase(renpy.display.displayable.Displayable):
 
         return self.identity == other.identity
 
+    def _render_key(self):
+        if self.fail is not None:
+            return None
+
+        return (ImageBase, self.identity, self.oversample)
+
+    def _reuse_render(self):
+        return cache.reuse(self)
+
     def load(self): # type:() -> pygame_sdl2.Surface
         """
         This function is called by the image cache code to cause this
@@ -872,6 +1396,8 @@ class Composite(ImageBase):
 
     """
 
+    disk_cache = True
+
     def __init__(self, size, *args, **properties):
 
         super(Composite, self).__init__(size, *args, **properties)
@@ -936,6 +1462,8 @@ class Scale(ImageBase):
         image logo scale = im.Scale("logo.png", 100, 150)
     """
 
+    disk_cache = True
+
     def __init__(self, im, width, height, bilinear=True, **properties):
 
         im = image(im)
@@ -994,6 +1522,8 @@ class FactorScale(ImageBase):
         :tpref:`xzoom` and :tpref:`yzoom` transform properties.
     """
 
+    disk_cache = True
+
     def __init__(self, im, width, height=None, bilinear=True, **properties):
 
         if height is None:
@@ -1056,6 +1586,8 @@ class Flip(ImageBase):
         or :tpref:`yzoom` (for vertical flip) to a negative value.
     """
 
+    disk_cache = True
+
     def __init__(self, im, horizontal=False, vertical=False, **properties):
 
         if not (horizontal or vertical):
@@ -1093,6 +1625,8 @@ class Rotozoom(ImageBase):
     This is an image manipulator that is a smooth rotation and zoom of another image manipulator.
     """
 
+    disk_cache = True
+
     def __init__(self, im, angle, zoom, **properties):
         """
         @param im: The image to be rotozoomed.
@@ -1147,6 +1681,8 @@ class Crop(ImageBase):
         Use the :tpref:`crop` transform property.
     """
 
+    disk_cache = True
+
     def __init__(self, im, x, y=None, w=None, h=None, **properties):
 
         im = image(im)
@@ -1211,6 +1747,8 @@ class Map(ImageBase):
     is used for the mapped pixel component.
     """
 
+    disk_cache = True
+
     def __init__(self, im, rmap=identity, gmap=identity, bmap=identity,
                  amap=identity, force_alpha=False, **properties):
 
@@ -1255,6 +1793,8 @@ class Twocolor(ImageBase):
     color's alpha is ignored.
     """
 
+    disk_cache = True
+
     def __init__(self, im, white, black, force_alpha=False, **properties):
 
         white = renpy.easy.color(white)
@@ -1296,6 +1836,8 @@ class Recolor(ImageBase):
     linearly between 0 and the supplied color.
     """
 
+    disk_cache = True
+
     def __init__(self, im, rmul=255, gmul=255, bmul=255,
                  amul=255, force_alpha=False, **properties):
 
@@ -1348,6 +1890,8 @@ class Blur(ImageBase):
         Use the :tpref:`blur` transform property.
     """
 
+    disk_cache = True
+
     def __init__(self, im, xrad, yrad=None, **properties):
 
         im = image(im)
@@ -1413,6 +1957,8 @@ class MatrixColor(ImageBase):
         See :func:`Transform` and :tpref:`matrixcolor`.
     """
 
+    disk_cache = True
+
     def __init__(self, im, matrix, **properties):
 
         im = image(im)
@@ -1857,6 +2403,8 @@ class Tile(ImageBase):
         Use :func:`Tile(im, xysize=size, **properties) <Tile>`.
     """
 
+    disk_cache = True
+
     def __init__(self, im, size=None, **properties):
 
         im = image(im)
@@ -1916,6 +2464,8 @@ class AlphaMask(ImageBase):
     The two images need to have the same size, and the same oversampling factor.
     """
 
+    disk_cache = True
+
     def __init__(self, base, mask, **properties):
         super(AlphaMask, self).__init__(base, mask, **properties)
 
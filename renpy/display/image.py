@@ -838,6 +838,14 @@ class ShownImageInfo(renpy.object.Object):
                     self.attributes[layer, tag] = self.images[layer][tag][1:] # type: ignore
                     self.shown.add((layer, tag))
 
+    def signature(self):
+        """
+        Returns a hashable object that is equal for two ShownImageInfos
+        with the same state.
+        """
+
+        return (frozenset(self.attributes.items()), frozenset(self.shown))
+
     def get_attributes(self, layer, tag, default=()):
         """
         Get the attributes associated the image with tag on the given
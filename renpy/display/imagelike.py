@@ -61,6 +61,14 @@ class Solid(renpy.display.displayable.Displayable):
 
         return (self.color == o.color)
 
+    def _render_key(self):
+        style = self._style_key()
+
+        if style is None:
+            return None
+
+        return (Solid, self.color, style)
+
     def visit(self):
         return [ ]
 
@@ -274,6 +282,21 @@ class Frame(renpy.display.displayable.Displayable):
 
         return True
 
+    def _render_key(self):
+        image = self.style.child or self.image
+
+        child = image._render_key()
+        style = self._style_key()
+
+        if (child is None) or (style is None):
+            return None
+
+        return (Frame, child, self.left, self.top, self.right, self.bottom, self.tile, self.tile_ratio, style)
+
+    def _reuse_render(self):
+        image = self.style.child or self.image
+        return image._reuse_render()
+
     def render(self, width, height, st, at):
 
         width = max(self.style.xminimum, width)
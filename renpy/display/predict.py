@@ -43,6 +43,31 @@ predicting = False
 # like to predict.
 screens = [ ]
 
+# A map from screen name to the priority at which it was first predicted.
+screen_priority = { }
+
+# The priority of the images being predicted. This is roughly the number
+# of statements we expect to pass before the images are needed, with
+# lower priorities being loaded first and evicted last.
+priority = 0
+
+# The priority given to images predicted by the current statement, or
+# needed right away.
+PRIORITY_NOW = 0
+
+# The priority given to things that happen after the next click, like
+# returning from a context or running an action.
+PRIORITY_CLICK = 1
+
+# The amount added to the priority of images in screens, as those
+# may never be shown, or shown well after they are predicted.
+SCREEN_PENALTY = 2
+
+# When not None, a list that the displayables and screens predicted are
+# appended to, so the prediction of a statement can be replayed without
+# running the statement's predict method again.
+recording = None
+
 
 def displayable(d):
     """
@@ -52,6 +77,9 @@ def displayable(d):
     if d is None:
         return
 
+    if recording is not None:
+        recording.append((d, None, None))
+
     if d not in predicted:
         predicted.add(d)
         d.visit_all(lambda i : i.predict_one())
@@ -63,14 +91,35 @@ def screen(_screen_name, *args, **kwargs):
     with the given arguments.
     """
 
+    if recording is not None:
+        recording.append((_screen_name, args, kwargs))
+
     screens.append((_screen_name, args, kwargs))
+    screen_priority.setdefault(_screen_name, priority)
+
+
+def replay(log):
+    """
+    Predicts the displayables and screens in `log`, a list filled in while
+    `recording` was set.
+    """
+
+    for what, args, kwargs in log:
+        if args is None:
+            displayable(what)
+        else:
+            screen(what, *args, **kwargs)
 
 
 def reset():
     global image
+    global priority
+
     image = renpy.display.im.cache.get_texture
+    priority = PRIORITY_NOW
     predicted.clear()
     del screens[:]
+    screen_priority.clear()
 
 
 def prediction_coroutine(root_widget):
@@ -88,6 +137,7 @@ def prediction_coroutine(root_widget):
     """
 
     global predicting
+    global priority
 
     # Start the prediction thread (to clean out the cache).
     renpy.display.im.cache.start_prediction()
@@ -100,6 +150,7 @@ def prediction_coroutine(root_widget):
     image = renpy.display.im.cache.preload_image
 
     predicting = True
+    priority = PRIORITY_NOW
 
     # Predict displayables given to renpy.start_predict.
     for d in renpy.store._predict_set:
@@ -110,7 +161,7 @@ def prediction_coroutine(root_widget):
         predicting = True
 
     # Predict images that are going to be reached in the next few
-    # clicks.
+    # clicks. This updates priority as it goes.
 
     for _i in renpy.game.context().predict():
 
@@ -122,6 +173,8 @@ def prediction_coroutine(root_widget):
     # shortly. Otherwise, call the functions in
     # config.predict_callbacks.
 
+    priority = PRIORITY_CLICK
+
     if len(renpy.game.contexts) >= 2:
         sls = renpy.game.contexts[-2].scene_lists
 
@@ -161,6 +214,7 @@ def prediction_coroutine(root_widget):
 
         predicted_screens.append((name, args, kwargs))
 
+        priority = PRIORITY_NOW
         renpy.display.screen.predict_screen(name, *args, **kwargs)
 
         predicting = False
@@ -170,6 +224,7 @@ def prediction_coroutine(root_widget):
     # Predict things (especially screens) that are reachable through
     # an action.
     predicting = True
+    priority = PRIORITY_CLICK
 
     try:
         root_widget.visit_all(lambda i : i.predict_one_action())
@@ -200,6 +255,7 @@ def prediction_coroutine(root_widget):
             continue
 
         predicting = True
+        priority = screen_priority.get(name, PRIORITY_CLICK) + SCREEN_PENALTY
 
         renpy.display.screen.predict_screen(name, *args, **kwargs)
 
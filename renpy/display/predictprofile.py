@@ -0,0 +1,266 @@
+# Copyright 2004-2024 Tom Rothamel <pytom@bishoujo.us>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# This file contains the prediction profile, a record of the images and
+# screens that were actually needed at each statement while the game was
+# played, and of the statements that were actually run next. The profile
+# is recorded during playtesting, shipped with the game, and used to
+# predict what static analysis of the script can't.
+
+from __future__ import division, absolute_import, with_statement, print_function, unicode_literals
+from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, round, str, tobytes, unicode # *
+
+import os
+import zlib
+
+import renpy
+from renpy.compat.pickle import loads, dumps
+
+PROFILE_FILENAME = "cache/prediction.rpyb"
+
+# The version of the profile format.
+VERSION = 1
+
+
+class Entry(object):
+    """
+    The record of what happened at one statement.
+    """
+
+    def __init__(self):
+
+        # The image manipulators that were drawn while the statement was
+        # current, in the order they were first drawn.
+        self.images = [ ]
+
+        # The set of images in images.
+        self.image_set = set()
+
+        # The names of the screens that were shown while the statement
+        # was current.
+        self.screens = [ ]
+
+        # The names of the statements that ran after this one.
+        self.successors = [ ]
+
+
+# A map from statement name to Entry.
+profile = { }
+
+# True if we're recording the profile.
+recording = False
+
+# True if the profile has changed since it was loaded.
+dirty = False
+
+# The name of the statement that's running, while recording.
+current = None
+
+
+def get_entry(name):
+
+    global dirty
+
+    rv = profile.get(name, None)
+
+    if rv is None:
+        rv = profile[name] = Entry()
+
+    dirty = True
+
+    return rv
+
+
+def record_statement(name):
+    """
+    Called when the statement with `name` starts running.
+    """
+
+    global current
+
+    if (current is not None) and (current != name):
+        entry = get_entry(current)
+
+        if name not in entry.successors:
+            entry.successors.append(name)
+
+    current = name
+
+
+def record_image(im):
+    """
+    Called when the image manipulator `im` is drawn.
+    """
+
+    if current is None:
+        return
+
+    entry = profile.get(current, None)
+
+    if (entry is not None) and (im in entry.image_set):
+        return
+
+    entry = get_entry(current)
+    entry.images.append(im)
+    entry.image_set.add(im)
+
+
+def record_screen(name):
+    """
+    Called when the screen `name` is shown.
+    """
+
+    if current is None:
+        return
+
+    entry = get_entry(current)
+
+    if name not in entry.screens:
+        entry.screens.append(name)
+
+
+def predict(name):
+    """
+    Predicts the images and screens the profile says were needed at the
+    statement with `name`, and returns a list of the names of the
+    statements that ran after it.
+    """
+
+    entry = profile.get(name, None)
+
+    if entry is None:
+        return [ ]
+
+    for i in entry.images:
+        renpy.display.predict.displayable(i)
+
+    for i in entry.screens:
+        renpy.display.predict.screen(i)
+
+    return entry.successors
+
+
+def init(restart):
+    """
+    Called each time the script is run. The profile is loaded when Ren'Py
+    starts, and kept when it restarts, so what's been recorded since it
+    was loaded isn't lost.
+    """
+
+    if not restart:
+        load()
+
+
+def load():
+    """
+    Loads the profile, and starts recording if config.record_prediction_profile
+    is set.
+    """
+
+    global profile
+    global recording
+    global current
+    global dirty
+
+    profile = { }
+    current = None
+    dirty = False
+
+    recording = bool(renpy.config.developer and renpy.config.record_prediction_profile)
+
+    try:
+        with renpy.loader.load(PROFILE_FILENAME) as f:
+            version, data = loads(zlib.decompress(f.read()))
+
+        if version != VERSION:
+            return
+
+    except Exception:
+        return
+
+    # Entries for statements that no longer exist are discarded.
+    namemap = renpy.game.script.namemap
+
+    for name, (images, screens, successors) in data.items():
+
+        if name not in namemap:
+            continue
+
+        entry = Entry()
+        entry.images = list(images)
+        entry.image_set = set(images)
+        entry.screens = list(screens)
+        entry.successors = [ i for i in successors if i in namemap ]
+
+        profile[name] = entry
+
+
+def save():
+    """
+    Saves the profile, if it's been recorded and changed.
+    """
+
+    global dirty
+
+    if not (recording and dirty):
+        return
+
+    if renpy.macapp:
+        return
+
+    data = { }
+
+    for name, entry in profile.items():
+
+        # Images that can't be pickled, because they refer to something
+        # that only exists at runtime, are left out.
+        images = [ ]
+
+        for i in entry.images:
+            try:
+                dumps(i)
+                images.append(i)
+            except Exception:
+                pass
+
+        data[name] = (images, entry.screens, entry.successors)
+
+    fn = renpy.loader.get_path(PROFILE_FILENAME)
+    tmp = fn + ".new"
+
+    try:
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(dumps((VERSION, data), True), 9))
+
+        renpy.loadsave.safe_rename(tmp, fn)
+
+    except Exception:
+        renpy.display.log.write("Saving the prediction profile:")
+        renpy.display.log.exception()
+
+        try:
+            os.unlink(tmp)
+        except Exception:
+            pass
+
+        return
+
+    dirty = False
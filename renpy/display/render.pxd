@@ -26,6 +26,9 @@ cdef class Render:
 
     cdef public bint mark, cache_killed, killed
 
+    # The number of references to this render, used by mark_sweep.
+    cdef public int refcount
+
     cdef public float width, height
     cdef public object layer_name
 
@@ -101,6 +104,12 @@ cdef class Render:
     # A flag that's used to enable debugging on a per-render basis.
     cdef public bint debug
 
+    # The frame this render was created in, and the number of textures it
+    # draws if it can be flattened, 0 if it can't, or -1 if that hasn't
+    # been checked yet.
+    cdef public int frame
+    cdef public int flat_blits
+
     # operations ###############################################################
 
     cpdef int blit(Render self, source, tuple pos, object focus=*, object main=*, object index=*)
@@ -47,16 +47,38 @@ blit_lock = threading.Condition()
 # displayable.
 render_cache = collections.defaultdict(dict)
 
+# The render cache for pure displayables - those that return a key from
+# _render_key - which lets displayables with the same contents share a
+# render, even when they're different objects. This maps (key, width,
+# height, draw_per_virt) to a render, in an old and new generation. A
+# render found in the old generation is moved to the new one, and when
+# the new generation fills up, the old one is discarded.
+pure_cache_old = { }
+pure_cache_new = { }
+
+# The number of lookups in the pure cache that have hit and missed since
+# pure_cache_stats was last called.
+cdef int pure_hits
+cdef int pure_misses
+pure_hits = 0
+pure_misses = 0
+
 # The queue of redraws. A list of (time, displayable) pairs.
 redraw_queue = [ ]
 
 # The render returned from render_screen.
 screen_render = None
 
-# A list of renders the system knows about, and thinks are still alive.
+# A list of renders that have been created since mark_sweep was last
+# called, and have not yet been adopted.
 cdef list live_renders
 live_renders = [ ]
 
+# The renders that were the roots of the render graph when mark_sweep was
+# last called. Each holds a reference to itself.
+cdef list root_renders
+root_renders = [ ]
+
 # A copy of renpy.display.interface.frame_time, for speed reasons.
 cdef double frame_time
 frame_time = 0
@@ -71,6 +93,15 @@ sizing = False
 # false otherwise.
 models = False
 
+# The number of frames that have been flattened. Renders record the frame
+# they're created in, so flatten can tell how long they've been unchanged.
+cdef int flatten_frame = 0
+
+# The FLATTEN renders created by flatten that may still be drawn, and the
+# number of bytes of texture they use.
+flattened = [ ]
+flattened_bytes = 0
+
 def adjust_render_cache_times(old_time, new_time):
     """
     This adjusts the render cache such that if a render starts at
@@ -103,6 +134,74 @@ def adjust_render_cache_times(old_time, new_time):
         render_cache[id_d] = new_renders
 
 
+def pure_cache_clear():
+    """
+    Clears the pure render cache.
+    """
+
+    global pure_cache_old, pure_cache_new
+    pure_cache_old = { }
+    pure_cache_new = { }
+
+
+def pure_cache_stats():
+    """
+    Returns the number of hits and misses in the pure render cache since
+    this was last called.
+    """
+
+    global pure_hits, pure_misses
+
+    rv = (pure_hits, pure_misses)
+
+    pure_hits = 0
+    pure_misses = 0
+
+    return rv
+
+
+cdef object pure_cache_get(tuple key, d):
+    """
+    Returns the render stored in the pure cache under `key`, or None. The
+    render is only returned if `d` can reuse it.
+    """
+
+    global pure_hits, pure_misses
+
+    cdef Render rv
+
+    rv = pure_cache_new.get(key, None)
+
+    if rv is None:
+        rv = pure_cache_old.pop(key, None)
+
+        if rv is not None:
+            pure_cache_new[key] = rv
+
+    # The displayable may need to know its render was used, for example so
+    # the image cache keeps the textures it draws.
+    if (rv is None) or rv.cache_killed or rv.killed or not d._reuse_render():
+        pure_misses += 1
+        return None
+
+    pure_hits += 1
+    return rv
+
+
+cdef void pure_cache_put(tuple key, Render rv):
+    """
+    Stores `rv` in the pure cache under `key`.
+    """
+
+    global pure_cache_old, pure_cache_new
+
+    if len(pure_cache_new) >= renpy.config.pure_render_cache_size:
+        pure_cache_old = pure_cache_new
+        pure_cache_new = { }
+
+    pure_cache_new[key] = rv
+
+
 def free_memory():
     """
     Frees memory used by the render system.
@@ -111,6 +210,8 @@ def free_memory():
     global screen_render
     screen_render = None
 
+    pure_cache_clear()
+
     mark_sweep()
 
     render_cache.clear()
@@ -199,6 +300,7 @@ cpdef render(d, object widtho, object heighto, double st, double at):
     cdef tuple orig_wh, wh
     cdef dict render_cache_d
     cdef Render rv
+    cdef tuple pure_key
 
     if not render_is_ready:
         if renpy.config.developer:
@@ -249,6 +351,34 @@ cpdef render(d, object widtho, object heighto, double st, double at):
     else:
         wh = orig_wh
 
+    pure_key = None
+
+    if (not sizing) and renpy.config.pure_render_cache_size:
+        key = d._render_key()
+
+        if key is not None:
+            pure_key = (key, widtho, heighto, getattr(renpy.display.draw, "draw_per_virt", 1.0))
+
+            rv = pure_cache_get(pure_key, d)
+
+            if rv is not None:
+
+                # As with a new render, record that this is a render of d,
+                # so invalidating d kills it, and cache it for d. Equal
+                # displayables share the render, so identity is checked.
+                for i in rv.render_of:
+                    if i is d:
+                        break
+                else:
+                    rv.render_of.append(d)
+
+                render_cache_d[wh] = rv
+
+                if wh is not orig_wh:
+                    render_cache_d[orig_wh] = rv
+
+                return rv
+
     renpy.plog(2, "start render {!r}", d)
 
     try:
@@ -285,6 +415,9 @@ cpdef render(d, object widtho, object heighto, double st, double at):
         if wh is not orig_wh:
             render_cache_d[orig_wh] = rv
 
+        if pure_key is not None:
+            pure_cache_put(pure_key, rv)
+
     renpy.plog(2, "end render {!r}", d)
 
     return rv
@@ -423,22 +556,146 @@ def redraw(d, when):
 
 IDENTITY = Matrix2D(1, 0, 0, 1)
 
+# The result of focus_at_point for a modal render. This overrides any
+# specific focus from below us.
+Modal = renpy.object.Sentinel("Modal")
+
+# The result of FocusIndex.lookup when the index can't find the focus, and
+# the render tree has to be searched.
+Unindexed = renpy.object.Sentinel("Unindexed")
+
+# The size of the cells the focus index divides the screen into, in pixels.
+FOCUS_GRID_SIZE = 64
+
+
+class FocusIndex(object):
+    """
+    A grid of the areas of the screen that focus_at_point can return a
+    result for, built as the focuses are taken. This lets the focus at a
+    point be found by checking the entries in one cell, rather than by
+    searching the render tree.
+
+    Entries are added in the order they're drawn, so the last entry in a
+    cell that contains a point is the topmost.
+    """
+
+    def __init__(self, render, width, height):
+
+        # The render this is an index of.
+        self.render = render
+
+        self.width = width
+        self.height = height
+
+        self.columns = int(width // FOCUS_GRID_SIZE) + 1
+        self.rows = int(height // FOCUS_GRID_SIZE) + 1
+
+        # For each cell, a list of (minx, miny, maxx, maxy, result, exact)
+        # entries that overlap it, or None if there are none.
+        self.cells = [ None ] * (self.columns * self.rows)
+
+        # False if the screen has a focus that can't be indexed, in which
+        # case the render tree is always searched.
+        self.usable = True
+
+    def add(self, Matrix transform, float x0, float y0, float x1, float y1, cminx, cminy, cmaxx, cmaxy, result, bint exact):
+        """
+        Adds an entry for the rectangle from (x0, y0) to (x1, y1) in the
+        coordinates of a render, which `transform` takes to screen
+        coordinates, clipped to the `cminx`, `cminy`, `cmaxx`, `cmaxy`
+        rectangle. `result` is what focus_at_point returns for a point
+        inside it. If `exact` is false, a point in the rectangle might not
+        have that result, and the tree has to be searched.
+        """
+
+        cdef int cx, cy, cx0, cy0, cx1, cy1
+
+        if not self.usable:
+            return
+
+        # Only scaled and offset rectangles stay rectangles.
+        if transform.xdy or transform.ydx or (transform.xdx <= 0) or (transform.ydy <= 0):
+            self.usable = False
+            return
+
+        minx, miny = transform.transform(x0, y0)
+        maxx, maxy = transform.transform(x1, y1)
+
+        minx = max(minx, cminx)
+        miny = max(miny, cminy)
+        maxx = min(maxx, cmaxx)
+        maxy = min(maxy, cmaxy)
+
+        if (maxx <= minx) or (maxy <= miny):
+            return
+
+        entry = (minx, miny, maxx, maxy, result, exact)
+
+        cx0 = max(int(minx // FOCUS_GRID_SIZE), 0)
+        cy0 = max(int(miny // FOCUS_GRID_SIZE), 0)
+        cx1 = min(int(maxx // FOCUS_GRID_SIZE), self.columns - 1)
+        cy1 = min(int(maxy // FOCUS_GRID_SIZE), self.rows - 1)
+
+        cells = self.cells
+
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                l = cells[cy * self.columns + cx]
+
+                if l is None:
+                    cells[cy * self.columns + cx] = [ entry ]
+                else:
+                    l.append(entry)
+
+    def lookup(self, x, y):
+        """
+        Returns what focus_at_point would return for (`x`, `y`), or
+        Unindexed if the render tree has to be searched to find out.
+        """
+
+        if not self.usable:
+            return Unindexed
+
+        if not ((0 <= x < self.width) and (0 <= y < self.height)):
+            return Unindexed
+
+        entries = self.cells[int(y // FOCUS_GRID_SIZE) * self.columns + int(x // FOCUS_GRID_SIZE)]
+
+        if entries is None:
+            return None
+
+        for minx, miny, maxx, maxy, result, exact in reversed(entries):
+            if (minx <= x < maxx) and (miny <= y < maxy):
+                if not exact:
+                    return Unindexed
+
+                return result
+
+        return None
+
+
+# The FocusIndex of the screen, built when the focuses are taken.
+focus_index = None
+
 
 def take_focuses(focuses):
     """
-    Adds a list of rectangular focus regions to the focuses list.
+    Adds a list of rectangular focus regions to the focuses list, and
+    indexes them.
     """
 
+    global focus_index
+
+    focus_index = FocusIndex(screen_render, screen_render.width, screen_render.height)
+
     screen_render.take_focuses(
         0, 0,
         screen_render.width, screen_render.height,
         IDENTITY,
         None,
-        focuses)
+        focuses,
+        focus_index)
 
-# The result of focus_at_point for a modal render. This overrides any
-# specific focus from below us.
-Modal = renpy.object.Sentinel("Modal")
 
 def focus_at_point(x, y):
     """
@@ -449,7 +706,14 @@ def focus_at_point(x, y):
     if screen_render is None:
         return None
 
-    cf = screen_render.focus_at_point(x, y, None)
+    cf = Unindexed
+
+    if (focus_index is not None) and (focus_index.render is screen_render):
+        cf = focus_index.lookup(x, y)
+
+    if cf is Unindexed:
+        cf = screen_render.focus_at_point(x, y, None)
+
     if cf is None or cf is Modal:
         return None
     else:
@@ -490,51 +754,282 @@ def render_screen(root, width, height):
 
     return rv
 
-def mark_sweep():
+
+# The fewest textures a render has to draw for flatten to replace it.
+FLATTEN_MIN_BLITS = 4
+
+
+cdef bint child_inside(Render r, double cx, double cy, double cw, double ch):
     """
-    This performs mark-and-sweep garbage collection on the live_renders
-    list.
+    Returns true if a child of `r` with size `cw`, `ch` blitted at `cx`, `cy`
+    is drawn inside the bounds of `r`, on the axes `r` doesn't clip.
     """
 
-    global live_renders
+    if (r.reverse is None) or (r.reverse is IDENTITY):
+        minx = cx
+        miny = cy
+        maxx = cx + cw
+        maxy = cy + ch
 
-    cdef list worklist
-    cdef int i
-    cdef Render r, j
+    else:
+        x0, y0 = r.reverse.transform(0, 0)
+        x1, y1 = r.reverse.transform(cw, 0)
+        x2, y2 = r.reverse.transform(cw, ch)
+        x3, y3 = r.reverse.transform(0, ch)
+
+        minx = cx + min(x0, x1, x2, x3)
+        miny = cy + min(y0, y1, y2, y3)
+        maxx = cx + max(x0, x1, x2, x3)
+        maxy = cy + max(y0, y1, y2, y3)
+
+    if not r.xclipping:
+        if (minx < -0.001) or (maxx > r.width + 0.001):
+            return False
 
-    worklist = [ ]
+    if not r.yclipping:
+        if (miny < -0.001) or (maxy > r.height + 0.001):
+            return False
 
-    if screen_render is not None:
-        worklist.append(screen_render)
+    return True
 
-    cache_renders = renpy.display.im.cache.get_renders()
-    worklist.extend(cache_renders)
 
-    i = 0
+cdef int count_flat_blits(Render r):
+    """
+    Returns the number of textures that drawing `r` draws, if `r` can be
+    rendered to a texture of its size that's drawn in its place without
+    changing how it looks. Returns 0 if it can't.
+    """
 
-    while i < len(worklist):
-        r = worklist[i]
+    cdef int rv = 0
+    cdef int n
 
-        for j in r.depends_on_list:
-            if not j.mark:
-                j.mark = True
-                worklist.append(j)
+    if r.flat_blits >= 0:
+        return r.flat_blits
 
-        i += 1
+    if r.operation == FLATTEN:
+        rv = 1
 
-    if screen_render is not None:
-        screen_render.mark = True
+    # Blend modes apply to what's below the render, shaders may animate,
+    # and text inputs need to find where their caret is drawn.
+    elif (r.operation == BLIT) and not (r.mesh or r.shaders or r.text_input or (r.properties and ("blend" in r.properties))):
+
+        for child, cx, cy, _focus, _main in r.children:
+
+            if isinstance(child, Render):
+                n = count_flat_blits(child)
+                cw = child.width
+                ch = child.height
+
+            elif hasattr(child, "get_size"):
+                n = 1
+                cw, ch = child.get_size()
+
+            else:
+                n = 0
+
+            if (n == 0) or not child_inside(r, cx, cy, cw, ch):
+                rv = 0
+                break
+
+            rv += n
+
+    r.flat_blits = rv
+    return rv
+
+
+cdef bint flatten_children(Render r, double xo, double yo, double draw_per_virt):
+    """
+    Flattens the children of `r`, which is drawn at `xo`, `yo` on the
+    screen. Returns true if any were flattened.
+    """
+
+    global flattened_bytes
+
+    cdef Render c
+    cdef double x, y
+    cdef bint changed = False
+
+    # Only children that are drawn without being transformed are
+    # flattened, so the texture is drawn pixel for pixel.
+    if r.operation != BLIT:
+        return False
+
+    if (r.forward is not None) and (r.forward is not IDENTITY):
+        return False
+
+    if (r.alpha != 1.0) or (r.over != 1.0) or r.mesh or r.shaders:
+        return False
+
+    # Properties like blend and texture_scaling are passed down to the
+    # children, and apply to each texture they draw.
+    if r.properties:
+        return False
+
+    for i, (child, cx, cy, focus, main) in enumerate(r.children):
+
+        if not isinstance(child, Render):
+            continue
+
+        c = child
+
+        x = xo + cx
+        y = yo + cy
+
+        if ((flatten_frame - c.frame) >= renpy.config.auto_flatten_frames and
+                (x * draw_per_virt) == math.floor(x * draw_per_virt) and
+                (y * draw_per_virt) == math.floor(y * draw_per_virt) and
+                count_flat_blits(c) >= FLATTEN_MIN_BLITS):
+
+            size = int(c.width * c.height * draw_per_virt * draw_per_virt * 4)
+
+            if flattened_bytes + size <= renpy.config.auto_flatten_bytes:
+
+                # This is what the Flatten displayable renders.
+                rv = Render(c.width, c.height)
+                rv.blit(c, (0, 0))
+
+                rv.operation = FLATTEN
+
+                rv.mesh = True
+                rv.add_shader("renpy.texture")
+                rv.add_property("mipmap", False)
+                rv.add_property("drawable_resolution", True)
+
+                r.children[i] = (rv, cx, cy, focus, main)
+                r.depends_on(rv)
+
+                flattened.append(rv)
+                flattened_bytes += size
+
+                changed = True
+                continue
+
+        if flatten_children(c, x, y, draw_per_virt):
+            changed = True
+
+    # The textures of the new FLATTEN renders have to be loaded.
+    if changed:
+        r.loaded = False
+
+    return changed
+
+
+def flatten(root):
+    """
+    Replaces the children of the tree of renders rooted at `root` that
+    haven't changed in config.auto_flatten_frames frames with FLATTEN
+    renders, so each is drawn from a single texture, rather than by drawing
+    all of the textures it's made of. This is only done with the
+    model-based renderer.
+
+    The FLATTEN renders are freed, along with their textures, when the
+    renders they flatten are, which happens when a displayable in them is
+    invalidated.
+    """
+
+    global flatten_frame
+    global flattened
+    global flattened_bytes
+
+    flatten_frame += 1
+
+    if not (models and renpy.config.auto_flatten_frames):
+        return
+
+    draw_per_virt = renpy.display.draw.draw_per_virt
+
+    if flattened:
+        flattened = [ i for i in flattened if not i.killed ]
+        flattened_bytes = sum(int(i.width * i.height * draw_per_virt * draw_per_virt * 4) for i in flattened)
+
+    flatten_children(root, 0, 0, draw_per_virt)
+
+
+cdef void adopt(Render r):
+    """
+    Adds a reference to `r`. When `r` gains its first reference, it is
+    adopted, and adds a reference to each of the renders it depends on.
+    """
+
+    cdef list worklist = [ r ]
+
+    while worklist:
+        r = worklist.pop()
+        r.refcount += 1
+
+        if r.mark:
+            continue
 
-    for r in cache_renders:
         r.mark = True
+        worklist.extend(r.depends_on_list)
+
+
+cdef void release(Render r):
+    """
+    Removes a reference from `r`. When the last reference to an adopted
+    render is removed, the render releases the renders it depends on, and
+    is killed.
+    """
+
+    cdef list worklist = [ r ]
+
+    while worklist:
+        r = worklist.pop()
+        r.refcount -= 1
+
+        if r.refcount > 0 or not r.mark:
+            continue
+
+        r.mark = False
+        worklist.extend(r.depends_on_list)
+        r.kill()
+
+
+def mark_sweep():
+    """
+    This frees the renders that can no longer be reached from the screen
+    render or the caches.
+
+    Renders are reference counted. A render is adopted when it becomes
+    reachable from a root, and holds a reference to each render it depends
+    on until it is killed. Since renders can only depend on renders that
+    already exist, there are no cycles, and every unreachable render is
+    freed. The work done here is proportional to the number of renders
+    created or freed since the last call, rather than the number of renders
+    that are alive.
+    """
+
+    global live_renders
+    global root_renders
+
+    cdef list roots
+    cdef Render r
+
+    roots = [ ]
+
+    if screen_render is not None:
+        roots.append(screen_render)
+
+    roots.extend(renpy.display.im.cache.get_renders())
+    roots.extend(pure_cache_old.values())
+    roots.extend(pure_cache_new.values())
+
+    # References are added before they are removed, so renders that remain
+    # reachable are never released.
+    for r in roots:
+        adopt(r)
+
+    for r in root_renders:
+        release(r)
 
+    root_renders = roots
+
+    # New renders that were not adopted can't be reached.
     for r in live_renders:
         if not r.mark:
             r.kill()
-        else:
-            r.mark = False
 
-    live_renders = worklist
+    live_renders = [ ]
 
 
 def compute_subline(sx0, sw, cx0, cw):
@@ -588,10 +1083,13 @@ cdef class Render:
         layer.
         """
 
-        # The mark bit, used for mark/sweep-style garbage collection of
-        # renders.
+        # True if this render has been adopted by mark_sweep, and holds
+        # references to the renders it depends on.
         self.mark = False
 
+        # The number of adopted renders and roots that refer to this render.
+        self.refcount = 0
+
         # Is has this render been removed from the cache?
         self.cache_killed = False
 
@@ -706,10 +1204,15 @@ cdef class Render:
         # Have the textures been loaded?
         self.loaded = False
 
+        # Used by flatten.
+        self.frame = flatten_frame
+        self.flat_blits = -1
+
         live_renders.append(self)
 
     _types = """\
         mark: bool
+        refcount: int
         cache_killed: bool
         killed: bool
         width: int
@@ -745,6 +1248,8 @@ cdef class Render:
         cached_texture: Any
         cached_model: Any
         loaded: bool
+        frame: int
+        flat_blits: int
         """
 
     def __repr__(self): #@DuplicatedSignature
@@ -801,6 +1306,9 @@ cdef class Render:
             self.depends_on_list.append(source)
             source.parents.add(self)
 
+            if self.mark:
+                adopt(source)
+
         return 0
 
     cpdef int subpixel_blit(Render self, source, tuple pos, object focus=True, object main=True, object index=None):
@@ -835,6 +1343,9 @@ cdef class Render:
             self.depends_on_list.append(source)
             source.parents.add(self)
 
+            if self.mark:
+                adopt(source)
+
         return 0
 
     cpdef int absolute_blit(Render self, source, tuple pos, object focus=True, object main=True, object index=None):
@@ -869,6 +1380,9 @@ cdef class Render:
             self.depends_on_list.append(source)
             source.parents.add(self)
 
+            if self.mark:
+                adopt(source)
+
         return 0
 
 
@@ -1088,6 +1602,9 @@ cdef class Render:
         self.depends_on_list.append(source)
         source.parents.add(self)
 
+        if self.mark:
+            adopt(source)
+
         if focus:
             if self.pass_focuses is None:
                 self.pass_focuses = [ source ]
@@ -1137,6 +1654,13 @@ cdef class Render:
         for i in list(self.depends_on_list):
             i.parents.discard(self)
 
+        # A render that's killed while adopted releases its references.
+        if self.mark:
+            self.mark = False
+
+            for i in list(self.depends_on_list):
+                release(i)
+
         for ro in self.render_of:
             id_ro = id(ro)
 
@@ -1193,7 +1717,7 @@ cdef class Render:
         else:
             self.focuses.append(t)
 
-    def take_focuses(self, cminx, cminy, cmaxx, cmaxy, transform, screen, focuses): #@DuplicatedSignature
+    def take_focuses(self, cminx, cminy, cmaxx, cmaxy, transform, screen, focuses, index=None, exact=True): #@DuplicatedSignature
         """
         This adds to focuses Focus objects corresponding to the focuses
         added to this object and its children, transformed into screen
@@ -1211,13 +1735,62 @@ cdef class Render:
 
         `focuses`
             The list of focuses to add to.
+
+        `index`
+            If not None, a FocusIndex that the areas focus_at_point would
+            find a focus or modal render in are added to.
+
+        `exact`
+            False if focus_at_point could reject a focus inside this
+            render, even if it's found in `index`.
         """
 
         if self.focus_screen is not None:
             screen = self.focus_screen
 
+        # The clipping rectangle for the children of this render, which
+        # focus_at_point also applies to its own focuses.
+        ccminx = cminx
+        ccminy = cminy
+        ccmaxx = cmaxx
+        ccmaxy = cmaxy
+
+        if self.xclipping or self.yclipping:
+
+            x1, y1 = transform.transform(0, 0)
+            x2, y2 = transform.transform(self.width, self.height)
+
+            if self.xclipping:
+                minx = min(x1, x2)
+                maxx = max(x1, x2)
+                ccminx = max(minx, cminx)
+                ccmaxx = min(maxx, cmaxx)
+
+            if self.yclipping:
+                miny = min(y1, y2)
+                maxy = max(y1, y2)
+                ccminy = max(miny, cminy)
+                ccmaxy = min(maxy, cmaxy)
+
+            # A clipping rectangle that isn't aligned with the screen is
+            # only approximated.
+            if transform.xdy or transform.ydx:
+                exact = False
+
+        if (index is not None) and not index.usable:
+            index = None
+
         if self.modal:
 
+            if index is not None:
+                if callable(self.modal):
+                    index.usable = False
+                    index = None
+                elif self.modal == "default":
+                    index.add(IDENTITY, ccminx, ccminy, ccmaxx, ccmaxy, ccminx, ccminy, ccmaxx, ccmaxy, Modal, exact)
+                else:
+                    index.add(transform, 0, 0, self.width, self.height, ccminx, ccminy, ccmaxx, ccmaxy, Modal, exact)
+
             if self.modal == "window":
 
                 x1, y1 = transform.transform(0, 0)
@@ -1245,6 +1818,11 @@ cdef class Render:
 
                 focuses[:] = [ ]
 
+        # An image dissolve only lets the focuses where its mask is opaque
+        # through.
+        if self.operation == IMAGEDISSOLVE:
+            exact = False
+
         if self.focuses:
 
             for (d, arg, xo, yo, w, h, mx, my, mask) in self.focuses:
@@ -1253,6 +1831,14 @@ cdef class Render:
                     focuses.append(renpy.display.focus.Focus(d, arg, xo, yo, w, h, screen))
                     continue
 
+                if index is not None:
+                    if mx is None:
+                        index.add(transform, xo, yo, xo + w, yo + h, ccminx, ccminy, ccmaxx, ccmaxy, (d, arg, screen), exact)
+                    elif isinstance(mask, Render) and (self.forward is None):
+                        index.add(transform, mx, my, mx + mask.width, my + mask.height, ccminx, ccminy, ccmaxx, ccmaxy, (d, arg, screen), False)
+                    else:
+                        index.usable = False
+
                 x1, y1 = transform.transform(xo, yo)
                 x2, y2 = transform.transform(xo + w, yo + h)
 
@@ -1273,23 +1859,6 @@ cdef class Render:
 
                 focuses.append(renpy.display.focus.Focus(d, arg, minx, miny, maxx - minx, maxy - miny, screen))
 
-        if self.xclipping or self.yclipping:
-
-            x1, y1 = transform.transform(0, 0)
-            x2, y2 = transform.transform(self.width, self.height)
-
-            if self.xclipping:
-                minx = min(x1, x2)
-                maxx = max(x1, x2)
-                cminx = max(minx, cminx)
-                cmaxx = min(maxx, cmaxx)
-
-            if self.yclipping:
-                miny = min(y1, y2)
-                maxy = max(y1, y2)
-                cminy = max(miny, cminy)
-                cmaxy = min(maxy, cmaxy)
-
         for child, cx, cy, focus, main in self.children:
 
             if not focus:
@@ -1306,11 +1875,11 @@ cdef class Render:
             if (self.reverse is not None) and (self.reverse is not IDENTITY):
                 child_transform = child_transform * self.reverse
 
-            child.take_focuses(cminx, cminy, cmaxx, cmaxy, child_transform, screen, focuses)
+            child.take_focuses(ccminx, ccminy, ccmaxx, ccmaxy, child_transform, screen, focuses, index, exact)
 
         if self.pass_focuses:
             for child in self.pass_focuses:
-                child.take_focuses(cminx, cminy, cmaxx, cmaxy, transform, screen, focuses)
+                child.take_focuses(ccminx, ccminy, ccmaxx, ccmaxy, transform, screen, focuses, index, exact)
 
     def focus_at_point(self, x, y, screen): #@DuplicatedSignature
         """
@@ -666,6 +666,8 @@ class ScreenDisplayable(renpy.display.layout.Container):
                 if self.profile.debug:
                     debug = True
 
+        span_start = renpy.performance.begin()
+
         # Cycle widgets and transforms.
         self.old_widgets = self.widgets
         self.old_transforms = self.transforms
@@ -739,6 +741,9 @@ class ScreenDisplayable(renpy.display.layout.Container):
             if self.profile.debug:
                 profile_log.write("\n")
 
+        if span_start:
+            renpy.performance.end("screen", span_start, " ".join(self.screen_name))
+
         return self.widgets
 
     def render(self, w, h, st, at):
@@ -1321,6 +1326,11 @@ def show_screen(_screen_name, *_args, **kwargs):
     if screen is None:
         raise Exception("Screen %s is not known.\n" % (name[0],))
 
+    # Screens shown with arguments can't be predicted from the profile,
+    # as the arguments aren't recorded.
+    if renpy.display.predictprofile.recording and not (_args or kwargs):
+        renpy.display.predictprofile.record_screen(_screen_name)
+
     if _layer is None:
         _layer = get_screen_layer(name)
 
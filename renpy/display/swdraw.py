@@ -27,6 +27,7 @@ from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, r
 import math
 import time
 import os
+import threading
 
 import pygame_sdl2 as pygame
 import renpy
@@ -46,14 +47,78 @@ class Clipper(object):
         self.blits = [ ]
         self.old_blits = [ ]
 
-        # Sets of (x0, y0, x1, y1) tuples, representing areas that
+        # Lists of (x0, y0, x1, y1, clip) tuples, representing areas that
         # aren't part of any displayable.
-        self.forced = set()
-        self.old_forced = set()
+        self.forced = [ ]
+        self.old_forced = [ ]
 
         # The set of surfaces that have been mutated recently.
         self.mutated = set()
 
+        # Maps (id(render), x, y, clip) to a (render, blits start, blits end,
+        # forced start, forced end, bounds, text rect) tuple, giving the
+        # part of blits and forced produced when the render was drawn at
+        # that place. Since a Render is replaced when it's invalidated, a
+        # render that's drawn at the same place in the next frame produces
+        # the same blits, and doesn't need to be walked again.
+        self.subtrees = { }
+        self.old_subtrees = { }
+
+        # Maps id(render) to the (x0, y0, x1, y1) bounds of everything the
+        # render drew this frame, or None if it drew nothing.
+        self.bounds = { }
+
+    def draw_render(self, clip, what, xo, yo, screen):
+        """
+        Draws the Render `what` into this clipper, reusing the blits from
+        the last frame if possible.
+        """
+
+        key = (id(what), xo, yo, clip)
+
+        bstart = len(self.blits)
+        fstart = len(self.forced)
+
+        old = self.old_subtrees.get(key, None)
+
+        if (old is not None) and (old[0] is what):
+            _, obstart, obend, ofstart, ofend, bounds, text_rect = old
+
+            self.blits.extend(self.old_blits[obstart:obend])
+            self.forced.extend(self.old_forced[ofstart:ofend])
+
+            if text_rect is not None:
+                renpy.display.interface.text_rect = text_rect
+
+        else:
+            old_text_rect = getattr(renpy.display.interface, "text_rect", None)
+
+            draw_render(self, clip, what, xo, yo, screen)
+
+            text_rect = getattr(renpy.display.interface, "text_rect", None)
+
+            if text_rect is old_text_rect:
+                text_rect = None
+
+            bounds = None
+
+            for i in self.blits[bstart:]:
+                bounds = union_bounds(bounds, i)
+
+            for i in self.forced[fstart:]:
+                bounds = union_bounds(bounds, i)
+
+        self.subtrees[key] = (what, bstart, len(self.blits), fstart, len(self.forced), bounds, text_rect)
+
+        # A render drawn in more than one place gets the union of its bounds.
+        if id(what) in self.bounds:
+            old_bounds = self.bounds[id(what)]
+
+            if old_bounds is not None:
+                bounds = union_bounds(bounds, old_bounds + (old_bounds,))
+
+        self.bounds[id(what)] = bounds
+
     def compute(self, full_redraw):
         """
         This returns a clipping rectangle, and a list of update rectangles
@@ -72,8 +137,10 @@ class Clipper(object):
         self.old_blits = bl1
         self.blits = [ ]
         self.old_forced = forced
-        self.forced = set()
+        self.forced = [ ]
         self.mutated = set()
+        self.old_subtrees = self.subtrees
+        self.subtrees = { }
 
         sw = renpy.config.screen_width
         sh = renpy.config.screen_height
@@ -89,7 +156,8 @@ class Clipper(object):
 
         # Quick checks to see if a dissolve is happening, or something like
         # that.
-        changes = forced | old_forced
+        changes = set(forced)
+        changes.update(old_forced)
 
         if fullscreen in changes:
             return fullscreen, [ fullscreen ]
@@ -237,6 +305,276 @@ class Clipper(object):
 clippers = [ Clipper() ]
 
 
+def union_bounds(bounds, entry):
+    """
+    Returns the union of `bounds`, an (x0, y0, x1, y1) tuple or None, and
+    the part of `entry`, an (x0, y0, x1, y1, clip, ...) tuple from a
+    clipper, that's inside its clip.
+    """
+
+    x0, y0, x1, y1, (cx0, cy0, cx1, cy1) = entry[:5]
+
+    x0 = max(x0, cx0)
+    y0 = max(y0, cy0)
+    x1 = min(x1, cx1)
+    y1 = min(y1, cy1)
+
+    if (x0 >= x1) or (y0 >= y1):
+        return bounds
+
+    if bounds is None:
+        return (x0, y0, x1, y1)
+
+    bx0, by0, bx1, by1 = bounds
+
+    return (min(bx0, x0), min(by0, y0), max(bx1, x1), max(by1, y1))
+
+
+# When not None, a (bounds, (x0, y0, x1, y1)) tuple, where bounds is the
+# Clipper.bounds of the frame being drawn to the screen, and the tuple is
+# the area being updated. Renders entirely outside that area are skipped.
+cull = None
+
+
+################################################################################
+# Tiled drawing.
+################################################################################
+
+# Updates smaller than this many pixels are drawn on one thread.
+TILE_MIN_AREA = 256 * 256
+
+# The minimum height of a band, in rows.
+TILE_MIN_ROWS = 16
+
+
+class Tiler(object):
+    """
+    While a screen update is drawn, this queues the blits that are made to
+    the screen, and then performs them on several threads.
+
+    The update is split into bands of rows. Each band performs every queued
+    blit that touches it, in order, clipped to the band. Since the blitters
+    compute each line of the destination the same way no matter which lines
+    are being drawn, the result is the same as drawing on a single thread.
+    """
+
+    def __init__(self, y0, y1, count):
+
+        rows = max(TILE_MIN_ROWS, (y1 - y0 + count - 1) // count)
+
+        # A list of (start, end) tuples, giving the screen rows in each
+        # band.
+        self.bands = [ (i, min(i + rows, y1)) for i in range(y0, y1, rows) ]
+
+        # A list of (transform, source, dest, dest y, dest height, args)
+        # tuples, giving the queued blits. If transform is false, args is
+        # the (x, y) position of the source. Otherwise, it's the arguments
+        # to renpy.display.module.self that follow the surfaces.
+        self.ops = [ ]
+
+        # An exception raised while drawing a band.
+        self.exception = None
+
+    def blit(self, what, dest, xo, yo):
+        """
+        Queues a blit of `what` to `dest` at (`xo`, `yo`).
+        """
+
+        dy = dest.get_abs_offset()[1]
+        self.ops.append((False, what, dest, dy, dest.get_height(), (xo, yo)))
+
+    def transform(self, what, dest, args):
+        """
+        Queues a transformed blit of `what` to `dest`.
+        """
+
+        dy = dest.get_abs_offset()[1]
+        self.ops.append((True, what, dest, dy, dest.get_height(), args))
+
+    def draw_band(self, band):
+        """
+        Performs the queued blits, clipped to `band`.
+        """
+
+        start, end = band
+
+        try:
+
+            for transform, what, dest, dy, dh, args in self.ops:
+
+                # The lines of dest that are in this band.
+                y0 = max(0, start - dy)
+                y1 = min(dh, end - dy)
+
+                if y0 >= y1:
+                    continue
+
+                if transform:
+                    renpy.display.module.self(what, dest, *args, precise=True, ystart=y0, yend=y1)
+                    continue
+
+                xo, yo = args
+
+                # The lines of what that are in this band.
+                sy0 = max(0, y0 - yo)
+                sy1 = min(what.get_height(), y1 - yo)
+
+                if sy0 >= sy1:
+                    continue
+
+                with blit_lock:
+                    dest.blit(what, (xo, yo + sy0), (0, sy0, what.get_width(), sy1 - sy0))
+
+        except Exception as e:
+            self.exception = e
+
+    def flush(self):
+        """
+        Performs the queued blits, and waits for them to finish.
+        """
+
+        global tile_tiler
+        global tile_pending
+
+        if not self.ops:
+            return
+
+        if len(self.bands) > 1:
+            start_tile_threads()
+
+        with tile_condition:
+            tile_tiler = self
+            tile_bands.extend(self.bands)
+            tile_pending = len(self.bands)
+            tile_condition.notify_all()
+
+        # This thread draws bands too.
+        tile_thread_pass()
+
+        with tile_condition:
+            while tile_pending:
+                tile_condition.wait()
+
+            tile_tiler = None
+
+        self.ops = [ ]
+
+        if self.exception is not None:
+            e = self.exception
+            self.exception = None
+            raise e
+
+
+# The tiler used to draw the screen update in progress, or None if blits
+# should be performed immediately.
+tiler = None
+
+# The threads that draw bands.
+tile_threads = [ ]
+
+# Used to hand bands to the tile threads, and to wait for them to be drawn.
+tile_condition = threading.Condition()
+
+# The Tiler being flushed, the bands of it that no thread has started, and
+# the number of bands that haven't been finished.
+tile_tiler = None
+tile_bands = [ ]
+tile_pending = 0
+
+# Should the tile threads quit?
+tile_quit = False
+
+
+def get_tile_threads():
+    """
+    Returns the number of threads that should draw the screen.
+    """
+
+    rv = renpy.config.software_draw_threads
+
+    if rv is None:
+
+        if renpy.emscripten:
+            rv = 1
+        else:
+            cpu_count = getattr(os, "cpu_count", lambda : 1)() or 1
+            rv = min(8, cpu_count)
+
+    return max(1, rv)
+
+
+def tile_thread_pass():
+    """
+    Draws bands of the tiler being flushed, until none are left.
+    """
+
+    global tile_pending
+
+    while True:
+
+        with tile_condition:
+            if not tile_bands:
+                return
+
+            t = tile_tiler
+            band = tile_bands.pop()
+
+        t.draw_band(band)
+
+        with tile_condition:
+            tile_pending -= 1
+            tile_condition.notify_all()
+
+
+def tile_thread_main():
+
+    while True:
+
+        with tile_condition:
+            while not (tile_bands or tile_quit):
+                tile_condition.wait()
+
+            if tile_quit:
+                return
+
+        tile_thread_pass()
+
+
+def start_tile_threads():
+    """
+    Starts tile threads, so there is one fewer than get_tile_threads() -
+    the thread drawing the screen draws bands too.
+    """
+
+    global tile_quit
+
+    tile_quit = False
+
+    while len(tile_threads) < get_tile_threads() - 1:
+        t = threading.Thread(target=tile_thread_main, name="tile-{}".format(len(tile_threads)))
+        t.daemon = True
+        t.start()
+
+        tile_threads.append(t)
+
+
+def quit_tile_threads():
+    """
+    Stops the tile threads.
+    """
+
+    global tile_quit
+
+    with tile_condition:
+        tile_quit = True
+        tile_condition.notify_all()
+
+    for t in tile_threads:
+        t.join()
+
+    del tile_threads[:]
+
+
 def surface(w, h, alpha):
     """
     Creates a surface that shares a pixel format with the screen. The created
@@ -368,6 +706,8 @@ def draw(dest, clip, what, xo, yo, screen):
             if clip:
                 w, h = what.get_size()
                 dest.blits.append((xo, yo, xo + w, yo + h, clip, what, None))
+            elif tiler is not None:
+                tiler.blit(what, dest, xo, yo)
             else:
                 try:
                     blit_lock.acquire()
@@ -381,10 +721,34 @@ def draw(dest, clip, what, xo, yo, screen):
                 w, h = what.get_size()
                 dest.blits.append((xo, yo, xo + w, yo + h, clip, what, None))
             else:
+                if tiler is not None:
+                    tiler.flush()
+
                 renpy.display.module.subpixel(what, dest, xo, yo)
 
         return
 
+    if clip:
+        dest.draw_render(clip, what, xo, yo, screen)
+        return
+
+    if screen and (cull is not None):
+        bounds, (ux0, uy0, ux1, uy1) = cull
+
+        if id(what) in bounds:
+            b = bounds[id(what)]
+
+            if (b is None) or (b[0] >= ux1) or (b[1] >= uy1) or (b[2] <= ux0) or (b[3] <= uy0):
+                return
+
+    draw_render(dest, clip, what, xo, yo, screen)
+
+
+def draw_render(dest, clip, what, xo, yo, screen):
+    """
+    Draws the Render `what`. This takes the same arguments as draw.
+    """
+
     if what.text_input:
         renpy.display.interface.text_rect = what.screen_rect(xo, yo, None)
 
@@ -429,8 +793,13 @@ def draw(dest, clip, what, xo, yo, screen):
             return
 
         if clip:
-            dest.forced.add((subx, suby, subx + subw, suby + subh, clip))
+            dest.forced.append((subx, suby, subx + subw, suby + subh, clip))
         else:
+            # The special operations draw immediately, after what's below
+            # them.
+            if tiler is not None:
+                tiler.flush()
+
             newdest = dest.subsurface((subx, suby, subw, subh))
             draw_special(what, newdest, newx, newy)
 
@@ -452,7 +821,7 @@ def draw(dest, clip, what, xo, yo, screen):
 
             clip = (cx0, cy0, cx1, cy1)
 
-            dest.forced.add(clip + (clip,))
+            dest.forced.append(clip + (clip,))
             return
 
         else:
@@ -558,12 +927,20 @@ def draw_transformed(dest, clip, what, xo, yo, alpha, forward, reverse):
 
             dest = dest.subsurface((minx, miny, maxx - minx, maxy - miny))
 
-            renpy.display.module.self(
-                what, dest,
-                cx, cy,
-                forward.xdx, forward.ydx,
-                forward.xdy, forward.ydy,
-                alpha, True)
+            if tiler is not None:
+                tiler.transform(what, dest, (
+                    cx, cy,
+                    forward.xdx, forward.ydx,
+                    forward.xdy, forward.ydy,
+                    alpha))
+
+            else:
+                renpy.display.module.self(
+                    what, dest,
+                    cx, cy,
+                    forward.xdx, forward.ydx,
+                    forward.xdy, forward.ydy,
+                    alpha, True)
 
         return
 
@@ -592,7 +969,7 @@ def draw_transformed(dest, clip, what, xo, yo, alpha, forward, reverse):
 
             clip = (cx0, cy0, cx1, cy1)
 
-            dest.forced.add(clip + (clip,))
+            dest.forced.append(clip + (clip,))
             return
 
         else:
@@ -651,8 +1028,12 @@ def do_draw_screen(screen_render, full_redraw, swdraw):
 
     yoffset = xoffset = 0
 
+    global cull
+    global tiler
+
     clip = (xoffset, yoffset, xoffset + screen_render.width, yoffset + screen_render.height)
     clipper = clippers[0]
+    clipper.bounds = { }
 
     draw(clipper, clip, screen_render, xoffset, yoffset, True)
 
@@ -661,10 +1042,26 @@ def do_draw_screen(screen_render, full_redraw, swdraw):
     if cliprect is None:
         return [ ]
 
-    x, y, _w, _h = cliprect
+    x, y, w, h = cliprect
 
     dest = swdraw.window.subsurface(cliprect)
-    draw(dest, None, screen_render, -x, -y, True)
+
+    threads = get_tile_threads()
+
+    try:
+        cull = (clipper.bounds, (x, y, x + w, y + h))
+
+        if (threads > 1) and (w * h >= TILE_MIN_AREA):
+            tiler = Tiler(y, y + h, threads * 2)
+
+        draw(dest, None, screen_render, -x, -y, True)
+
+        if tiler is not None:
+            tiler.flush()
+
+    finally:
+        cull = None
+        tiler = None
 
     return updates
 
@@ -706,6 +1103,17 @@ class SWDraw(object):
     def get_texture_size(self):
         return 0, 0
 
+    def get_texture_bytes(self, tex):
+        """
+        Returns the number of bytes of memory used by `tex`. In the software
+        implementation, textures are surfaces in main memory.
+        """
+
+        if isinstance(tex, pygame.Surface):
+            return tex.get_pitch() * tex.get_height()
+
+        return 0
+
     def init(self, virtual_size):
 
         # These disable a failed load of ANGLE.
@@ -761,7 +1169,7 @@ class SWDraw(object):
         return
 
     def quit(self): # @ReservedAssignment
-        return
+        quit_tile_threads()
 
     def translate_point(self, x, y):
         x /= self.scale_factor
@@ -867,8 +1275,19 @@ class SWDraw(object):
 
     def render_to_texture(self, render, alpha):
 
+        global tiler
+
         rv = surface(render.width, render.height, alpha)
-        draw(rv, None, render, 0, 0, False)
+
+        # The texture is used as soon as this returns, so it's drawn
+        # immediately, even when the screen is being tiled.
+        old_tiler = tiler
+        tiler = None
+
+        try:
+            draw(rv, None, render, 0, 0, False)
+        finally:
+            tiler = old_tiler
 
         return rv
 
@@ -29,6 +29,7 @@ from future.utils import reraise
 
 import sys
 import time
+import heapq
 
 import renpy
 
@@ -41,6 +42,15 @@ il_statements = 0
 # The deadline for reporting we're not in an infinite loop.
 il_time = 0
 
+# A map from (node, shown images signature, predicted return stack) to a
+# (log, images, return stack, successors) tuple, giving the result of
+# predicting the node in that state. As this is restored to empty when
+# the game is reloaded, entries never refer to stale nodes.
+predict_cache = { }
+
+# The number of entries predict_cache may hold before it's cleared.
+PREDICT_CACHE_SIZE = 4096
+
 
 def check_infinite_loop():
     global il_statements
@@ -541,6 +551,10 @@ class Context(renpy.object.Object):
 
             self.current = node.name
             self.last_abnormal = self.abnormal
+
+            if renpy.display.predictprofile.recording:
+                renpy.display.predictprofile.record_statement(node.name)
+
             self.abnormal = False
             self.defer_rollback = None
 
@@ -831,7 +845,12 @@ class Context(renpy.object.Object):
 
         old_images = self.images
 
-        # A worklist of (node, images, return_stack) tuples.
+        # A worklist heap of (distance, serial, node, images, return_stack)
+        # tuples. The distance is the number of statements we expect to
+        # pass before reaching the node, with each branch multiplying
+        # the cost of reaching its targets, so the statements most likely
+        # to be reached soon are predicted first. The serial keeps ties
+        # in the order the nodes were found.
         nodes = [ ]
 
         # The set of nodes we've seen. (We only consider each node once.)
@@ -848,28 +867,88 @@ class Context(renpy.object.Object):
             if node in seen:
                 continue
 
-            nodes.append((node, self.images, self.return_stack))
+            nodes.append((0, len(seen), node, self.images, self.return_stack))
             seen.add(node)
 
+        # The number of statements that were predicted, and the time spent
+        # predicting statements.
+        predicted = 0
+        elapsed = 0.0
+
         # Predict statements.
-        for i in range(0, renpy.config.predict_statements):
+        while nodes:
+
+            if predicted >= renpy.config.predict_statements:
+                break
 
-            if i >= len(nodes):
+            if (renpy.config.predict_statements_time is not None) and (elapsed >= renpy.config.predict_statements_time):
                 break
 
-            node, images, return_stack = nodes[i]
+            start = time.time()
 
-            self.images = renpy.display.image.ShownImageInfo(images)
-            self.predict_return_stack = return_stack
+            distance, _serial, node, images, return_stack = heapq.heappop(nodes)
+
+            predicted += 1
+
+            renpy.display.predict.priority = distance
 
             try:
+                if node.predict_cacheable():
+                    key = (node, images.signature(), tuple(return_stack or ()))
+                    entry = predict_cache.get(key, None)
+                else:
+                    key = None
+                    entry = None
+            except Exception:
+                key = None
+                entry = None
 
-                for n in node.predict():
-                    if n is None:
-                        continue
+            try:
+
+                if entry is not None:
+                    log, next_images, next_return_stack, successors = entry
+                    renpy.display.predict.replay(log)
 
+                else:
+                    self.images = renpy.display.image.ShownImageInfo(images)
+                    self.predict_return_stack = return_stack
+
+                    renpy.display.predict.recording = log = [ ]
+
+                    try:
+                        successors = [ n for n in node.predict() if n is not None ]
+                    finally:
+                        renpy.display.predict.recording = None
+
+                    next_images = self.images
+                    next_return_stack = self.predict_return_stack
+
+                    if key is not None:
+                        if len(predict_cache) >= PREDICT_CACHE_SIZE:
+                            predict_cache.clear()
+
+                        predict_cache[key] = (log, next_images, next_return_stack, successors)
+
+                # Add the statements the prediction profile says were run
+                # next, which may not be reachable by static analysis.
+                profiled = renpy.display.predictprofile.predict(node.name)
+
+                if profiled:
+                    successors = list(successors)
+
+                    for name in profiled:
+                        n = renpy.game.script.namemap.get(name, None)
+
+                        if (n is not None) and (n not in successors):
+                            successors.append(n)
+
+                # Each branch is assumed to be equally likely, so reaching
+                # one of n successors costs n statements.
+                next_distance = distance + max(1, len(successors))
+
+                for n in successors:
                     if n not in seen:
-                        nodes.append((n, self.images, self.predict_return_stack))
+                        heapq.heappush(nodes, (next_distance, len(seen), n, next_images, next_return_stack))
                         seen.add(n)
 
             except Exception:
@@ -884,6 +963,8 @@ class Context(renpy.object.Object):
             self.images = old_images
             self.predict_return_stack = None
 
+            elapsed += time.time() - start
+
             yield True
 
         yield False
@@ -1933,6 +1933,8 @@ def full_restart(transition=False, label="_invoke_main_menu", target="_main_menu
     if transition is False:
         transition = renpy.config.end_game_transition
 
+    renpy.loadsave.cancel_autosave()
+
     raise renpy.game.FullRestartException((transition, label, target)) # type: ignore
 
 
@@ -3817,6 +3819,62 @@ def get_image_load_log(age=None):
         yield i
 
 
+def get_image_cache_stats():
+    """
+    :doc: other
+
+    Returns a dictionary of statistics about the image cache, counted from
+    when the game started. The dictionary has the following keys:
+
+    ``hits``
+        The number of times an image was drawn using the cache, without
+        needing to be loaded.
+    ``predicted_hits``
+        The number of those hits that used an image loaded by prediction.
+    ``misses``
+        The number of times an image had to be loaded before it could
+        be drawn, stalling the game.
+    ``preloads``
+        The number of images loaded by prediction.
+    ``evictions``
+        The number of images removed from the cache to make room for
+        newer ones.
+    ``evicted_bytes``
+        The size of those images, in bytes.
+    ``overfull``
+        The number of predicted images that were not loaded, because the
+        cache was full of images that are in use.
+    ``decode_time``
+        The total time spent loading images, in seconds.
+    ``mean_decode_time``
+        The average time taken to load an image, in seconds.
+    ``cache_bytes``
+        The current size of the cache, in bytes.
+    ``cache_limit_bytes``
+        The maximum size of the cache, in bytes.
+    ``surface_bytes``
+        The part of the cache's size taken up by surfaces in main memory,
+        in bytes.
+    ``texture_bytes``
+        The part of the cache's size taken up by textures, in bytes.
+
+    When :var:`config.image_cache_stats_log` is True, these statistics are
+    also logged at the start of each interaction.
+    """
+
+    cache = renpy.display.im.cache
+
+    with cache.lock:
+        rv = cache.stats.as_dict()
+
+    rv["cache_bytes"] = cache.get_total_size()
+    rv["cache_limit_bytes"] = cache.cache_limit
+    rv["surface_bytes"] = cache.surf_size
+    rv["texture_bytes"] = cache.texture_size
+
+    return rv
+
+
 def end_replay():
     """
     :doc: replay
@@ -147,6 +147,17 @@ cdef class GL2Draw:
 
         return self.texture_loader.get_texture_size()
 
+    def get_texture_bytes(self, tex):
+        """
+        Returns the number of bytes of memory used by `tex`, a texture
+        returned by load_texture or render_to_texture.
+        """
+
+        if self.texture_loader is None:
+            return 0
+
+        return self.texture_loader.get_texture_bytes(tex)
+
     def select_physical_size(self, physical_size):
         """
         *Internal* Determines the 'best' physical size to use, and returns
@@ -983,6 +994,8 @@ cdef class GL2Draw:
         # Load all the textures and RTTs.
         self.load_all_textures(surf)
 
+        renpy.plog(1, "after load_all_textures")
+
         # Switch to the right FBO, and the right viewport.
         self.change_fbo(self.default_fbo)
 
@@ -73,4 +73,8 @@ cdef class GLTexture(GL2Model):
     cdef public int texture_width
     cdef public int texture_height
 
+    # The number of bytes of memory allocated for this texture, including
+    # mipmaps.
+    cdef public long long texture_bytes
+
     cpdef subsurface(GLTexture self, t)
@@ -58,6 +58,32 @@ cdef GLenum MAX_TEXTURE_MAX_ANISOTROPY_EXT = 0x84FF
 
 ################################################################################
 
+def texture_bytes(int tw, int th, int max_level):
+    """
+    Returns the number of bytes of memory used by a `tw` x `th` RGBA
+    texture, including mipmap levels up to `max_level`.
+    """
+
+    rv = 0
+    level = 0
+
+    while True:
+
+        rv += tw * th * 4
+
+        if tw == 1 and th == 1:
+            break
+
+        tw = max(tw >> 1, 1)
+        th = max(th >> 1, 1)
+        level += 1
+
+        if level > max_level:
+            break
+
+    return rv
+
+
 cdef class TextureLoader:
 
     def __init__(TextureLoader self, GL2Draw draw):
@@ -102,6 +128,28 @@ cdef class TextureLoader:
 
         return self.total_texture_size, len(self.allocated)
 
+    def get_texture_bytes(self, tex):
+        """
+        Returns the number of bytes of memory used by `tex`, which may be a
+        texture, a model drawing textures, or a Render containing them.
+        """
+
+        if isinstance(tex, GLTexture):
+            return tex.get_texture_bytes()
+
+        rv = 0
+
+        if isinstance(tex, renpy.display.render.Render):
+            for i in tex.children:
+                rv += self.get_texture_bytes(i[0])
+
+        elif isinstance(tex, GL2Model) and tex.uniforms:
+            for v in tex.uniforms.values():
+                if isinstance(v, GLTexture):
+                    rv += v.get_texture_bytes()
+
+        return rv
+
     def load_one_surface(self, surf, bl, bt, br, bb, properties):
         """
         Converts a surface into a texture.
@@ -296,6 +344,22 @@ cdef class GLTexture(GL2Model):
 
         return self.properties.get("mipmap", True)
 
+    def get_texture_bytes(GLTexture self):
+        """
+        Returns the number of bytes of memory used by this texture, or that
+        will be used when it's loaded.
+        """
+
+        if self.loaded:
+            return self.texture_bytes
+
+        if self.has_mipmaps():
+            max_level = renpy.config.max_mipmap_level
+        else:
+            max_level = 0
+
+        return texture_bytes(int(self.width), int(self.height), max_level)
+
     def get_number(GLTexture self):
         return self.number if renpy.emscripten else None
 
@@ -565,11 +629,6 @@ cdef class GLTexture(GL2Model):
         # Going from a single to multiple mipmap levels takes ~9ms when loading
         # each mipmap, while allocating the space first reduces that to ~1ms.
 
-        if self.has_mipmaps():
-            self.loader.total_texture_size += int(self.width * self.height * 4 * 1.34)
-        else:
-            self.loader.total_texture_size += int(self.width * self.height * 4)
-
         glBindTexture(GL_TEXTURE_2D, tex)
 
         max_level = renpy.config.max_mipmap_level
@@ -577,6 +636,9 @@ cdef class GLTexture(GL2Model):
         if not properties.get("mipmap", True):
             max_level = 0
 
+        self.texture_bytes = texture_bytes(tw, th, max_level)
+        self.loader.total_texture_size += self.texture_bytes
+
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, max_level)
 
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
@@ -640,11 +702,7 @@ cdef class GLTexture(GL2Model):
         try:
             if self.loaded:
                 self.loader.free_list.append(self.number)
-
-                if self.has_mipmaps():
-                    self.loader.total_texture_size -= int(self.width * self.height * 4 * 1.34)
-                else:
-                    self.loader.total_texture_size -= int(self.width * self.height * 4)
+                self.loader.total_texture_size -= self.texture_bytes
         except TypeError:
             pass # Let's not error on shutdown.
 
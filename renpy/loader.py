@@ -28,6 +28,8 @@ import renpy
 import os
 import os.path
 import sys
+import collections
+import heapq
 import types
 import threading
 import zlib
@@ -662,6 +664,12 @@ def load(name, directory=None, tl=True):
     if renpy.config.reject_backslash and "\\" in name:
         raise Exception("Backslash in filename, use '/' instead: %r" % name)
 
+    if tl:
+        data = take_readahead(name, directory)
+
+        if data is not None:
+            return io.BytesIO(data)
+
     name = re.sub(r'/+', '/', name).lstrip('/')
 
     for p in get_prefixes(directory=directory, tl=tl):
@@ -1104,3 +1112,171 @@ def auto_quit():
         auto_lock.notify_all()
 
     auto_thread.join()
+
+
+# Read-ahead
+
+# A map from (name, directory) to the contents of files that have been read
+# before they were loaded. This is ordered from oldest to newest.
+readahead_data = collections.OrderedDict()
+
+# The total size of the data in readahead_data, in bytes.
+readahead_size = 0
+
+# A heap of (priority, serial, (name, directory)) tuples, giving the files
+# that are waiting to be read.
+readahead_queue = [ ]
+
+# A counter used to keep files with the same priority in order.
+readahead_serial = 0
+
+# The keys in readahead_queue.
+readahead_pending = set()
+
+# The condition that protects the read-ahead state, and is used to wake
+# the read-ahead thread.
+readahead_condition = threading.Condition()
+
+# The thread that reads files ahead.
+readahead_thread = None
+
+# True if the read-ahead thread should quit.
+readahead_quit_flag = False
+
+
+def readahead_thread_function():
+    """
+    This thread reads queued files into memory.
+    """
+
+    global readahead_size
+
+    while True:
+
+        with readahead_condition:
+
+            while not (readahead_queue or readahead_quit_flag):
+                readahead_condition.wait()
+
+            if readahead_quit_flag:
+                return
+
+            _priority, _serial, key = heapq.heappop(readahead_queue)
+
+        name, directory = key
+
+        try:
+            with load(name, directory=directory) as f:
+                data = f.read()
+        except Exception:
+            data = None
+
+        with readahead_condition:
+
+            readahead_pending.discard(key)
+
+            if (data is None) or (key in readahead_data):
+                continue
+
+            if len(data) > renpy.config.image_readahead_size:
+                continue
+
+            readahead_data[key] = data
+            readahead_size += len(data)
+
+            while readahead_size > renpy.config.image_readahead_size:
+                _key, old = readahead_data.popitem(last=False)
+                readahead_size -= len(old)
+
+
+def readahead(name, directory=None, priority=0):
+    """
+    Queues the file `name` to be read into memory on a background thread,
+    so that a later call to load with the same `name` and `directory`
+    doesn't have to wait for storage. Files with a lower `priority` are
+    read first.
+    """
+
+    global readahead_thread
+    global readahead_serial
+
+    if renpy.emscripten or not renpy.config.image_readahead_size:
+        return
+
+    key = (name, directory)
+
+    with readahead_condition:
+
+        if (key in readahead_data) or (key in readahead_pending):
+            return
+
+        readahead_pending.add(key)
+        heapq.heappush(readahead_queue, (priority, readahead_serial, key))
+        readahead_serial += 1
+
+        readahead_condition.notify()
+
+    if readahead_thread is None:
+        readahead_thread = threading.Thread(target=readahead_thread_function, name="readahead")
+        readahead_thread.daemon = True
+        readahead_thread.start()
+
+
+def take_readahead(name, directory):
+    """
+    Returns the contents of `name` if they've been read ahead, removing
+    them from memory, or None if they haven't been.
+    """
+
+    global readahead_size
+
+    if not readahead_data:
+        return None
+
+    with readahead_condition:
+        rv = readahead_data.pop((name, directory), None)
+
+        if rv is not None:
+            readahead_size -= len(rv)
+
+    return rv
+
+
+def clear_readahead(data=True):
+    """
+    Empties the queue of files waiting to be read. If `data` is true,
+    files that have already been read are discarded as well.
+    """
+
+    global readahead_size
+
+    with readahead_condition:
+        del readahead_queue[:]
+        readahead_pending.clear()
+
+        if data:
+            readahead_data.clear()
+            readahead_size = 0
+
+
+def quit_readahead():
+    """
+    Terminates the read-ahead thread.
+    """
+
+    global readahead_thread
+    global readahead_quit_flag
+
+    if readahead_thread is None:
+        return
+
+    with readahead_condition:
+        readahead_quit_flag = True
+        readahead_condition.notify_all()
+
+    readahead_thread.join()
+    readahead_thread = None
+
+    readahead_quit_flag = False
+
+    clear_readahead()
@@ -29,6 +29,7 @@ from future.utils import reraise
 from typing import Optional
 
 import io
+import collections
 import zipfile
 import re
 import threading
@@ -41,7 +42,7 @@ import time
 import renpy
 from json import dumps as json_dumps
 
-from renpy.compat.pickle import PROTOCOL, dump, loads
+from renpy.compat.pickle import PROTOCOL, dump, loads, make_pickler, make_unpickler
 
 
 # This is used as a quick and dirty way of versioning savegame
@@ -286,6 +287,32 @@ def find_bad_reduction(roots, log):
 # Saving
 ################################################################################
 
+
+def dump_log(roots, log, f):
+    """
+    Pickles `roots` and `log` to `f`.
+
+    If config.split_rollback_history is true, the rollback entries before
+    the last hard checkpoint are pickled after the rest of the game, so
+    loading can restore the current state without unpickling them.
+    """
+
+    if not renpy.config.split_rollback_history:
+        dump((roots, log), f)
+        return
+
+    history = [ ]
+    pickler = make_pickler(f)
+
+    renpy.rollback.split_history.entries = history
+
+    try:
+        pickler.dump((roots, log))
+    finally:
+        renpy.rollback.split_history.entries = None
+
+    pickler.dump(history)
+
 # Used to indicate an aborted save, due to the game being mutated
 # while the save is in progress.
 
@@ -326,12 +353,16 @@ class SaveRecord(object):
     information to a Ren'Py-standard format save file.
     """
 
-    def __init__(self, screenshot, extra_info, json, log):
+    def __init__(self, screenshot, extra_info, json, log, digest=None):
         self.screenshot = screenshot
         self.extra_info = extra_info
         self.json = json
         self.log = log
 
+        # The digest of log, computed with renpy.savetoken.new_hash, if
+        # it's known.
+        self.digest = digest
+
         self.first_filename = None
 
     def write_file(self, filename):
@@ -370,7 +401,10 @@ class SaveRecord(object):
             zf.writestr("log", self.log)
 
             # The signatures.
-            zf.writestr("signatures", renpy.savetoken.sign_data(self.log))
+            if self.digest is not None:
+                zf.writestr("signatures", renpy.savetoken.sign_digest(self.digest))
+            else:
+                zf.writestr("signatures", renpy.savetoken.sign_data(self.log))
 
         safe_rename(filename_new, filename)
 
@@ -413,8 +447,13 @@ def save(slotname, extra_info='', mutate_flag=False, include_screenshot=True):
         save_dump(roots, renpy.game.log)
 
     logf = io.BytesIO()
+
+    # The log is hashed as it's pickled, so it can be signed without
+    # another pass over the data.
+    hashf = renpy.savetoken.HashingFile(logf)
+
     try:
-        dump((roots, renpy.game.log), logf)
+        dump_log(roots, renpy.game.log, hashf)
     except Exception:
 
         t, e, tb = sys.exc_info()
@@ -456,7 +495,7 @@ def save(slotname, extra_info='', mutate_flag=False, include_screenshot=True):
 
     json = json_dumps(json)
 
-    sr = SaveRecord(screenshot, extra_info, json, logf.getvalue())
+    sr = SaveRecord(screenshot, extra_info, json, logf.getvalue(), hashf.digest())
     location.save(slotname, sr)
 
     location.scan()
@@ -476,6 +515,10 @@ autosave_counter = 0
 # True if a background autosave has finished.
 did_autosave = False
 
+# If an autosave is waiting for an idle frame, the time by which it has
+# to occur even if there isn't one. None if no autosave is waiting.
+autosave_deadline = None
+
 def autosave_thread_function(take_screenshot):
 
     global autosave_counter
@@ -545,6 +588,79 @@ def autosave():
     if not renpy.store._autosave:
         return
 
+    schedule_autosave()
+
+
+def schedule_autosave():
+    """
+    Requests an autosave. Rather than saving right away, this waits for
+    scheduled_autosave to be called on an idle frame, for up to
+    config.autosave_idle_deadline seconds.
+    """
+
+    global autosave_deadline
+
+    if autosave_deadline is not None:
+        return
+
+    autosave_deadline = time.time() + renpy.config.autosave_idle_deadline
+    renpy.plog(1, "autosave scheduled")
+
+
+def cancel_autosave():
+    """
+    Cancels a scheduled autosave. This is called when the game is loaded
+    or restarts, so an autosave requested by the previous game doesn't
+    save the new one.
+    """
+
+    global autosave_deadline
+
+    autosave_deadline = None
+
+
+def scheduled_autosave(idle):
+    """
+    Called at the end of each idle frame to perform a scheduled autosave.
+
+    `idle`
+        True if this is an idle frame - one with no transitions running,
+        no redraw pending, and the interaction waiting for input. The
+        autosave occurs if this is true, or once the deadline has passed.
+    """
+
+    global autosave_deadline
+
+    if autosave_deadline is None:
+        return
+
+    if renpy.config.skipping or (len(renpy.game.contexts) > 1):
+        renpy.plog(2, "autosave deferred (not in the main context)")
+        return
+
+    if not autosave_not_running.is_set():
+        return
+
+    # The player may have returned to the main menu, or autosave may have
+    # been disabled, since the autosave was scheduled.
+    if renpy.store.main_menu or (not renpy.store._autosave) or (not renpy.config.has_autosave):
+        renpy.plog(2, "autosave cancelled")
+        autosave_deadline = None
+        return
+
+    now = time.time()
+
+    if idle:
+        renpy.plog(1, "autosave on idle frame, {:.3f}s before deadline", autosave_deadline - now)
+
+    elif now >= autosave_deadline:
+        renpy.plog(1, "autosave at deadline, no idle frame found")
+
+    else:
+        renpy.plog(2, "autosave deferred (frame not idle)")
+        return
+
+    autosave_deadline = None
     force_autosave(True)
 
 
@@ -820,12 +936,25 @@ def load(filename):
     successfully, this function never returns.
     """
 
-    log_data, signature = location.load(filename)
+    log_data, signature, digest = location.load(filename)
 
-    if not renpy.savetoken.check_load(log_data, signature):
+    # The signature is checked before anything is unpickled, as unpickling
+    # untrusted data is what the save token protects against.
+    if not renpy.savetoken.check_load(log_data, signature, digest):
         return
 
-    roots, log = loads(log_data)
+    f = io.BytesIO(log_data)
+    unpickler = make_unpickler(f)
+
+    roots, log = unpickler.load()
+
+    # If the rollback history was saved separately, load it in the
+    # background.
+    if f.tell() < len(log_data):
+        log.history = renpy.rollback.HistoryLoader(unpickler)
+
+    cancel_autosave()
+
     log.unfreeze(roots, label="_after_load")
 
 
@@ -896,17 +1025,26 @@ class Cache(object):
 
     def __init__(self, slotname):
         self.slotname = slotname
+
+        # Incremented each time the cache is cleared, so a prefetch thread
+        # can tell the slot changed while it was loading it.
+        self.generation = 0
+
         self.clear()
 
     def clear(self):
-        # The time the save was created.
-        self.mtime = unknown
 
-        # The json object loaded from the save slot.
-        self.json = unknown
+        with cache_lock:
+            self.generation += 1
 
-        # The screenshot associated with the save slot.
-        self.screenshot = unknown
+            # The time the save was created.
+            self.mtime = unknown
+
+            # The json object loaded from the save slot.
+            self.json = unknown
+
+            # The screenshot associated with the save slot.
+            self.screenshot = unknown
 
     def get_mtime(self):
 
@@ -944,11 +1082,47 @@ class Cache(object):
         self.get_json()
         self.get_screenshot()
 
+    def prefetch(self):
+        """
+        Preloads the save data on a prefetch thread. If the slot is cleared
+        while the data is being loaded, the data is discarded, as it may
+        be out of date. Returns the screenshot, or None.
+        """
+
+        with cache_lock:
+            generation = self.generation
+            mtime = self.mtime
+            json = self.json
+            screenshot = self.screenshot
+
+        if mtime is unknown:
+            mtime = location.mtime(self.slotname)
+
+        if json is unknown:
+            json = location.json(self.slotname)
+
+        if screenshot is unknown:
+            screenshot = location.screenshot(self.slotname)
+
+        with cache_lock:
+            if self.generation != generation:
+                return None
+
+            self.mtime = mtime
+            self.json = json
+            self.screenshot = screenshot
+
+        return screenshot
+
 
 # A map from slotname to cache object. This is used to cache savegame scan
 # data until the slot changes.
 cache = { }
 
+# A lock that protects the contents of the cache objects, which are filled
+# in by the prefetch threads.
+cache_lock = threading.Lock()
+
 
 def get_cache(slotname):
 
@@ -985,6 +1159,116 @@ def clear_cache():
     renpy.exports.restart_interaction()
 
 
+################################################################################
+# Prefetching
+################################################################################
+
+# A deque of slot names that are waiting to be prefetched.
+prefetch_queue = collections.deque()
+
+# The set of slot names in prefetch_queue.
+prefetch_pending = set()
+
+# The condition that protects the prefetch queue, and is used to wake
+# the prefetch threads.
+prefetch_condition = threading.Condition()
+
+# The threads that load slot metadata in the background.
+prefetch_threads = [ ]
+
+# True if the prefetch threads should quit.
+quit_prefetch = False
+
+
+def prefetch_thread_main():
+
+    while True:
+
+        with prefetch_condition:
+
+            while not (prefetch_queue or quit_prefetch):
+                prefetch_condition.wait()
+
+            if quit_prefetch:
+                return
+
+            slotname = prefetch_queue.popleft()
+            prefetch_pending.discard(slotname)
+
+        try:
+            screenshot = get_cache(slotname).prefetch()
+
+            if screenshot is not None:
+                renpy.display.im.cache.preload_surface(screenshot)
+
+        except Exception:
+            pass
+
+
+def prefetch(regexp):
+    """
+    Queues the slots that match `regexp` to have their metadata loaded,
+    and their screenshots decoded, on background threads. This is used
+    to prepare the file pages the player is likely to flip to, so the
+    file screens don't need to access the disk when they're shown.
+    """
+
+    if renpy.emscripten:
+        return
+
+    if not renpy.config.save_prefetch_threads:
+        return
+
+    slots = list_slots(regexp)
+
+    with prefetch_condition:
+
+        for i in slots:
+
+            if i in prefetch_pending:
+                continue
+
+            # This creates the cache on the main thread, so the prefetch
+            # threads only ever fill in existing caches.
+            c = get_cache(i)
+
+            if (c.json is not unknown) and (c.screenshot is not unknown) and (c.screenshot in renpy.display.im.cache.cache):
+                continue
+
+            prefetch_pending.add(i)
+            prefetch_queue.append(i)
+
+        prefetch_condition.notify_all()
+
+    while len(prefetch_threads) < renpy.config.save_prefetch_threads:
+        t = threading.Thread(target=prefetch_thread_main, name="save prefetch")
+        t.daemon = True
+        t.start()
+
+        prefetch_threads.append(t)
+
+
+def quit(): # @ReservedAssignment
+    """
+    Stops the prefetch threads.
+    """
+
+    global quit_prefetch
+
+    with prefetch_condition:
+        quit_prefetch = True
+        prefetch_queue.clear()
+        prefetch_pending.clear()
+        prefetch_condition.notify_all()
+
+    for t in prefetch_threads:
+        t.join()
+
+    del prefetch_threads[:]
+
+    quit_prefetch = False
+
+
 def init():
     """
     Scans all the metadata from the save slot cache.
@@ -95,6 +95,9 @@ def run(restart):
 
     log_clock("Prepare screens")
 
+    renpy.display.predictprofile.init(restart)
+    log_clock("Load prediction profile")
+
     if not restart:
         renpy.pyanalysis.save_cache()
         log_clock("Save pyanalysis.")
@@ -605,7 +608,13 @@ def main():
             del gc.garbage[:]
 
         if renpy.config.manage_gc:
-            gc.set_threshold(*renpy.config.gc_thresholds)
+
+            if renpy.config.gc_schedule:
+                # Collections are run between frames by consider_gc, so the
+                # automatic collection is only a backstop.
+                gc.set_threshold(renpy.config.gc_thresholds[0] * 2, *renpy.config.gc_thresholds[1:])
+            else:
+                gc.set_threshold(*renpy.config.gc_thresholds)
 
             gc_debug = int(os.environ.get("RENPY_GC_DEBUG", 0))
 
@@ -617,6 +626,17 @@ def main():
         else:
             gc.set_threshold(700, 10, 10)
 
+        # Move everything that exists now - mostly the script, and the
+        # code and data loaded during init - out of the collector's reach,
+        # so later collections don't have to scan it.
+        if renpy.config.manage_gc and renpy.config.gc_freeze and hasattr(gc, "freeze"):
+            gc.freeze()
+
+        renpy.performance.start_gc_log()
+
+        if renpy.config.profile_spans and not renpy.performance.profiling:
+            renpy.performance.start_profile()
+
         log_clock("Initial gc")
 
         # Start debugging file opens.
@@ -652,6 +672,7 @@ def main():
             finally:
 
                 renpy.persistent.update(True)
+                renpy.persistent.compact()
                 renpy.persistent.save_on_quit_MP()
 
                 # Reset live2d if it exists.
@@ -663,7 +684,9 @@ def main():
                 # Flush any pending interface work.
                 renpy.display.interface.finish_pending()
 
-                # Give Ren'Py a couple of seconds to finish saving.
+                # Give Ren'Py a couple of seconds to finish saving, and
+                # don't let an autosave scheduled by this game save the next.
+                renpy.loadsave.cancel_autosave()
                 renpy.loadsave.autosave_not_running.wait(3.0)
 
                 # Run the at exit callbacks.
@@ -678,6 +701,9 @@ def main():
             i()
 
         renpy.loader.auto_quit()
+        renpy.loader.quit_readahead()
+        renpy.display.predictprofile.save()
+        renpy.loadsave.quit()
         renpy.savelocation.quit()
         renpy.translation.write_updated_strings()
 
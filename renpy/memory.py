@@ -451,6 +451,8 @@ def profile_rollback():
     # Like seen, but for objects found in rollback.
     new_seen = { }
 
+    renpy.game.log.load_history()
+
     log = list(renpy.game.log.log)
     log.reverse()
 
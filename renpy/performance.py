@@ -26,6 +26,12 @@ from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, r
 
 
 
+import collections
+import gc
+import json
+import math
+import os
+import threading
 import time
 import renpy
 
@@ -50,6 +56,10 @@ def clear():
 
 def log(depth, event, *args):
 
+    if profiling:
+        now = clock_ns()
+        spans.append((event, now, None, threading.current_thread().ident, args))
+
     if (not renpy.config.profile) or (not running):
         return
 
@@ -71,6 +81,49 @@ def PPP(event, *args):
 __builtins__['PPP'] = PPP
 
 
+def gc_callback(phase, info):
+    """
+    Logs each garbage collection, including the ones Python starts when
+    objects are allocated, so the pause shows up in the frame it happened in.
+    """
+
+    global gc_start
+
+    if phase == "start":
+        log(2, "start gc generation {}", info["generation"])
+
+        gc_start = begin()
+
+    else:
+        log(2, "end gc generation {}, {} collected", info["generation"], info["collected"])
+
+        end("gc", gc_start, info["generation"])
+        gc_start = 0
+
+
+def start_gc_log():
+    """
+    Starts logging garbage collections.
+    """
+
+    # gc.callbacks doesn't exist on Python 2.
+    callbacks = getattr(gc, "callbacks", None)
+
+    if (callbacks is not None) and (gc_callback not in callbacks):
+        callbacks.append(gc_callback)
+
+
+def stop_gc_log():
+    """
+    Stops logging garbage collections.
+    """
+
+    callbacks = getattr(gc, "callbacks", None)
+
+    if (callbacks is not None) and (gc_callback in callbacks):
+        callbacks.remove(gc_callback)
+
+
 def analyze():
     """
     Analyze the FPL and prints a report.
@@ -117,3 +170,282 @@ def analyze():
 
         for i in range(depth, DEPTH_LEVELS):
             times[i] = t
+
+
+# Parts of Ren'Py that take time are timed with begin and end. The times
+# are used by benchmark mode, which records how long each part of each
+# frame took so the numbers can be compared between runs of the same
+# testcase, and by the span profiler, which keeps the most recent spans
+# of time so they can be summarized or exported as a trace.
+
+# The clock, in integer nanoseconds. perf_counter_ns doesn't exist on
+# Python 2.
+if hasattr(time, "perf_counter_ns"):
+    clock_ns = time.perf_counter_ns
+else:
+
+    def clock_ns():
+        return int(time.time() * 1000000000)
+
+# Is anything being timed? This is true when benchmarking or profiling.
+timing = False
+
+# The parts of a frame that are recorded in benchmark mode. "frame" is the
+# total time between the ends of one frame and the next, including time
+# not in any other part.
+BENCHMARK_PARTS = [ "event", "render", "draw", "predict", "gc", "frame" ]
+
+# The percentiles that are reported.
+PERCENTILES = [ 50, 90, 99, 100 ]
+
+# Are frame times being recorded?
+benchmarking = False
+
+# A map from part to the nanoseconds spent in it during the current frame.
+frame_parts = { }
+
+# A list of frame_parts dicts, one for each frame that has been drawn.
+frame_records = [ ]
+
+# The time the current frame started.
+frame_start = 0
+
+# Is the span profiler recording?
+profiling = False
+
+# The number of spans the profiler keeps.
+SPAN_BUFFER_SIZE = 65536
+
+# The most recent spans, as (name, start, end, thread, detail) tuples.
+# Events logged with renpy.plog are included, with an end of None.
+spans = collections.deque(maxlen=SPAN_BUFFER_SIZE)
+
+# The start of the garbage collection that's running, or 0.
+gc_start = 0
+
+
+def begin():
+    """
+    Returns the start time to pass to end, or 0 if nothing is being timed.
+    """
+
+    if not timing:
+        return 0
+
+    return clock_ns()
+
+
+def end(name, start, detail=None):
+    """
+    Ends the span of time called `name`, that began at `start`. `detail`
+    is shown with the span in traces.
+    """
+
+    if not start:
+        return
+
+    now = clock_ns()
+
+    if profiling:
+        spans.append((name, start, now, threading.current_thread().ident, detail))
+
+    if benchmarking and (name in BENCHMARK_PARTS):
+        frame_parts[name] = frame_parts.get(name, 0) + now - start
+
+
+def update_timing():
+    global timing
+    timing = benchmarking or profiling
+
+
+def start_benchmark():
+    """
+    Starts recording frame times.
+    """
+
+    global benchmarking
+    global frame_parts
+    global frame_records
+    global frame_start
+
+    benchmarking = True
+    frame_parts = { }
+    frame_records = [ ]
+    frame_start = clock_ns()
+
+    update_timing()
+
+
+def end_frame():
+    """
+    Called when a frame has been drawn, to record its times.
+    """
+
+    global frame_parts
+    global frame_start
+
+    now = clock_ns()
+
+    if profiling:
+        spans.append(("frame", frame_start, now, threading.current_thread().ident, None))
+
+    if benchmarking:
+        frame_parts["frame"] = now - frame_start
+        frame_records.append(frame_parts)
+        frame_parts = { }
+
+    frame_start = now
+
+
+def percentile(values, p):
+    """
+    Returns the `p`th percentile of the sorted list `values`, using the
+    nearest rank.
+    """
+
+    if not values:
+        return 0.0
+
+    rank = int(math.ceil(p / 100.0 * len(values))) - 1
+
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+def format_percentiles(names, times):
+    """
+    Returns a table of the percentiles of the times in milliseconds.
+    `times` maps each of `names` to a list of times, in nanoseconds.
+    """
+
+    rv = "{:>10} {:>7}".format("", "count")
+
+    for p in PERCENTILES:
+        rv += " {:>9}".format("p{}".format(p))
+
+    rv += "\n"
+
+    for name in names:
+        values = sorted(times[name])
+
+        rv += "{:>10} {:>7}".format(name, len(values))
+
+        for p in PERCENTILES:
+            rv += " {:>7.2f}ms".format(percentile(values, p) / 1000000.0)
+
+        rv += "\n"
+
+    return rv
+
+
+def benchmark_report(fn=None):
+    """
+    Stops recording frame times, and reports the percentiles of the time
+    taken by each part of a frame, in milliseconds. The report is printed,
+    and written to `fn` as JSON if `fn` is given.
+    """
+
+    global benchmarking
+
+    if not benchmarking:
+        return
+
+    benchmarking = False
+    update_timing()
+
+    times = { part : [ i.get(part, 0) for i in frame_records ] for part in BENCHMARK_PARTS }
+
+    s = "\n" + format_percentiles(BENCHMARK_PARTS, times)
+
+    renpy.log.real_stdout.write(s)
+    renpy.display.log.write(s)
+
+    if fn is None:
+        return
+
+    parts = { }
+
+    for part in BENCHMARK_PARTS:
+        values = sorted(times[part])
+        parts[part] = { "p{}".format(p) : percentile(values, p) / 1000000.0 for p in PERCENTILES }
+
+    with open(fn, "w") as f:
+        json.dump({ "frames" : len(frame_records), "parts" : parts }, f, indent=2, sort_keys=True)
+
+
+def start_profile():
+    """
+    Starts the span profiler, discarding the spans it's already recorded.
+    """
+
+    global profiling
+    global frame_start
+
+    # Unless a benchmark is timing frames, the current frame starts now,
+    # rather than when frames were last timed.
+    if not benchmarking:
+        frame_start = clock_ns()
+
+    spans.clear()
+    profiling = True
+    update_timing()
+
+
+def stop_profile():
+    """
+    Stops the span profiler. The spans it's recorded are kept.
+    """
+
+    global profiling
+
+    profiling = False
+    update_timing()
+
+
+def profile_summary():
+    """
+    Returns a table giving the percentiles of the duration of each kind of
+    span the profiler has recorded.
+    """
+
+    times = { }
+
+    for name, start, end, _thread, _detail in list(spans):
+        if end is not None:
+            times.setdefault(name, [ ]).append(end - start)
+
+    if not times:
+        return "No spans have been recorded."
+
+    return format_percentiles(sorted(times), times)
+
+
+def profile_trace(fn):
+    """
+    Writes the spans the profiler has recorded to `fn`, in the Chrome trace
+    event format. This can be loaded by chrome://tracing or Perfetto.
+    """
+
+    pid = os.getpid()
+
+    events = [ ]
+
+    for name, start, end, thread, detail in list(spans):
+
+        if end is None:
+            try:
+                name = name.format(*detail)
+            except Exception:
+                pass
+
+            events.append({ "name" : name, "ph" : "i", "s" : "t", "ts" : start / 1000.0, "pid" : pid, "tid" : thread })
+            continue
+
+        event = { "name" : name, "ph" : "X", "ts" : start / 1000.0, "dur" : (end - start) / 1000.0, "pid" : pid, "tid" : thread }
+
+        if detail is not None:
+            event["args"] = { "detail" : detail }
+
+        events.append(event)
+
+    with open(fn, "w") as f:
+        json.dump({ "traceEvents" : events, "displayTimeUnit" : "ms" }, f)
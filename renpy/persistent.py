@@ -29,6 +29,7 @@ import copy
 import time
 import zlib
 import weakref
+import threading
 
 import renpy
 
@@ -185,6 +186,9 @@ def find_changes():
             persistent._changed[f] = now # type: ignore
             backup[f] = safe_deepcopy(new)
 
+            if renpy.config.persistent_journal:
+                journal_change(f, old, backup[f], now)
+
             rv = True
 
     return rv
@@ -222,6 +226,12 @@ def load(filename):
 
     persistent._update()
 
+    if filename.endswith(".new"):
+        filename = filename[:-4]
+
+    for fn in [ filename + ".journal.old", filename + ".journal" ]:
+        replay_journal(persistent, fn)
+
     return persistent
 
 
@@ -377,6 +387,9 @@ def merge(other):
         backup[f] = safe_deepcopy(val)
         persistent._changed[f] = t # type: ignore
 
+        if renpy.config.persistent_journal:
+            journal_change(f, None, backup[f], t)
+
 
 # The mtime of the most recently processed savefile.
 persistent_mtime = 0
@@ -448,20 +461,223 @@ def save():
     if not should_save_persistent:
         return
 
+    if renpy.config.persistent_journal and persistent_mtime and (journal_size < renpy.config.persistent_journal_size):
+
+        try:
+            save_journal()
+        except Exception:
+            if renpy.config.developer:
+                raise
+
+        update_mtime()
+        return
+
+    save_file(renpy.config.persistent_journal and not renpy.emscripten)
+
+
+def update_mtime():
+    """
+    Prevents the persistent data we just saved from being loaded and
+    merged back in.
+    """
+
+    global persistent_mtime
+
+    for mtime, _data in renpy.loadsave.location.load_persistent():
+        persistent_mtime = max(persistent_mtime, mtime)
+
+
+# The thread that is writing the persistent file in the background, if any.
+save_thread = None
+
+
+def save_file(background=False):
+    """
+    Writes the whole persistent object to the persistent file, compacting
+    the journal into it. If `background` is true, the data is pickled
+    right away, but compressed, signed, and written on a background thread.
+    """
+
+    global save_thread
+    global journal_size
+
+    if save_thread is not None:
+        save_thread.join()
+        save_thread = None
+
     try:
         data = dumps(renpy.game.persistent)
-        compressed = zlib.compress(data, 3)
-        compressed += renpy.savetoken.sign_data(data).encode("utf-8")
-        renpy.loadsave.location.save_persistent(compressed)
     except Exception:
         if renpy.config.developer:
             raise
 
-    global persistent_mtime
+        return
 
-    # Prevent updates just after save
-    for mtime, _data in renpy.loadsave.location.load_persistent():
-        persistent_mtime = max(persistent_mtime, mtime)
+    journal_changes.clear()
+    journal_size = 0
+
+    location = renpy.loadsave.location
+    location.rotate_persistent_journal()
+
+    def write():
+
+        try:
+            compressed = zlib.compress(data, 3)
+            compressed += renpy.savetoken.sign_data(data).encode("utf-8")
+            location.save_persistent(compressed)
+        except Exception:
+            if renpy.config.developer and not background:
+                raise
+
+        update_mtime()
+
+    if background:
+        save_thread = threading.Thread(target=write, name="persistent save")
+        save_thread.daemon = True
+        save_thread.start()
+    else:
+        write()
+
+
+def compact():
+    """
+    Called when the game is quitting to compact the journal into the
+    persistent file, and to wait for any background write to finish.
+    """
+
+    global save_thread
+
+    if journal_size and renpy.config.save_persistent and should_save_persistent:
+        save_file()
+
+    if save_thread is not None:
+        save_thread.join()
+        save_thread = None
+
+
+################################################################################
+# Journal
+################################################################################
+
+# A map from field name to a (time, kind, value) tuple, giving the changes
+# that have not been written to the journal. Kind is "set" if value replaces
+# the field, and "update" if the field is a dict that value is merged into.
+journal_changes = { }
+
+# The number of bytes written to the journal since the persistent file was
+# last written.
+journal_size = 0
+
+
+def journal_change(field, old, new, when):
+    """
+    Records that `field` has changed from `old` to `new` at `when`, so that
+    the change can be written to the journal.
+    """
+
+    kind = "set"
+    value = new
+
+    if (registry.get(field, None) is dictset_merge) and isinstance(old, dict) and isinstance(new, dict):
+        if all(k in new for k in old):
+            kind = "update"
+            value = { k : v for k, v in new.items() if (k not in old) or not (old[k] == v) }
+
+    pending = journal_changes.get(field, None)
+
+    if (kind == "update") and (pending is not None):
+        if pending[1] == "update":
+            pending[2].update(value)
+            value = pending[2]
+        else:
+            kind = "set"
+            value = new
+
+    journal_changes[field] = (when, kind, value)
+
+
+def save_journal():
+    """
+    Appends the changes in journal_changes to the journal.
+    """
+
+    global journal_size
+
+    if not journal_changes:
+        return
+
+    data = dumps(journal_changes)
+    journal_changes.clear()
+
+    body = zlib.compress(data, 3)
+    signature = renpy.savetoken.sign_data(data).encode("utf-8")
+
+    record = "{} {}\n".format(len(body), len(signature)).encode("utf-8") + body + signature
+
+    renpy.loadsave.location.append_persistent_journal(record)
+    journal_size += len(record)
+
+
+def replay_journal(persistent, filename):
+    """
+    Applies the changes in the journal `filename` to `persistent`. Changes
+    that are older than the field in `persistent` were compacted into the
+    persistent file already, and are ignored, as is a record that was only
+    partly written.
+    """
+
+    if not os.path.exists(filename):
+        return
+
+    try:
+        with open(filename, "rb") as f:
+            journal = f.read()
+    except Exception:
+        return
+
+    pvars = persistent.__dict__
+    changed = persistent._changed
+
+    pos = 0
+
+    while pos < len(journal):
+
+        try:
+            end = journal.index(b"\n", pos)
+            body_len, signature_len = [ int(i) for i in journal[pos:end].split() ]
+
+            body_start = end + 1
+            signature_start = body_start + body_len
+            pos = signature_start + signature_len
+
+            if pos > len(journal):
+                break
+
+            data = zlib.decompress(journal[body_start:signature_start])
+            signature = journal[signature_start:pos].decode("utf-8")
+
+        except Exception:
+            break
+
+        if not renpy.savetoken.check_persistent(data, signature):
+            continue
+
+        try:
+            changes = loads(data)
+        except Exception:
+            continue
+
+        for f, (when, kind, value) in changes.items():
+
+            if when <= changed.get(f, 0):
+                continue
+
+            if (kind == "update") and isinstance(pvars.get(f, None), dict):
+                pvars[f].update(value)
+            else:
+                pvars[f] = value
+
+            changed[f] = when
 
 
 
@@ -29,6 +29,7 @@ from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, r
 import __future__
 
 import random
+import threading
 import weakref
 import sys
 import copyreg
@@ -74,6 +75,24 @@ if PY2:
 else:
     _method_wrapper = functools.wraps # type: ignore
 
+# The threads that are unpickling objects that aren't part of the current
+# state of the game, like the rollback history. Changes made to objects on
+# these threads aren't recorded in the rollback log.
+untracked_threads = set()
+
+
+def get_log():
+    """
+    Returns the rollback log that changes to objects made on this thread
+    are recorded in, or None if they shouldn't be recorded.
+    """
+
+    if untracked_threads and (threading.current_thread() in untracked_threads):
+        return None
+
+    return renpy.game.log
+
+
 def mutator(method):
 
     @_method_wrapper(method)
@@ -81,6 +100,9 @@ def mutator(method):
 
         global mutate_flag
 
+        if untracked_threads and (threading.current_thread() in untracked_threads):
+            return method(self, *args, **kwargs)
+
         mutated = renpy.game.log.mutated
 
         if id(self) not in mutated:
@@ -473,7 +495,7 @@ class RevertableObject(object):
     def __new__(cls, *args, **kwargs):
         self = super(RevertableObject, cls).__new__(cls)
 
-        log = renpy.game.log
+        log = get_log()
         if log is not None:
             log.mutated[id(self)] = None
 
@@ -574,7 +596,7 @@ class RollbackRandom(random.Random):
     """
 
     def __init__(self):
-        log = renpy.game.log
+        log = get_log()
 
         if log is not None:
             log.mutated[id(self)] = None
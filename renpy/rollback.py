@@ -38,6 +38,7 @@ import io
 import types
 import copyreg
 import functools
+import threading
 
 import renpy
 
@@ -425,6 +426,76 @@ class Rollback(renpy.object.Object):
         renpy.game.log.checkpointing_suspended = self.checkpointing_suspended
 
 
+# When the entries attribute of this is a list, RollbackLog.__getstate__
+# leaves the rollback entries before the last hard checkpoint out of the
+# pickled log, and adds them to that list instead.
+split_history = threading.local()
+
+
+class HistoryLoader(object):
+    """
+    This unpickles the rollback entries that were saved separately from
+    the rest of the game state, either on a background thread or when
+    the entries are first needed.
+    """
+
+    def __init__(self, unpickler):
+
+        # The unpickler, positioned at the start of the entries.
+        self.unpickler = unpickler
+
+        # The list of entries, once they've been loaded.
+        self.entries = None
+
+        # Held while the entries are being loaded.
+        self.lock = threading.Lock()
+
+        if not renpy.emscripten:
+            self.thread = threading.Thread(target=self.load, name="rollback history")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def load(self):
+
+        with self.lock:
+
+            if self.entries is not None:
+                return
+
+            # The objects in the history aren't part of the current state,
+            # so creating them mustn't be recorded in the current log.
+            thread = threading.current_thread()
+            renpy.revertable.untracked_threads.add(thread)
+
+            try:
+                self.entries = self.unpickler.load()
+            except Exception:
+                if renpy.config.developer:
+                    import traceback
+                    traceback.print_exc()
+
+                self.entries = [ ]
+            finally:
+                renpy.revertable.untracked_threads.discard(thread)
+
+            self.unpickler = None
+
+    def ready(self):
+        """
+        Returns true if the entries have been loaded.
+        """
+
+        return self.entries is not None
+
+    def get(self):
+        """
+        Returns the list of entries, waiting for them to load if necessary.
+        """
+
+        self.load()
+        return self.entries
+
+
 class RollbackLog(renpy.object.Object):
     """
     This class manages the list of Rollback objects.
@@ -441,13 +512,17 @@ class RollbackLog(renpy.object.Object):
 
     @ivar mutated: A dictionary that maps object ids to a tuple of
     (weakref to object, information needed to rollback that object)
+
+    @ivar history: A HistoryLoader for the entries that go before the
+    start of the log, when those entries haven't been loaded yet.
     """
 
     __version__ = 6
 
-    nosave = [ 'old_store', 'mutated', 'identifier_cache' ]
+    nosave = [ 'old_store', 'mutated', 'identifier_cache', 'history' ]
     identifier_cache = None
     force_checkpoint = False
+    history = None
 
     def __init__(self):
 
@@ -482,10 +557,47 @@ class RollbackLog(renpy.object.Object):
         # statement.
         self.force_checkpoint = False
 
+    def __getstate__(self):
+        rv = super(RollbackLog, self).__getstate__()
+
+        history = getattr(split_history, "entries", None)
+
+        if history is not None:
+
+            log = list(self.log)
+
+            split = 0
+
+            for i in range(len(log) - 1, -1, -1):
+                if log[i].hard_checkpoint:
+                    split = i
+                    break
+
+            history.extend(log[:split])
+            rv["log"] = log[split:]
+
+        return rv
+
     def after_setstate(self):
         self.mutated = { }
         self.rolled_forward = False
 
+    def load_history(self):
+        """
+        Ensures the rollback entries that are being loaded separately
+        from the rest of the log are part of the log, waiting for them
+        to load if required.
+        """
+
+        history = self.history
+
+        if history is None:
+            return
+
+        self.history = None
+        self.log[0:0] = history.get()
+        self.identifier_cache = None
+
     def after_upgrade(self, version):
         if version < 2:
             self.ever_been_changed = { "store" : set(self.ever_been_changed) }
@@ -521,6 +633,9 @@ class RollbackLog(renpy.object.Object):
 
         self.identifier_cache = None
 
+        if (self.history is not None) and self.history.ready():
+            self.load_history()
+
         context = renpy.game.context()
 
         if not context.rollback:
@@ -555,7 +670,11 @@ class RollbackLog(renpy.object.Object):
         else:
             renpy.python.begin_stores()
 
-        # If the log is too long, prune it.
+        # If the log is too long, prune it. The history goes before the log,
+        # so it has to be part of the log before entries are pruned.
+        if len(self.log) > renpy.config.rollback_length:
+            self.load_history()
+
         while len(self.log) > renpy.config.rollback_length:
             if self.log.pop(0).hard_checkpoint:
                 if self.rollback_block:
@@ -592,6 +711,8 @@ class RollbackLog(renpy.object.Object):
         `new` ast node.
         """
 
+        self.load_history()
+
         for i in self.log:
             i.context.replace_node(old, new)
 
@@ -801,6 +922,7 @@ class RollbackLog(renpy.object.Object):
 
         if purge:
             self.rollback_block = 0
+            self.history = None
             del self.log[:]
 
     def retain_after_load(self):
@@ -902,8 +1024,14 @@ class RollbackLog(renpy.object.Object):
 
         revlog = [ ]
 
-        # Find the place to roll back to.
-        while self.log:
+        # Find the place to roll back to. The entries before the start of
+        # the log are loaded when we reach them.
+        while self.log or (self.history is not None):
+
+            if not self.log:
+                self.load_history()
+                continue
+
             rb = self.log.pop()
             revlog.append(rb)
 
@@ -936,7 +1064,11 @@ class RollbackLog(renpy.object.Object):
         force_checkpoint = False
 
         # Try to rollback to just after the previous checkpoint.
-        while greedy and self.log:
+        while greedy and (self.log or (self.history is not None)):
+
+            if not self.log:
+                self.load_history()
+                continue
 
             rb = self.log[-1]
 
@@ -1068,6 +1200,9 @@ class RollbackLog(renpy.object.Object):
         (called after the save is complete).
         """
 
+        # The whole log is needed to save.
+        self.load_history()
+
         # Purge unreachable objects, so we don't save them.
         self.complete(False)
         roots = self.get_roots()
@@ -1141,6 +1276,8 @@ class RollbackLog(renpy.object.Object):
         if self.identifier_cache is not None:
             return
 
+        self.load_history()
+
         rollback_limit = self.rollback_limit
         checkpoints = 1
 
@@ -139,9 +139,11 @@ class FileLocation(object):
                 if slotname not in new_mtimes:
                     clear_slot(slotname)
 
+            journal_mtime = self.journal_mtime()
+
             for pfn in [ self.persistent + ".new", self.persistent ]:
                 if os.path.exists(pfn):
-                    mtime = os.path.getmtime(pfn)
+                    mtime = max(os.path.getmtime(pfn), journal_mtime)
 
                     if mtime != self.persistent_mtime:
                         data = renpy.persistent.load(pfn)
@@ -274,7 +276,8 @@ class FileLocation(object):
 
     def load(self, slotname):
         """
-        Returns the log and signature components of the file found in `slotname`
+        Returns the log and signature components of the file found in `slotname`,
+        and the digest of the log computed with renpy.savetoken.new_hash.
         """
 
         with disk_lock:
@@ -282,14 +285,30 @@ class FileLocation(object):
             filename = self.filename(slotname)
 
             with zipfile.ZipFile(filename, "r") as zf:
-                log = zf.read("log")
+
+                # Hash the log as it's decompressed, rather than making a
+                # second pass over it.
+                digest = renpy.savetoken.new_hash()
+                chunks = [ ]
+
+                with zf.open("log") as lf:
+                    while True:
+                        chunk = lf.read(1024 * 1024)
+
+                        if not chunk:
+                            break
+
+                        digest.update(chunk)
+                        chunks.append(chunk)
+
+                log = b"".join(chunks)
 
                 try:
                     token = zf.read("signatures").decode("utf-8")
                 except:
                     token = ''
 
-            return log, token
+            return log, token, digest.digest()
 
     def unlink(self, slotname):
         """
@@ -377,13 +396,97 @@ class FileLocation(object):
             safe_rename(fn_tmp, fn_new)
             safe_rename(fn_new, fn)
 
+            # The changes in the old journal are now part of the
+            # persistent file.
+            old_journal = fn + ".journal.old"
+
+            if os.path.exists(old_journal):
+                os.unlink(old_journal)
+
             # Prevent persistent from unpickle just after save
-            self.persistent_mtime = os.path.getmtime(fn)
+            self.persistent_mtime = max(os.path.getmtime(fn), self.journal_mtime())
 
             renpy.util.expose_file(fn)
 
             self.sync()
 
+    def journal_mtime(self):
+        """
+        Returns the newest mtime of the persistent journals, or 0 if
+        there are no journals.
+        """
+
+        rv = 0
+
+        for fn in [ self.persistent + ".journal.old", self.persistent + ".journal" ]:
+            try:
+                rv = max(rv, os.path.getmtime(fn))
+            except Exception:
+                pass
+
+        return rv
+
+    def append_persistent_journal(self, data):
+        """
+        Appends `data`, a binary string containing a journal record, to
+        the persistent journal.
+        """
+
+        with disk_lock:
+
+            if not self.active:
+                return
+
+            fn = self.persistent + ".journal"
+
+            with open(fn, "ab") as f:
+                f.write(data)
+
+            # Prevent persistent from unpickle just after save
+            self.persistent_mtime = max(self.persistent_mtime, os.path.getmtime(fn))
+
+            renpy.util.expose_file(fn)
+
+            self.sync()
+
+    def rotate_persistent_journal(self):
+        """
+        Called before the persistent file is written. This moves the
+        journal aside, so the journal can be removed once the persistent
+        file has been written, while changes made in the meantime go to a
+        new journal.
+        """
+
+        with disk_lock:
+
+            if not self.active:
+                return
+
+            fn = self.persistent + ".journal"
+            old = fn + ".old"
+
+            if not os.path.exists(fn):
+                return
+
+            try:
+                if os.path.exists(old):
+
+                    # The last write of the persistent file didn't finish,
+                    # so keep the changes in the old journal.
+                    with open(fn, "rb") as f:
+                        data = f.read()
+
+                    with open(old, "ab") as f:
+                        f.write(data)
+
+                    os.unlink(fn)
+
+                else:
+                    safe_rename(fn, old)
+
+            except Exception:
+                pass
+
     def unlink_persistent(self):
 
         if not self.active:
@@ -396,6 +499,12 @@ class FileLocation(object):
         except Exception:
             pass
 
+        for fn in [ self.persistent + ".journal.old", self.persistent + ".journal" ]:
+            try:
+                os.unlink(fn)
+            except Exception:
+                pass
+
     def __eq__(self, other):
         if not isinstance(other, FileLocation):
             return False
@@ -565,6 +674,16 @@ class MultiLocation(object):
         for l in self.active_locations():
             l.save_persistent(data)
 
+    def append_persistent_journal(self, data):
+
+        for l in self.active_locations():
+            l.append_persistent_journal(data)
+
+    def rotate_persistent_journal(self):
+
+        for l in self.active_locations():
+            l.rotate_persistent_journal()
+
     def unlink_persistent(self):
 
         for l in self.active_locations():
@@ -24,6 +24,7 @@ from renpy.compat import PY2, basestring, bchr, bord, chr, open, pystr, range, r
 
 import base64
 import ecdsa
+import hashlib
 import os
 import zipfile
 
@@ -76,28 +77,72 @@ def decode_line(line): #type (str) -> (str, bytes, bytes|None)
         return '', b'', None
 
 
+def new_hash(data=b''):
+    """
+    Returns a new hash object, for use with sign_digest and verify_data.
+    This is the hash ecdsa uses by default, so a signature of the digest
+    is also a signature of the data itself.
+    """
+
+    return hashlib.sha1(data)
+
+
+class HashingFile(object):
+    """
+    A write-only file-like object that hashes the data written to it,
+    before passing it on to `f`. This lets data be hashed as it is
+    pickled, rather than in a second pass.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.hash = new_hash()
+
+    def write(self, data):
+        self.hash.update(data)
+        return self.f.write(data)
+
+    def digest(self):
+        return self.hash.digest()
+
+
 def sign_data(data):
     """
     Signs `data` with the signing keys and returns the
     signature. If there are no signing keys, returns None.
     """
 
+    return sign_digest(new_hash(data).digest())
+
+def sign_digest(digest):
+    """
+    Signs `digest`, a digest of the data computed with new_hash, and
+    returns the signature.
+    """
+
     rv = ""
 
     for i in signing_keys:
         sk = ecdsa.SigningKey.from_der(i)
 
         if sk is not None and sk.verifying_key is not None:
-            sig = sk.sign(data)
+            sig = sk.sign_digest(digest)
             rv += encode_line("signature", sk.verifying_key.to_der(), sig)
 
     return rv
 
-def verify_data(data, signatures, check_verifying=True):
+def verify_data(data, signatures, check_verifying=True, digest=None):
     """
     Verifies that `data` has been signed by the keys in `signatures`.
+
+    `digest`
+        If not None, the digest of `data`, computed with new_hash. This
+        is used instead of hashing data again.
     """
 
+    if digest is None:
+        digest = new_hash(data).digest()
+
     for i in signatures.splitlines():
         kind, key, sig = decode_line(i)
 
@@ -111,7 +156,7 @@ def verify_data(data, signatures, check_verifying=True):
 
             try:
                 vk = ecdsa.VerifyingKey.from_der(key)
-                if vk.verify(sig, data):
+                if vk.verify_digest(sig, digest):
                     return True
             except Exception:
                 continue
@@ -134,10 +179,13 @@ def get_keys_from_signatures(signatures):
 
     return rv
 
-def check_load(log, signatures):
+def check_load(log, signatures, digest=None):
     """
     This checks the token that was loaded from a save file to see if it's
     valid. If not, it will prompt the user to confirm the load.
+
+    `digest`
+        If not None, the digest of `log`, computed with new_hash.
     """
 
     if token_dir is None:
@@ -150,7 +198,10 @@ def check_load(log, signatures):
     if renpy.emscripten:
         return True
 
-    if verify_data(log, signatures):
+    if digest is None:
+        digest = new_hash(log).digest()
+
+    if verify_data(log, signatures, digest=digest):
         return True
 
     def ask(prompt):
@@ -179,7 +230,7 @@ def check_load(log, signatures):
         return True
 
     # This check catches the case where the signature is not correct.
-    return verify_data(log, signatures, False)
+    return verify_data(log, signatures, False, digest=digest)
 
 
 def check_persistent(data, signatures):
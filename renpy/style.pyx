@@ -795,6 +795,8 @@ def build_styles():
     for s in list(styles.values()):
         build_style(s)
 
+    renpy.display.render.pure_cache_clear()
+
 def rebuild(prepare_screens=True):
     """
     Rebuilds all styles.
@@ -162,6 +162,11 @@ def execute():
 
     if node is None:
         renpy.test.testmouse.reset()
+
+        # There's no one to play the game after the testcase ends.
+        if renpy.display.draw.info["renderer"] == "headless":
+            renpy.exports.quit()
+
         return
 
     loc = renpy.exports.get_filename_line()
@@ -1979,6 +1979,43 @@ class Text(renpy.display.displayable.Displayable):
         # The list of displayables and their offsets.
         self.displayable_offsets = [ ]
 
+    def _render_key(self):
+
+        # Only plain text, without text tags, that's shown all at once,
+        # can be pure.
+        if self.slow or (self.slow is None and self.style.slow_cps):
+            return None
+
+        if self.ctc or self.slow_done or (self.start is not None) or (self.end is not None):
+            return None
+
+        if self.style.textshader or renpy.config.default_textshader:
+            return None
+
+        if self.text is None:
+            return None
+
+        for i in self.text:
+            if not isinstance(i, basestring) or "{" in i:
+                return None
+
+        style = self._style_key()
+
+        if style is None:
+            return None
+
+        preferences = renpy.game.preferences
+
+        return (
+            Text,
+            tuple(self.text),
+            self.mask,
+            style,
+            preferences.font_transform,
+            preferences.font_size,
+            preferences.font_line_spacing,
+            )
+
     def _duplicate(self, args):
 
         if args and args.args:
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+# Benchmarks entering a scene made of transformed images, without the
+# image disk cache, with an empty (cold) disk cache, and with a full
+# (warm) one, as happens when the game is started a second time.
+
+from __future__ import print_function
+
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+RENPY = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(RENPY))
+
+import pygame_sdl2
+
+import renpy
+renpy.import_all()
+
+
+class FileImage(renpy.display.im.ImageBase):
+    """
+    An image that's loaded from an absolute path, without going through
+    the loader.
+    """
+
+    def __init__(self, fn, **properties):
+        super(FileImage, self).__init__(fn, **properties)
+        self.fn = fn
+
+    def load(self):
+        with open(self.fn, "rb") as f:
+            return renpy.display.pgrender.load_image(f, self.fn)
+
+
+class NullDraw(object):
+
+    def mutated_surface(self, surf):
+        return
+
+
+def make_images(directory, count, size):
+
+    rv = [ ]
+
+    for i in range(count):
+        surf = pygame_sdl2.Surface(size, pygame_sdl2.SRCALPHA)
+        surf.fill(((i * 37) % 256, (i * 91) % 256, (i * 13) % 256, 255))
+
+        fn = os.path.join(directory, "image{}.png".format(i))
+        pygame_sdl2.image.save(surf, fn)
+        rv.append(fn)
+
+    return rv
+
+
+def make_scene(filenames):
+    """
+    Returns a list of image manipulators, each of which decodes, blurs,
+    and recolors one of `filenames`.
+    """
+
+    im = renpy.display.im
+
+    return [ im.Recolor(im.Blur(FileImage(fn), 4), 255, 224, 192, 255) for fn in filenames ]
+
+
+def enter(scene, enabled):
+    """
+    Loads every image in `scene` into an empty image cache, as happens
+    the first time a scene is shown in a session.
+    """
+
+    renpy.config.image_disk_cache = enabled
+
+    # Forget the index, as a new session would.
+    renpy.display.diskcache.index = None
+
+    cache = renpy.display.im.Cache()
+    cache.cache_limit = 1 << 40
+
+    old_cache = renpy.display.im.cache
+    renpy.display.im.cache = cache
+
+    start = time.perf_counter()
+
+    for i in scene:
+        cache.get(i)
+
+    rv = time.perf_counter() - start
+
+    renpy.display.im.cache = old_cache
+    cache.quit()
+
+    return rv
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", type=int, default=16)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    args = ap.parse_args()
+
+    pygame_sdl2.init()
+    renpy.display.pgrender.set_rgba_masks()
+
+    renpy.config.optimize_texture_bounds = False
+    renpy.display.draw = NullDraw()
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        renpy.config.gamedir = directory
+        renpy.config.savedir = os.path.join(directory, "saves")
+
+        filenames = make_images(directory, args.images, (args.width, args.height))
+        scene = make_scene(filenames)
+
+        print("{:>8} {:>12}".format("cache", "enter time"))
+
+        for name, enabled in [ ("off", False), ("cold", True), ("warm", True) ]:
+            t = enter(scene, enabled)
+            print("{:>8} {:>10.1f}ms".format(name, t * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+# Benchmarks flattening unchanged parts of a typical visual novel screen -
+# a background, sprites, a textbox, and quick menu, with dialogue that
+# changes each frame - counting the textures drawn each frame with and
+# without flattening, along with the time flattening takes.
+
+from __future__ import print_function
+
+import argparse
+import pathlib
+import sys
+import time
+
+RENPY = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(RENPY))
+
+import pygame_sdl2
+
+import renpy
+renpy.import_all()
+
+from renpy.display.render import Render
+
+
+class Texture(object):
+    """
+    Stands in for a texture.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def get_size(self):
+        return (self.width, self.height)
+
+
+class Draw(object):
+    """
+    Stands in for the model-based renderer.
+    """
+
+    draw_per_virt = 1.0
+
+
+def tiles(width, height, tile):
+    """
+    Returns a render of `width` x `height` made of `tile` x `tile` textures,
+    like a large image is.
+    """
+
+    rv = Render(width, height)
+
+    for y in range(0, height, tile):
+        for x in range(0, width, tile):
+            rv.blit(Texture(min(tile, width - x), min(tile, height - y)), (x, y))
+
+    return rv
+
+
+def frame(width, height, buttons):
+    """
+    Returns a render of a frame containing a row of `buttons` buttons.
+    """
+
+    rv = Render(width, height)
+    rv.blit(tiles(width, height, 512), (0, 0))
+
+    bw = width // buttons
+
+    for i in range(buttons):
+        button = Render(bw, height)
+        button.blit(Texture(bw, height), (0, 0))
+        button.blit(Texture(bw - 20, height - 20), (10, 10))
+        rv.blit(button, (i * bw, 0))
+
+    return rv
+
+
+class Scene(object):
+    """
+    The renders of a scene, where only the dialogue changes.
+    """
+
+    def __init__(self, width, height, sprites):
+        self.width = width
+        self.height = height
+
+        self.background = tiles(width, height, 1024)
+
+        self.sprites = [ ]
+
+        for i in range(sprites):
+            sprite = Render(600, 1000)
+            sprite.blit(tiles(600, 1000, 512), (0, 0))
+            sprite.blit(Texture(200, 200), (200, 100))
+            self.sprites.append((sprite, 200 + i * 500, height - 1000))
+
+        self.textbox = tiles(width, 300, 1024)
+        self.quick_menu = frame(1000, 40, 10)
+
+    def render(self, n):
+        """
+        Returns the screen render for the `n`th frame.
+        """
+
+        master = Render(self.width, self.height)
+        master.blit(self.background, (0, 0))
+
+        for sprite, x, y in self.sprites:
+            master.blit(sprite, (x, y))
+
+        # The text changes each frame.
+        text = Render(1200, 120)
+
+        for i in range(n % 100):
+            text.blit(Texture(12, 30), (i * 12, 0))
+
+        textbox = Render(self.width, 300)
+        textbox.blit(self.textbox, (0, 0))
+        textbox.blit(text, (300, 60))
+
+        screens = Render(self.width, self.height)
+        screens.blit(textbox, (0, self.height - 300))
+        screens.blit(self.quick_menu, ((self.width - 1000) // 2, self.height - 40))
+
+        rv = Render(self.width, self.height)
+        rv.blit(master, (0, 0))
+        rv.blit(screens, (0, 0))
+
+        return rv
+
+
+def textures(r):
+    """
+    Returns the number of textures drawn to draw `r`.
+    """
+
+    if r.operation == renpy.display.render.FLATTEN:
+        return 1
+
+    rv = 0
+
+    for child, _x, _y, _focus, _main in r.children:
+        if isinstance(child, Render):
+            rv += textures(child)
+        else:
+            rv += 1
+
+    return rv
+
+
+def run(scene, frames):
+    """
+    Draws `frames` frames of the scene, returning the mean number of
+    textures drawn per frame and the seconds spent flattening.
+    """
+
+    render = renpy.display.render
+
+    total = 0
+    flatten_time = 0
+
+    for i in range(frames):
+        screen = scene.render(i)
+
+        start = time.perf_counter()
+        render.flatten(screen)
+        flatten_time += time.perf_counter() - start
+
+        render.screen_render = screen
+        render.mark_sweep()
+
+        total += textures(screen)
+
+    return total / frames, flatten_time / frames
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--sprites", type=int, default=3)
+    ap.add_argument("--frames", type=int, default=200)
+    args = ap.parse_args()
+
+    pygame_sdl2.init()
+
+    renpy.display.render.models = True
+    renpy.display.draw = Draw()
+
+    print("{:>12} {:>12} {:>12}".format("", "textures", "flatten"))
+
+    for frames in [ None, 8, 2 ]:
+        renpy.config.auto_flatten_frames = frames
+
+        scene = Scene(args.width, args.height, args.sprites)
+        count, flatten_time = run(scene, args.frames)
+
+        print("{:>12} {:>12.1f} {:>10.3f}ms".format(
+            "off" if frames is None else "{} frames".format(frames),
+            count,
+            flatten_time * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# Benchmarks finding the focus under the mouse on a screen with thousands
+# of buttons inside a scrolled viewport, searching the render tree and
+# using the focus index, along with the time taken to build the focus
+# list and index after each redraw.
+
+from __future__ import print_function
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+RENPY = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(RENPY))
+
+import pygame_sdl2
+
+import renpy
+renpy.import_all()
+
+from renpy.display.render import Render
+
+
+class Button(object):
+    """
+    Stands in for a focusable displayable.
+    """
+
+
+def make_screen(size, count, columns):
+    """
+    Returns a screen render with a viewport containing `count` buttons,
+    arranged in `columns` columns and scrolled to the middle.
+    """
+
+    width, height = size
+
+    bw = width // columns
+    bh = 30
+
+    viewport = Render(width, height)
+    viewport.xclipping = True
+    viewport.yclipping = True
+
+    rows = (count + columns - 1) // columns
+    scroll = (rows * bh - height) // 2
+
+    for i in range(count):
+        label = Render(bw - 10, bh - 10)
+
+        button = Render(bw, bh)
+        button.blit(label, (5, 5))
+        button.add_focus(Button(), None, 0, 0, bw, bh)
+
+        viewport.blit(button, ((i % columns) * bw, (i // columns) * bh - scroll))
+
+    rv = Render(width, height)
+    rv.blit(viewport, (0, 0))
+
+    return rv
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--buttons", type=int, default=2000)
+    ap.add_argument("--columns", type=int, default=10)
+    ap.add_argument("--points", type=int, default=10000)
+    ap.add_argument("--frames", type=int, default=20)
+    args = ap.parse_args()
+
+    pygame_sdl2.init()
+
+    render = renpy.display.render
+
+    screen = make_screen((args.width, args.height), args.buttons, args.columns)
+    render.screen_render = screen
+
+    rng = random.Random(0)
+    points = [ (rng.uniform(0, args.width), rng.uniform(0, args.height)) for _i in range(args.points) ]
+
+    start = time.perf_counter()
+
+    for _i in range(args.frames):
+        screen.take_focuses(0, 0, args.width, args.height, render.IDENTITY, None, [ ])
+
+    take_list = (time.perf_counter() - start) / args.frames
+
+    start = time.perf_counter()
+
+    for _i in range(args.frames):
+        render.take_focuses([ ])
+
+    take_index = (time.perf_counter() - start) / args.frames
+
+    start = time.perf_counter()
+
+    for x, y in points:
+        screen.focus_at_point(x, y, None)
+
+    search = (time.perf_counter() - start) / args.points
+
+    start = time.perf_counter()
+
+    for x, y in points:
+        render.focus_at_point(x, y)
+
+    index = (time.perf_counter() - start) / args.points
+
+    for x, y in points[:1000]:
+        a = render.focus_at_point(x, y)
+        b = screen.focus_at_point(x, y, None)
+
+        assert (a and a.widget) == (b and b[0])
+
+    print("{} buttons".format(args.buttons))
+    print("{:>12} {:>12} {:>12}".format("", "take focuses", "hit test"))
+    print("{:>12} {:>10.3f}ms {:>10.2f}us".format("search", take_list * 1000, search * 1000000))
+    print("{:>12} {:>10.3f}ms {:>10.2f}us".format("index", take_index * 1000, index * 1000000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+# Benchmarks how long it takes the image cache's preload threads to fill
+# the cache with a batch of predicted images, for various numbers of
+# threads.
+
+from __future__ import print_function
+
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+RENPY = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(RENPY))
+
+import pygame_sdl2
+
+import renpy
+renpy.import_all()
+
+
+class FileImage(renpy.display.im.ImageBase):
+    """
+    An image that's loaded from an absolute path, without going through
+    the loader.
+    """
+
+    def __init__(self, fn, **properties):
+        super(FileImage, self).__init__(fn, **properties)
+        self.fn = fn
+
+    def load(self):
+        with open(self.fn, "rb") as f:
+            return renpy.display.pgrender.load_image(f, self.fn)
+
+
+class TextureDraw(object):
+    """
+    A draw object that keeps surfaces as textures, so the benchmark
+    measures decoding rather than GPU upload.
+    """
+
+    def load_texture(self, surf, transient=False, properties={}):
+        return surf
+
+    def mutated_surface(self, surf):
+        return
+
+    def ready_one_texture(self):
+        return False
+
+
+def make_images(directory, count, size):
+
+    rv = [ ]
+
+    for i in range(count):
+        surf = pygame_sdl2.Surface(size, pygame_sdl2.SRCALPHA)
+        surf.fill(((i * 37) % 256, (i * 91) % 256, (i * 13) % 256, 255))
+
+        fn = os.path.join(directory, "image{}.png".format(i))
+        pygame_sdl2.image.save(surf, fn)
+        rv.append(fn)
+
+    return rv
+
+
+def fill(threads, filenames):
+
+    cache = renpy.display.im.Cache()
+    cache.cache_limit = 1 << 40
+    cache.start_preload_threads(threads)
+
+    images = [ FileImage(i) for i in filenames ]
+
+    start = time.perf_counter()
+
+    for i in images:
+        cache.preload_image(i)
+
+    while True:
+        with cache.lock:
+            if all(i in cache.cache for i in images):
+                break
+
+        time.sleep(.001)
+
+    rv = time.perf_counter() - start
+
+    cache.quit()
+
+    return rv
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", type=int, default=64)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--threads", default="1,2,4,8")
+    args = ap.parse_args()
+
+    pygame_sdl2.init()
+    renpy.display.pgrender.set_rgba_masks()
+
+    renpy.config.optimize_texture_bounds = False
+    renpy.display.draw = TextureDraw()
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        filenames = make_images(directory, args.images, (args.width, args.height))
+
+        print("{:>8} {:>12} {:>12}".format("threads", "fill time", "images/s"))
+
+        for threads in [ int(i) for i in args.threads.split(",") ]:
+            t = fill(threads, filenames)
+            print("{:>8} {:>10.1f}ms {:>12.1f}".format(threads, t * 1000, args.images / t))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+# Benchmarks preloading a set of images from slow storage, with and without
+# the loader reading predicted files ahead of the decode. Storage is
+# throttled with a file open callback that adds a fixed latency and
+# limits bandwidth, to simulate a spinning disk or network share.
+
+from __future__ import print_function
+
+import argparse
+import io
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import types
+
+RENPY = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(RENPY))
+
+import pygame_sdl2
+
+import renpy
+renpy.import_all()
+
+
+def make_images(directory, count, size):
+
+    os.makedirs(os.path.join(directory, "images"))
+
+    rv = [ ]
+
+    for i in range(count):
+        surf = pygame_sdl2.Surface(size, pygame_sdl2.SRCALPHA)
+
+        # Noise, so the files don't compress to nothing.
+        surf.from_data(os.urandom(size[0] * size[1] * 4))
+
+        fn = "image{}.png".format(i)
+        pygame_sdl2.image.save(surf, os.path.join(directory, "images", fn))
+        rv.append(fn)
+
+    return rv
+
+
+def throttled_open(directory, latency, bandwidth):
+    """
+    Returns a file open callback that reads files from `directory`, taking
+    `latency` seconds plus one second per `bandwidth` bytes.
+    """
+
+    def callback(name):
+        fn = os.path.join(directory, name)
+
+        if not os.path.isfile(fn):
+            return None
+
+        with open(fn, "rb") as f:
+            data = f.read()
+
+        time.sleep(latency + len(data) / bandwidth)
+
+        return io.BytesIO(data)
+
+    return callback
+
+
+def preload(filenames, readahead):
+    """
+    Decodes each of `filenames` in order, as the preload thread would,
+    returning the time taken.
+    """
+
+    renpy.config.image_readahead_size = (1 << 40) if readahead else 0
+    renpy.loader.clear_readahead()
+
+    start = time.perf_counter()
+
+    for i, fn in enumerate(filenames):
+        renpy.loader.readahead(fn, "images", i)
+
+    for fn in filenames:
+        renpy.display.im.Image(fn).load()
+
+    rv = time.perf_counter() - start
+
+    renpy.loader.quit_readahead()
+
+    return rv
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", type=int, default=16)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--latency", type=float, default=10.0, help="Per-file latency, in milliseconds.")
+    ap.add_argument("--bandwidth", type=float, default=40.0, help="Bandwidth, in megabytes per second.")
+    args = ap.parse_args()
+
+    pygame_sdl2.init()
+    renpy.display.pgrender.set_rgba_masks()
+
+    renpy.game.preferences = types.SimpleNamespace(language=None)
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        filenames = make_images(directory, args.images, (args.width, args.height))
+
+        renpy.config.file_open_callback = throttled_open(
+            directory,
+            args.latency / 1000,
+            args.bandwidth * 1024 * 1024)
+
+        print("{:>10} {:>12}".format("readahead", "preload time"))
+
+        for name, enabled in [ ("off", False), ("on", True) ]:
+            t = preload(filenames, enabled)
+            print("{:>10} {:>10.1f}ms".format(name, t * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+# Benchmarks freeing unreachable renders after each frame, against the
+# number of live renders. Each frame rebuilds the screen render and a few
+# changed renders, while the rest of the tree is reused from the frame
+# before, as it would be from the render cache.
+
+from __future__ import print_function
+
+import argparse
+import pathlib
+import sys
+import time
+
+RENPY = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(RENPY))
+
+import pygame_sdl2
+
+import renpy
+renpy.import_all()
+
+from renpy.display.render import Render
+
+
+def make_tree(count, fanout):
+    """
+    Returns a render that is the root of a tree of `count` renders, with
+    each render having up to `fanout` children.
+    """
+
+    leaves = [ Render(8, 8) for _i in range(count) ]
+
+    while len(leaves) > 1:
+        parents = [ ]
+
+        for i in range(0, len(leaves), fanout):
+            r = Render(8, 8)
+
+            for j in leaves[i:i + fanout]:
+                r.blit(j, (0, 0))
+
+            parents.append(r)
+
+        leaves = parents
+
+    return leaves[0]
+
+
+def run(count, changed, frames):
+
+    renpy.display.render.screen_render = None
+    renpy.display.render.mark_sweep()
+
+    tree = make_tree(count, 8)
+
+    renpy.display.render.screen_render = tree
+    renpy.display.render.mark_sweep()
+
+    elapsed = 0.0
+
+    for _n in range(frames):
+        rv = Render(8, 8)
+        rv.blit(tree, (0, 0))
+
+        # The parts of the screen that changed this frame.
+        for _i in range(changed):
+            r = Render(8, 8)
+            r.blit(Render(8, 8), (0, 0))
+            rv.blit(r, (0, 0))
+
+        renpy.display.render.screen_render = rv
+
+        start = time.perf_counter()
+        renpy.display.render.mark_sweep()
+        elapsed += time.perf_counter() - start
+
+    renpy.display.render.screen_render = None
+    renpy.display.render.mark_sweep()
+
+    return elapsed / frames
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--changed", type=int, default=50, help="Renders changed each frame.")
+    ap.add_argument("--frames", type=int, default=100)
+    args = ap.parse_args()
+
+    pygame_sdl2.init()
+
+    print("{:>8} {:>12}".format("renders", "sweep time"))
+
+    for count in [ 1000, 10000, 50000, 100000 ]:
+        t = run(count, args.changed, args.frames)
+        print("{:>8} {:>10.3f}ms".format(count, t * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+# Benchmarks signing and verifying save logs of various sizes, comparing
+# signing the pickled log in a second pass with signing a digest computed
+# while the log is pickled.
+
+from __future__ import print_function
+
+import argparse
+import io
+import pathlib
+import sys
+import time
+
+RENPY = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(RENPY))
+
+import ecdsa
+
+import renpy
+import renpy.savetoken
+
+from renpy.compat.pickle import dump
+
+
+def make_log(entries):
+    """
+    Returns an object that pickles to roughly the size of a log with
+    `entries` rollback entries.
+    """
+
+    return [
+        {
+            "store.x{}".format(j) : ("value", i, j, [ float(j) ] * 8)
+            for j in range(64)
+        }
+        for i in range(entries)
+        ]
+
+
+def best_of(repeat, f):
+
+    rv = None
+
+    for _i in range(repeat):
+        start = time.perf_counter()
+        f()
+        t = time.perf_counter() - start
+
+        if rv is None or t < rv:
+            rv = t
+
+    return rv
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10,100,1000,5000", help="Comma-separated numbers of log entries.")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    sk = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
+    renpy.savetoken.signing_keys = [ sk.to_der() ]
+    renpy.savetoken.verifying_keys = [ sk.verifying_key.to_der() ]
+
+    print("{:>8} {:>10} {:>12} {:>12} {:>12} {:>12}".format(
+        "entries", "bytes", "sign 2-pass", "sign stream", "verify", "verify dgst"))
+
+    for entries in [ int(i) for i in args.sizes.split(",") ]:
+
+        log = make_log(entries)
+
+        def two_pass():
+            f = io.BytesIO()
+            dump(log, f)
+            return renpy.savetoken.sign_data(f.getvalue())
+
+        def streaming():
+            f = io.BytesIO()
+            hf = renpy.savetoken.HashingFile(f)
+            dump(log, hf)
+            return renpy.savetoken.sign_digest(hf.digest())
+
+        f = io.BytesIO()
+        dump(log, f)
+        data = f.getvalue()
+        signatures = renpy.savetoken.sign_data(data)
+        digest = renpy.savetoken.new_hash(data).digest()
+
+        assert renpy.savetoken.verify_data(data, renpy.savetoken.sign_digest(digest))
+
+        t_two_pass = best_of(args.repeat, two_pass)
+        t_streaming = best_of(args.repeat, streaming)
+        t_verify = best_of(args.repeat, lambda : renpy.savetoken.verify_data(data, signatures))
+        t_verify_digest = best_of(args.repeat, lambda : renpy.savetoken.verify_data(data, signatures, digest=digest))
+
+        print("{:>8} {:>10} {:>10.2f}ms {:>10.2f}ms {:>10.2f}ms {:>10.2f}ms".format(
+            entries, len(data),
+            t_two_pass * 1000, t_streaming * 1000,
+            t_verify * 1000, t_verify_digest * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+# Benchmarks the software renderer drawing a screen with many unchanging
+# images and one small changing one, like a blinking caret, comparing a
+# full redraw each frame with drawing only the damaged area.
+
+from __future__ import print_function
+
+import argparse
+import pathlib
+import sys
+import time
+
+RENPY = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(RENPY))
+
+import pygame_sdl2
+
+import renpy
+renpy.import_all()
+
+from renpy.display.render import Render
+
+
+class Window(object):
+    """
+    Stands in for SWDraw, which do_draw_screen only uses for its window.
+    """
+
+    def __init__(self, size):
+        self.window = pygame_sdl2.Surface(size, pygame_sdl2.SRCALPHA)
+
+
+def make_scene(size, count):
+    """
+    Returns a function that returns the screen render for frame `n`. The
+    background and `count` tiles are the same Renders each frame, while
+    the caret is a new Render each frame, as it would be after being
+    invalidated.
+    """
+
+    width, height = size
+
+    background = pygame_sdl2.Surface(size, pygame_sdl2.SRCALPHA)
+    background.fill((32, 32, 64, 255))
+
+    tile = pygame_sdl2.Surface((48, 48), pygame_sdl2.SRCALPHA)
+    tile.fill((200, 160, 120, 192))
+
+    caret_on = pygame_sdl2.Surface((2, 24), pygame_sdl2.SRCALPHA)
+    caret_on.fill((255, 255, 255, 255))
+
+    caret_off = pygame_sdl2.Surface((2, 24), pygame_sdl2.SRCALPHA)
+
+    tiles = Render(width, height)
+
+    columns = width // 50
+
+    for i in range(count):
+        r = Render(48, 48)
+        r.blit(tile, (0, 0))
+        tiles.blit(r, ((i % columns) * 50, (i // columns) * 50 % height))
+
+    def frame(n):
+        caret = Render(2, 24)
+        caret.blit(caret_on if n % 2 else caret_off, (0, 0))
+
+        rv = Render(width, height)
+        rv.blit(background, (0, 0))
+        rv.blit(tiles, (0, 0))
+        rv.blit(caret, (width // 2, height - 40))
+
+        return rv
+
+    return frame
+
+
+def run(frame, window, frames, full):
+
+    # Start from a clean clipper, and draw the first frame fully.
+    renpy.display.swdraw.clippers[0] = renpy.display.swdraw.Clipper()
+    renpy.display.swdraw.do_draw_screen(frame(0), True, window)
+
+    start = time.perf_counter()
+
+    for n in range(1, frames + 1):
+        renpy.display.swdraw.do_draw_screen(frame(n), full, window)
+
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--tiles", type=int, default=500)
+    ap.add_argument("--frames", type=int, default=100)
+    args = ap.parse_args()
+
+    pygame_sdl2.init()
+    renpy.display.pgrender.set_rgba_masks()
+
+    size = (args.width, args.height)
+
+    renpy.config.screen_width, renpy.config.screen_height = size
+
+    window = Window(size)
+    frame = make_scene(size, args.tiles)
+
+    print("{:>8} {:>12}".format("redraw", "frame time"))
+
+    for name, full in [ ("full", True), ("damage", False) ]:
+        t = run(frame, window, args.frames, full)
+        print("{:>8} {:>10.2f}ms".format(name, t * 1000))
+
+
+if __name__ == "__main__":
+    main()
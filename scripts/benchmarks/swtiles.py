@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# Benchmarks the software renderer redrawing a 1080p screen of scaled,
+# translucent sprites on one thread and on several, and checks that every
+# thread count draws the same pixels.
+
+from __future__ import print_function
+
+import argparse
+import os
+import pathlib
+import sys
+import time
+
+RENPY = pathlib.Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(RENPY))
+
+import pygame_sdl2
+
+import renpy
+renpy.import_all()
+
+from renpy.display.render import Render
+from renpy.display.matrix import Matrix2D
+
+
+class Window(object):
+    """
+    Stands in for SWDraw, which do_draw_screen only uses for its window.
+    """
+
+    def __init__(self, size):
+        self.window = pygame_sdl2.Surface(size, pygame_sdl2.SRCALPHA)
+
+
+def make_screen(size, count):
+    """
+    Returns a screen render with a background and `count` sprites, each
+    scaled and drawn with partial alpha.
+    """
+
+    width, height = size
+
+    background = pygame_sdl2.Surface(size, pygame_sdl2.SRCALPHA)
+    background.fill((32, 32, 64, 255))
+
+    sprite = pygame_sdl2.Surface((400, 600), pygame_sdl2.SRCALPHA)
+    sprite.from_data(os.urandom(400 * 600 * 4))
+
+    rv = Render(width, height)
+    rv.blit(background, (0, 0))
+
+    for i in range(count):
+        zoom = 1.0 + (i % 5) * .1
+
+        r = Render(400 * zoom, 600 * zoom)
+        r.forward = Matrix2D(1 / zoom, 0, 0, 1 / zoom)
+        r.reverse = Matrix2D(zoom, 0, 0, zoom)
+        r.alpha = .8
+        r.blit(sprite, (0, 0))
+
+        rv.blit(r, ((i * 173) % (width - 400), (i * 97) % (height - 600)))
+
+    return rv
+
+
+def run(screen, window, frames, threads):
+
+    renpy.config.software_draw_threads = threads
+    renpy.display.swdraw.clippers[0] = renpy.display.swdraw.Clipper()
+
+    start = time.perf_counter()
+
+    for _n in range(frames):
+        renpy.display.swdraw.do_draw_screen(screen, True, window)
+
+    rv = (time.perf_counter() - start) / frames
+
+    renpy.display.swdraw.quit_tile_threads()
+
+    return rv, pygame_sdl2.image.tostring(window.window, "RGBA")
+
+
+def main():
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--sprites", type=int, default=12)
+    ap.add_argument("--frames", type=int, default=20)
+    ap.add_argument("--threads", type=int, nargs="+", default=[ 1, 2, 4, 8 ])
+    args = ap.parse_args()
+
+    pygame_sdl2.init()
+    renpy.display.pgrender.set_rgba_masks()
+
+    size = (args.width, args.height)
+
+    renpy.config.screen_width, renpy.config.screen_height = size
+
+    window = Window(size)
+    screen = make_screen(size, args.sprites)
+
+    print("{:>8} {:>12} {:>8}".format("threads", "frame time", "pixels"))
+
+    reference = None
+
+    for threads in args.threads:
+        t, pixels = run(screen, window, args.frames, threads)
+
+        if reference is None:
+            reference = pixels
+
+        print("{:>8} {:>10.2f}ms {:>8}".format(
+            threads,
+            t * 1000,
+            "same" if pixels == reference else "DIFFER"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#@PydevCodeAnalysisIgnore
+import os
+import shutil
+import tempfile
+import unittest
+
+import renpy
+renpy.import_all()
+
+import pygame_sdl2
+
+from renpy.display import diskcache
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        renpy.display.pgrender.set_rgba_masks()
+
+        self.old_savedir = renpy.config.savedir
+        self.savedir = tempfile.mkdtemp()
+
+        renpy.config.savedir = self.savedir
+        diskcache.index = None
+        diskcache.directory = None
+
+    def tearDown(self):
+        renpy.config.savedir = self.old_savedir
+        diskcache.index = None
+        diskcache.directory = None
+
+        shutil.rmtree(self.savedir)
+
+    def test_round_trip(self):
+        surf = pygame_sdl2.Surface((3, 2), pygame_sdl2.SRCALPHA)
+        surf.fill((10, 20, 30, 40))
+        surf.set_at((1, 1), (200, 100, 50, 255))
+
+        diskcache.write("test.rgba", surf)
+
+        path = os.path.join(self.savedir, "cache", "images", "test.rgba")
+        assert os.path.exists(path)
+
+        # Forget the index, as a new session would.
+        diskcache.index = None
+
+        rv = diskcache.read("test.rgba")
+
+        assert rv is not None
+        assert rv.get_size() == (3, 2)
+        assert tuple(rv.get_at((0, 0))) == (10, 20, 30, 40)
+        assert tuple(rv.get_at((1, 1))) == (200, 100, 50, 255)
+
+        assert diskcache.index_size == os.path.getsize(path)
+
+    def test_missing(self):
+        assert diskcache.read("missing.rgba") is None
+
+
+if __name__ == "__main__":
+    unittest.main()
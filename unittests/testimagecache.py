@@ -0,0 +1,250 @@
+#@PydevCodeAnalysisIgnore
+import unittest
+import time
+
+import renpy
+renpy.import_all()
+
+import pygame_sdl2
+
+from renpy.display.im import Cache, ImageBase
+
+
+class SizedImage(ImageBase):
+    """
+    An image that loads as a 1x1 surface, which takes up one unit of space
+    in the cache.
+    """
+
+    def __init__(self, n):
+        super(SizedImage, self).__init__(n, optimize_bounds=False)
+
+    def load(self):
+        return pygame_sdl2.Surface((1, 1), pygame_sdl2.SRCALPHA)
+
+
+class NullDraw(object):
+
+    def mutated_surface(self, surf):
+        return
+
+
+class TestImageCache(unittest.TestCase):
+
+    ENTRIES = 20000
+
+    def setUp(self):
+        self.old_draw = renpy.display.draw
+        renpy.display.draw = NullDraw()
+
+        self.cache = Cache()
+        self.cache.cache_limit = self.ENTRIES * 10
+
+    def tearDown(self):
+        self.cache.quit()
+        renpy.display.draw = self.old_draw
+
+    def check_sizes(self):
+        cache = self.cache
+
+        assert cache.get_total_size() == sum(i.size() for i in cache.cache.values())
+
+        for generations in range(1, 5):
+            start = cache.time - generations
+            expected = sum(i.size() for i in cache.cache.values() if i.time > start)
+            assert cache.get_current_size(generations) == expected
+
+        times = [ i.time for i in cache.cache.values() ]
+        assert times == sorted(times)
+
+    def test_stress(self):
+        cache = self.cache
+
+        images = [ SizedImage(i) for i in range(self.ENTRIES) ]
+
+        # Fill the cache over 20 generations.
+        for i, im in enumerate(images):
+            if i % 1000 == 0:
+                cache.tick()
+
+            cache.load_entry(im, True)
+
+        self.check_sizes()
+
+        # Touch every tenth image in a new generation.
+        cache.tick()
+
+        for im in images[::10]:
+            cache.touch(cache.cache[im])
+
+        self.check_sizes()
+
+        cache.cache_limit = self.ENTRIES // 2
+
+        start = time.time()
+
+        with cache.lock:
+            assert cache.cleanout()
+
+        elapsed = time.time() - start
+
+        assert cache.get_total_size() <= cache.cache_limit
+        self.check_sizes()
+
+        # The touched images are the most recently used, so they survive.
+        for im in images[::10]:
+            assert im in cache.cache
+
+        # Evicting 10000 entries should be far faster than a second.
+        assert elapsed < 1.0
+
+    def test_overfull(self):
+        cache = self.cache
+
+        cache.tick()
+
+        for i in range(100):
+            cache.load_entry(SizedImage(i), True)
+
+        cache.cache_limit = 50
+
+        # Everything is in the current generation, so nothing can be
+        # evicted.
+        with cache.lock:
+            assert not cache.cleanout()
+
+        assert len(cache.cache) == 100
+        self.check_sizes()
+
+    def test_preload_priority(self):
+        cache = self.cache
+
+        # Stop the preload threads, so the queue can be inspected.
+        cache.quit()
+        cache.tick()
+
+        images = [ SizedImage(i) for i in range(10) ]
+
+        for i, im in enumerate(images):
+            cache.preload_image(im, 10 - i)
+
+        # A higher priority is ignored, a lower one requeues the image.
+        cache.preload_image(images[0], 20)
+        cache.preload_image(images[1], 0)
+
+        assert cache.added[images[0]] == 10
+        assert cache.added[images[1]] == 0
+
+        queued = [ im for priority, _serial, im in sorted(cache.preloads) if cache.added[im] == priority ]
+
+        assert queued == [ images[1] ] + images[9:1:-1] + [ images[0] ]
+
+    def test_evict_further(self):
+        cache = self.cache
+
+        cache.tick()
+
+        images = [ SizedImage(i) for i in range(100) ]
+
+        for i, im in enumerate(images):
+            cache.load_entry(im, True)
+            cache.added[im] = i
+
+        cache.cache_limit = cache.get_total_size() // 2
+
+        # Everything is in the current generation, but the images predicted
+        # to be needed after priority 10 can make way.
+        with cache.lock:
+            assert cache.cleanout(10)
+
+        assert cache.get_total_size() <= cache.cache_limit
+        self.check_sizes()
+
+        for im in images[:50]:
+            assert im in cache.cache
+
+        for im in images[50:]:
+            assert im not in cache.cache
+
+    def test_reuse(self):
+        cache = self.cache
+
+        cache.tick()
+
+        im = SizedImage(0)
+        cache.load_entry(im, True)
+
+        # Without a texture, the render can't be reused.
+        assert not cache.reuse(im)
+        assert not cache.reuse(SizedImage(1))
+
+        ce = cache.cache[im]
+        ce.texture = object()
+
+        cache.tick()
+
+        assert cache.reuse(im)
+        assert ce.time == cache.time
+        assert cache.stats.as_dict()["hits"] == 1
+        self.check_sizes()
+
+    def test_stats(self):
+        cache = self.cache
+
+        cache.tick()
+
+        images = [ SizedImage(i) for i in range(10) ]
+
+        for im in images:
+            cache.load_entry(im, True)
+
+        stats = cache.stats.as_dict()
+        assert stats["preloads"] == 10
+        assert stats["misses"] == 0
+
+        # Only the first use of a predicted entry is a predicted hit.
+        ce = cache.cache[images[0]]
+        cache.count_hit(ce)
+        cache.count_hit(ce)
+
+        stats = cache.stats.as_dict()
+        assert stats["hits"] == 2
+        assert stats["predicted_hits"] == 1
+
+        cache.tick()
+        cache.cache_limit = cache.get_total_size() // 2
+
+        with cache.lock:
+            assert cache.cleanout()
+
+        stats = cache.stats.as_dict()
+        assert stats["evictions"] == 10 - len(cache.cache)
+        assert stats["evicted_bytes"] == stats["evictions"] * ce.size()
+
+    def test_surface_limit(self):
+        cache = self.cache
+
+        cache.tick()
+
+        for i in range(100):
+            cache.load_entry(SizedImage(i), True)
+
+        ce = next(iter(cache.cache.values()))
+
+        assert ce.surf_bytes == ce.surf.get_pitch() * ce.surf.get_height()
+        assert cache.surf_size == cache.get_total_size() == 100 * ce.size()
+
+        cache.tick()
+
+        # The total limit is large, but the surface limit is exceeded.
+        cache.surf_limit = 10 * ce.size()
+
+        with cache.lock:
+            assert cache.cleanout()
+
+        assert len(cache.cache) == 10
+        self.check_sizes()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+#@PydevCodeAnalysisIgnore
+import unittest
+
+import renpy
+renpy.import_all()
+
+from renpy.display import predictprofile
+
+
+class TestPredictProfile(unittest.TestCase):
+
+    def setUp(self):
+        predictprofile.profile = { }
+        predictprofile.current = None
+        predictprofile.dirty = False
+
+    def test_record(self):
+
+        predictprofile.record_statement("a")
+        predictprofile.record_image(renpy.display.im.Image("a.png"))
+        predictprofile.record_image(renpy.display.im.Image("a.png"))
+        predictprofile.record_statement("b")
+        predictprofile.record_statement("a")
+        predictprofile.record_statement("c")
+
+        self.assertTrue(predictprofile.dirty)
+
+        entry = predictprofile.profile["a"]
+        self.assertEqual(entry.images, [ renpy.display.im.Image("a.png") ])
+        self.assertEqual(entry.successors, [ "b", "c" ])
+        self.assertEqual(predictprofile.profile["b"].successors, [ "a" ])
+
+    def test_full_restart(self):
+
+        predictprofile.record_statement("a")
+        predictprofile.record_statement("b")
+
+        # A full restart passes the transition and labels to run.
+        predictprofile.init((None, "_invoke_main_menu", "_main_menu"))
+
+        self.assertTrue(predictprofile.dirty)
+        self.assertEqual(predictprofile.profile["a"].successors, [ "b" ])
+
+
+if __name__ == "__main__":
+    unittest.main()